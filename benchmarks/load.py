@@ -0,0 +1,417 @@
+"""Carga ponta a ponta contra a API no ar (por padrão, o ``compose.yaml``).
+
+Cada cenário roda ``--concurrency`` usuários virtuais em laço fechado
+(cada um só manda a próxima requisição depois da resposta anterior) por
+``--duration`` segundos, depois de ``--warmup`` segundos descartados:
+
+- ``login``: ``POST /auth/token``, Argon2 a cada requisição;
+- ``crud``: listagem, criação, edição e remoção de tarefas em
+  ``/todos/`` (50/20/15/15%);
+- ``pagination``: percorre as tarefas semeadas pelo ``next_cursor`` e
+  alterna com saltos por ``offset`` para o fundo da lista;
+- ``search``: filtros por título e estado e busca ``fulltext`` na
+  descrição;
+- ``refresh``: ``POST /auth/refresh_token``, trocando o token a cada
+  resposta.
+
+Tudo passa pela API: os usuários de carga (``--users``, cada um com
+``--todos`` tarefas) são criados no início e removidos no fim, com as
+tarefas em cascata. O relatório em JSON traz, por cenário e por
+requisição, RPS, p50/p95/p99 em ms e a taxa de erro (transporte ou
+status >= 400), junto do commit em ``HEAD`` para comparar execuções.
+
+Uso::
+
+    docker compose up -d --build
+    python -m benchmarks.load [--scenario login crud] [--concurrency 32]
+        [--duration 30] [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import subprocess
+from collections import defaultdict
+from statistics import quantiles
+from time import perf_counter
+
+import httpx
+
+SCENARIOS = ('login', 'crud', 'pagination', 'search', 'refresh')
+STATES = ('draft', 'todo', 'doing', 'done', 'trash')
+WORDS = (
+    'relatório',
+    'reunião',
+    'compras',
+    'deploy',
+    'revisão',
+    'viagem',
+    'orçamento',
+    'estudo',
+)
+PAGE_SIZE = 20
+BATCH_SIZE = 500  # TODO_BATCH_MAX_SIZE padrão
+CRUD_MIX = (('list', 50), ('create', 20), ('update', 15), ('delete', 15))
+OFFSET_SHARE = 0.5  # pagination: saltos por offset; o resto segue o cursor
+FULLTEXT_SHARE = 0.5  # search: busca fulltext; o resto filtra título/estado
+
+
+class Recorder:
+    """Latências e erros por requisição; ignora o que chega no warm-up."""
+
+    def __init__(self):
+        self.recording = False
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, name: str, seconds: float, status: int | None):
+        if not self.recording:
+            return
+        self.latencies[name].append(seconds)
+        if status is None or status >= httpx.codes.BAD_REQUEST:
+            self.errors[name] += 1
+
+
+def percentiles(samples):
+    if len(samples) == 1:
+        return samples * 3
+    cuts = quantiles(samples, n=100, method='inclusive')
+    return cuts[49], cuts[94], cuts[98]
+
+
+def summarize(latencies, errors, seconds: float):
+    samples = sorted(latencies)
+    requests = len(samples)
+    if not requests:
+        return {'requests': 0, 'rps': 0.0, 'errors': errors}
+
+    p50, p95, p99 = percentiles(samples)
+    return {
+        'requests': requests,
+        'rps': round(requests / seconds, 1),
+        'errors': errors,
+        'error_rate': round(errors / requests, 4),
+        'latency_ms': {
+            'p50': round(p50 * 1000, 2),
+            'p95': round(p95 * 1000, 2),
+            'p99': round(p99 * 1000, 2),
+            'max': round(samples[-1] * 1000, 2),
+        },
+    }
+
+
+def report(recorder: Recorder, seconds: float):
+    overall = summarize(
+        [s for samples in recorder.latencies.values() for s in samples],
+        sum(recorder.errors.values()),
+        seconds,
+    )
+    overall['by_request'] = {
+        name: summarize(samples, recorder.errors[name], seconds)
+        for name, samples in sorted(recorder.latencies.items())
+    }
+    return overall
+
+
+def succeeded(response) -> bool:
+    return response is not None and response.is_success
+
+
+class Account:
+    def __init__(self, number: int, run_id: str):
+        self.username = f'load-{run_id}-{number}'
+        self.email = f'{self.username}@example.com'
+        self.password = secrets.token_urlsafe(12)
+        self.id = None
+        self.token = None
+        self.seeded = 0
+
+    @property
+    def headers(self):
+        return {'Authorization': f'Bearer {self.token}'}
+
+
+class VirtualUser:
+    """Um cliente em laço fechado; cada método é uma iteração."""
+
+    def __init__(self, client, account: Account, recorder: Recorder):
+        self.client = client
+        self.account = account
+        self.recorder = recorder
+        self.random = random.Random()
+        self.created = []
+        self.cursor = None
+
+    async def request(self, name: str, method: str, url: str, **kwargs):
+        started = perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.add(name, perf_counter() - started, None)
+            return None
+
+        self.recorder.add(name, perf_counter() - started, response.status_code)
+        return response
+
+    async def login(self):
+        await self.request(
+            'POST /auth/token',
+            'POST',
+            '/auth/token',
+            data={
+                'username': self.account.email,
+                'password': self.account.password,
+            },
+        )
+
+    async def refresh(self):
+        response = await self.request(
+            'POST /auth/refresh_token',
+            'POST',
+            '/auth/refresh_token',
+            headers=self.account.headers,
+        )
+        if succeeded(response):
+            self.account.token = response.json()['access_token']
+
+    async def crud(self):
+        names, weights = zip(*CRUD_MIX)
+        operation = self.random.choices(names, weights)[0]
+        if operation in {'update', 'delete'} and not self.created:
+            operation = 'create'
+
+        headers = self.account.headers
+        if operation == 'list':
+            await self.request(
+                'GET /todos/',
+                'GET',
+                '/todos/',
+                params={'limit': PAGE_SIZE},
+                headers=headers,
+            )
+        elif operation == 'create':
+            response = await self.request(
+                'POST /todos/',
+                'POST',
+                '/todos/',
+                json=make_todo(self.random),
+                headers=headers,
+            )
+            if succeeded(response):
+                self.created.append(response.json()['id'])
+        elif operation == 'update':
+            await self.request(
+                'PATCH /todos/{todo_id}',
+                'PATCH',
+                f'/todos/{self.random.choice(self.created)}',
+                json={'state': self.random.choice(STATES)},
+                headers=headers,
+            )
+        else:
+            todo_id = self.created.pop()
+            await self.request(
+                'DELETE /todos/{todo_id}',
+                'DELETE',
+                f'/todos/{todo_id}',
+                headers=headers,
+            )
+
+    async def pagination(self):
+        if self.random.random() < OFFSET_SHARE:
+            offset = self.random.randrange(
+                max(self.account.seeded - PAGE_SIZE, 1)
+            )
+            await self.request(
+                'GET /todos/?offset',
+                'GET',
+                '/todos/',
+                params={'offset': offset, 'limit': PAGE_SIZE},
+                headers=self.account.headers,
+            )
+            return
+
+        params = {'limit': PAGE_SIZE}
+        if self.cursor:
+            params['cursor'] = self.cursor
+        response = await self.request(
+            'GET /todos/?cursor',
+            'GET',
+            '/todos/',
+            params=params,
+            headers=self.account.headers,
+        )
+        # no fim da lista (ou num erro) recomeça do início
+        self.cursor = (
+            response.json()['next_cursor'] if succeeded(response) else None
+        )
+
+    async def search(self):
+        word = self.random.choice(WORDS)
+        if self.random.random() < FULLTEXT_SHARE:
+            name = 'GET /todos/?search=fulltext'
+            params = {'description': word, 'search': 'fulltext'}
+        else:
+            name = 'GET /todos/?title&state'
+            params = {'title': word, 'state': self.random.choice(STATES)}
+
+        await self.request(
+            name,
+            'GET',
+            '/todos/',
+            params=params | {'limit': PAGE_SIZE},
+            headers=self.account.headers,
+        )
+
+
+def make_todo(rng: random.Random):
+    first, second = rng.sample(WORDS, 2)
+    return {
+        'title': f'{first} {rng.randrange(10_000)}',
+        'description': f'{first} antes de {second}',
+        'state': rng.choice(STATES),
+    }
+
+
+async def create_account(client, account: Account, todos: int):
+    response = await client.post(
+        '/users/',
+        json={
+            'username': account.username,
+            'email': account.email,
+            'password': account.password,
+        },
+    )
+    response.raise_for_status()
+    account.id = response.json()['id']
+
+    response = await client.post(
+        '/auth/token',
+        data={'username': account.email, 'password': account.password},
+    )
+    response.raise_for_status()
+    account.token = response.json()['access_token']
+
+    rng = random.Random(account.id)
+    for start in range(0, todos, BATCH_SIZE):
+        size = min(BATCH_SIZE, todos - start)
+        response = await client.post(
+            '/todos/batch',
+            json={'todos': [make_todo(rng) for _ in range(size)]},
+            headers=account.headers,
+        )
+        response.raise_for_status()
+    account.seeded = todos
+
+
+async def delete_account(client, account: Account):
+    """Remove o usuário e, em cascata, as tarefas semeadas e criadas."""
+    if account.id is None:
+        return
+    # o token do começo pode ter expirado num teste longo
+    response = await client.post(
+        '/auth/token',
+        data={'username': account.email, 'password': account.password},
+    )
+    if response.is_success:
+        account.token = response.json()['access_token']
+    await client.delete(f'/users/{account.id}', headers=account.headers)
+
+
+async def run_scenario(client, accounts, scenario: str, args):
+    recorder = Recorder()
+    users = [
+        VirtualUser(client, accounts[n % len(accounts)], recorder)
+        for n in range(args.concurrency)
+    ]
+    stopped = False
+
+    async def loop(user):
+        step = getattr(user, scenario)
+        while not stopped:
+            await step()
+
+    tasks = [asyncio.create_task(loop(user)) for user in users]
+    await asyncio.sleep(args.warmup)
+    recorder.recording = True
+    started = perf_counter()
+    await asyncio.sleep(args.duration)
+    recorder.recording = False
+    elapsed = perf_counter() - started
+    stopped = True
+    await asyncio.gather(*tasks)
+
+    return report(recorder, elapsed)
+
+
+def current_commit():
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+async def main(args):
+    run_id = secrets.token_hex(4)
+    accounts = [Account(n, run_id) for n in range(args.users)]
+    limits = httpx.Limits(
+        max_connections=args.concurrency,
+        max_keepalive_connections=args.concurrency,
+    )
+    results = {
+        'url': args.url,
+        'commit': current_commit(),
+        'concurrency': args.concurrency,
+        'duration_s': args.duration,
+        'users': args.users,
+        'todos_per_user': args.todos,
+        'scenarios': {},
+    }
+
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=args.timeout
+    ) as client:
+        try:
+            await asyncio.gather(
+                *(
+                    create_account(client, account, args.todos)
+                    for account in accounts
+                )
+            )
+            for scenario in args.scenario:
+                results['scenarios'][scenario] = await run_scenario(
+                    client, accounts, scenario, args
+                )
+        finally:
+            await asyncio.gather(
+                *(delete_account(client, account) for account in accounts)
+            )
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.load')
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument(
+        '--scenario', nargs='+', choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--warmup', type=float, default=5.0)
+    parser.add_argument('--users', type=int, default=16)
+    parser.add_argument('--todos', type=int, default=1000)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--output')
+    asyncio.run(main(parser.parse_args()))
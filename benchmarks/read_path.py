@@ -0,0 +1,145 @@
+"""Compara a montagem de páginas via ORM com o caminho por linhas.
+
+Precisa de um banco descartável em ``DATABASE_URL``: as tabelas são
+criadas se faltarem, um usuário de teste recebe ``--todos`` tarefas e é
+removido no fim. Cada rodada busca ``--concurrency`` páginas em paralelo
+e as serializa como ``GET /todos/`` faz.
+
+Uso::
+
+    python -m benchmarks.read_path [--todos 5000] [--page 100]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import tracemalloc
+from time import perf_counter
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from fast_api.loading import TODO_PUBLIC_COLUMNS
+from fast_api.models import Todo, TodoState, User, table_registry
+from fast_api.responses import TODO_LIST, json_response
+from fast_api.rows import TodoRow, fetch_rows
+from fast_api.settings import Settings
+
+
+async def fetch_orm(session, user_id, size):
+    todos = await session.scalars(
+        select(Todo)
+        .where(Todo.user_id == user_id)
+        .order_by(Todo.created_at, Todo.id)
+        .limit(size)
+    )
+    return todos.all()
+
+
+async def fetch_plain_rows(session, user_id, size):
+    return await fetch_rows(
+        session,
+        select(*TODO_PUBLIC_COLUMNS)
+        .where(Todo.user_id == user_id)
+        .order_by(Todo.created_at, Todo.id)
+        .limit(size),
+        TodoRow,
+    )
+
+
+async def page(fetch, engine, user_id, size):
+    async with AsyncSession(engine) as session:
+        todos = await fetch(session, user_id, size)
+        return json_response(TODO_LIST, {'todos': todos})
+
+
+async def retained_kib(fetch, engine, user_id, size):
+    """Memória ocupada pela página materializada, antes de serializar."""
+    async with AsyncSession(engine) as session:
+        gc.collect()
+        tracemalloc.start()
+        todos = await fetch(session, user_id, size)
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    del todos
+    return round(retained / 1024, 1)
+
+
+async def measure(fetch, engine, user_id, args):
+    await page(fetch, engine, user_id, args.page)  # aquece conexões e caches
+
+    started = perf_counter()
+    for _ in range(args.rounds):
+        await asyncio.gather(
+            *(
+                page(fetch, engine, user_id, args.page)
+                for _ in range(args.concurrency)
+            )
+        )
+    elapsed = perf_counter() - started
+
+    pages = args.rounds * args.concurrency
+    return {
+        'ms_per_page': round(elapsed / pages * 1000, 3),
+        'page_kib': await retained_kib(fetch, engine, user_id, args.page),
+    }
+
+
+async def main(args):
+    engine = create_async_engine(
+        Settings().DATABASE_URL, pool_size=args.concurrency
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    async with AsyncSession(engine) as session:
+        user_id = await session.scalar(
+            insert(User)
+            .values(
+                username='benchmark-read-path',
+                email='benchmark-read-path@example.com',
+                password='-',
+            )
+            .returning(User.id)
+        )
+        states = list(TodoState)
+        await session.execute(
+            insert(Todo),
+            [
+                {
+                    'title': f'tarefa {n}',
+                    'description': f'descrição da tarefa {n}',
+                    'state': states[n % len(states)],
+                    'user_id': user_id,
+                }
+                for n in range(args.todos)
+            ],
+        )
+        await session.commit()
+
+    try:
+        results = {
+            'orm': await measure(fetch_orm, engine, user_id, args),
+            'rows': await measure(fetch_plain_rows, engine, user_id, args),
+        }
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.execute(delete(User).where(User.id == user_id))
+            await session.commit()
+        await engine.dispose()
+
+    results['speedup'] = round(
+        results['orm']['ms_per_page'] / results['rows']['ms_per_page'], 2
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.read_path')
+    parser.add_argument('--todos', type=int, default=5000)
+    parser.add_argument('--page', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
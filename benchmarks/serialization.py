@@ -0,0 +1,98 @@
+"""Compara o caminho antigo de serialização das listas com o novo.
+
+Antigo: a rota devolve os objetos do ORM e o FastAPI valida contra o
+``response_model``, converte para tipos JSON e chama ``json.dumps``.
+Novo: ``fast_api.responses.json_response`` (uma validação e um
+``dump_json`` no pydantic-core).
+
+Uso::
+
+    python -m benchmarks.serialization [--items 100] [--rounds 2000]
+"""
+
+import argparse
+import asyncio
+import json
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from fast_api.models import Todo, TodoState
+from fast_api.responses import TODO_LIST, json_response
+from fast_api.schemas import TodoList
+
+
+def make_todos(count: int):
+    states = list(TodoState)
+    created_at = datetime(2025, 5, 20)
+    todos = []
+    for n in range(count):
+        todo = Todo(
+            title=f'tarefa {n}',
+            description=f'descrição da tarefa {n}',
+            state=states[n % len(states)],
+            user_id=1,
+        )
+        todo.id = n + 1
+        todo.created_at = created_at + timedelta(minutes=n)
+        todo.updated_at = todo.created_at
+        todos.append(todo)
+
+    return todos
+
+
+async def old_path(field, content):
+    return JSONResponse(
+        await serialize_response(field=field, response_content=content)
+    )
+
+
+def new_path(content):
+    return json_response(TODO_LIST, content)
+
+
+def timed(func, rounds: int):
+    started = perf_counter()
+    for _ in range(rounds):
+        func()
+    return (perf_counter() - started) / rounds
+
+
+def main(items: int, rounds: int):
+    content = {'todos': make_todos(items), 'next_cursor': None}
+    field = create_model_field('response', TodoList, mode='serialization')
+    loop = asyncio.new_event_loop()
+
+    old = loop.run_until_complete(old_path(field, content))
+    new = new_path(content)
+    assert json.loads(old.body) == json.loads(new.body)
+
+    old_seconds = timed(
+        lambda: loop.run_until_complete(old_path(field, content)), rounds
+    )
+    new_seconds = timed(lambda: new_path(content), rounds)
+    loop.close()
+
+    print(
+        json.dumps(
+            {
+                'items': items,
+                'rounds': rounds,
+                'old_us': round(old_seconds * 1e6, 1),
+                'new_us': round(new_seconds * 1e6, 1),
+                'speedup': round(old_seconds / new_seconds, 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.serialization')
+    parser.add_argument('--items', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+    main(args.items, args.rounds)
@@ -0,0 +1,170 @@
+"""Mede a partida a frio: import do app e primeira requisição.
+
+Para cada modo (``warm``: ``STARTUP_WARMUP`` ligado; ``cold``:
+desligado) sobe ``python -m fast_api.serve`` com um worker e mede:
+
+- ``ready_ms``: do ``spawn`` até o primeiro ``200`` de ``GET /``, que
+  não toca no banco (o ``/health/ready`` abriria uma conexão e
+  aqueceria o pool no modo ``cold``);
+- ``first_login_ms``: latência do primeiro ``POST /auth/token`` depois
+  disso, que paga conexão nova e Argon2 frio quando não houve
+  aquecimento.
+
+``import_ms`` é o tempo de ``import fast_api.app`` num processo novo.
+Precisa de um banco descartável em ``DATABASE_URL``: as tabelas são
+criadas se faltarem e o usuário de teste é removido no fim.
+
+Uso::
+
+    python -m benchmarks.startup [--runs 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter, sleep
+
+import httpx
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from fast_api.models import User, table_registry
+from fast_api.security import get_password_hash
+from fast_api.settings import Settings
+
+EMAIL = 'benchmark-startup@example.com'
+PASSWORD = 'benchmark-startup'
+IMPORT_APP = (
+    'from time import perf_counter; started = perf_counter(); '
+    'import fast_api.app; print(perf_counter() - started)'
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def import_seconds() -> float:
+    output = subprocess.run(
+        [sys.executable, '-c', IMPORT_APP],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def wait_ready(client, server, timeout: float):
+    deadline = perf_counter() + timeout
+    while perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError('Server exited before becoming ready')
+        try:
+            if client.get('/').status_code == httpx.codes.OK:
+                return
+        except httpx.TransportError:
+            pass
+        sleep(0.005)
+
+    raise TimeoutError('Server did not become ready')
+
+
+def start_once(warmup: bool, timeout: float):
+    port = free_port()
+    env = os.environ | {
+        'SERVER_HOST': '127.0.0.1',
+        'SERVER_PORT': str(port),
+        'SERVER_WORKERS': '1',
+        'STARTUP_WARMUP': str(warmup).lower(),
+    }
+
+    started = perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'fast_api.serve'],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f'http://127.0.0.1:{port}') as client:
+            wait_ready(client, server, timeout)
+            ready = perf_counter() - started
+
+            login_started = perf_counter()
+            response = client.post(
+                '/auth/token', data={'username': EMAIL, 'password': PASSWORD}
+            )
+            response.raise_for_status()
+            first_login = perf_counter() - login_started
+    finally:
+        server.terminate()
+        server.wait()
+
+    return ready, first_login
+
+
+def summarize(samples):
+    return round(median(samples) * 1000, 1)
+
+
+async def create_user(url: str):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    async with AsyncSession(engine) as session:
+        await session.execute(
+            insert(User).values(
+                username='benchmark-startup',
+                email=EMAIL,
+                password=get_password_hash(PASSWORD),
+            )
+        )
+        await session.commit()
+    await engine.dispose()
+
+
+async def delete_user(url: str):
+    engine = create_async_engine(url)
+    async with AsyncSession(engine) as session:
+        await session.execute(delete(User).where(User.email == EMAIL))
+        await session.commit()
+    await engine.dispose()
+
+
+def main(args):
+    url = Settings().DATABASE_URL
+    asyncio.run(create_user(url))
+
+    try:
+        results = {
+            'import_ms': summarize([
+                import_seconds() for _ in range(args.runs)
+            ])
+        }
+        for mode, warmup in (('warm', True), ('cold', False)):
+            ready, first_login = zip(
+                *(start_once(warmup, args.timeout) for _ in range(args.runs))
+            )
+            results[mode] = {
+                'ready_ms': summarize(ready),
+                'first_login_ms': summarize(first_login),
+            }
+    finally:
+        asyncio.run(delete_user(url))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    main(parser.parse_args())
@@ -1,5 +1,7 @@
 #!/bin/bash
+set -e
 
-poetry run alembic upgrade head
+# só chama o Alembic se faltar alguma migração
+python -m fast_api.migrate
 
-poetry run uvicorn --host 0.0.0.0 --port 8000 fast_api.app:app
\ No newline at end of file
+exec python -m fast_api.serve
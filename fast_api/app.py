@@ -1,19 +1,85 @@
 import asyncio
 import sys
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 
-from fast_api.routers import auth, todos, users
+from fast_api.compression import CompressionMiddleware
+from fast_api.database import replicas
+from fast_api.metrics import (
+    CONTENT_TYPE,
+    MetricsMiddleware,
+    MetricsStore,
+    registry,
+    render,
+)
+from fast_api.queries import QueryStatsMiddleware
+from fast_api.replicas import ReplicaPinMiddleware
+from fast_api.routers import auth, health, todos, users
 from fast_api.schemas import Message
+from fast_api.settings import get_settings
+from fast_api.startup import warm_up
+from fast_api.tracing import TracingMiddleware, tracer
 
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-app = FastAPI(title='API Atualizada!')
+settings = get_settings()
+metrics_store = (
+    MetricsStore(settings.METRICS_DIR, registry)
+    if settings.METRICS_DIR
+    else None
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.STARTUP_WARMUP:
+        await warm_up(settings.STARTUP_WARMUP_TIMEOUT)
+
+    flusher = None
+    if metrics_store is not None:
+        flusher = asyncio.create_task(
+            metrics_store.flush_periodically(settings.METRICS_FLUSH_INTERVAL)
+        )
+
+    app.state.ready = True
+    yield
+    app.state.ready = False
+
+    if flusher is not None:
+        flusher.cancel()
+        metrics_store.flush()  # o que o worker contou até sair
+
+    tracer.shutdown()
+
+
+app = FastAPI(title='API Atualizada!', lifespan=lifespan)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    levels={
+        'gzip': settings.COMPRESSION_GZIP_LEVEL,
+        'br': settings.COMPRESSION_BROTLI_LEVEL,
+        'zstd': settings.COMPRESSION_ZSTD_LEVEL,
+    },
+)
+if replicas.replicas:
+    app.add_middleware(ReplicaPinMiddleware, router=replicas)
+if settings.DEBUG or settings.QUERY_REPEAT_THRESHOLD:
+    app.add_middleware(
+        QueryStatsMiddleware,
+        headers=settings.DEBUG,
+        repeat_threshold=settings.QUERY_REPEAT_THRESHOLD,
+    )
+if tracer.enabled:
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+app.add_middleware(MetricsMiddleware)
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(todos.router)
+app.include_router(health.router)
 
 
 @app.get('/', status_code=HTTPStatus.OK, response_model=Message)
@@ -21,6 +87,16 @@ async def read_root():
     return {'message': 'Olá Mundo!'}
 
 
+@app.get('/metrics', include_in_schema=False)
+def read_metrics():
+    if metrics_store is not None:
+        snapshot = metrics_store.collect()
+    else:
+        snapshot = registry.snapshot()
+
+    return Response(render(snapshot), media_type=CONTENT_TYPE)
+
+
 # @app.get('/bem-vindo', status_code=HTTPStatus.OK, response_model=Message)
 # def welcome_roater():
 #     return {'message': 'Olá Mundo!'}
@@ -0,0 +1,303 @@
+"""Cache de respostas das rotas públicas de leitura.
+
+O backend é escolhido por ``RESPONSE_CACHE_BACKEND``:
+
+- ``memory``: LRU com TTL dentro do processo. A invalidação não chega
+  aos outros workers, então com ``SERVER_WORKERS > 1`` ele fica
+  desligado e só o ``redis`` liga o cache.
+- ``redis``: qualquer servidor que fale o protocolo do Redis (RESP),
+  compartilhado entre workers. Falhas de rede viram *miss*: o cache
+  nunca derruba a requisição.
+
+As rotas guardam o corpo já serializado junto com o ETag e invalidam a
+entrada nas escritas. ``ResponseCache`` conta hits e misses por rota.
+
+A invalidação não apaga a entrada: grava uma lápide com o mesmo TTL, e
+quem preenche o cache depois de ler o banco só grava se a chave estiver
+livre. Assim uma leitura que começou antes do commit, ou que caiu numa
+réplica atrasada, não devolve ao cache a versão que a escrita acabou de
+invalidar.
+"""
+
+import asyncio
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from time import monotonic
+from urllib.parse import unquote, urlsplit
+
+from fast_api.settings import Settings, get_settings
+
+
+class MemoryCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes):
+        if self.maxsize <= 0:
+            return
+
+        self._entries[key] = (monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def add(self, key: str, value: bytes):
+        if await self.get(key) is None:
+            await self.set(key, value)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class RedisError(Exception):
+    pass
+
+
+CACHE_ERRORS = (
+    OSError,
+    TimeoutError,
+    asyncio.IncompleteReadError,
+    RedisError,
+    ValueError,
+)
+
+
+class RedisConnection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+    async def read_reply(self):
+        line = (await self.reader.readline()).rstrip(b'\r\n')
+        if not line:
+            raise ConnectionError('Connection closed')
+
+        kind, payload = line[:1], line[1:]
+        if kind == b'+':
+            return payload
+        if kind == b'-':
+            raise RedisError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            size = int(payload)
+            if size < 0:
+                return None
+            return (await self.reader.readexactly(size + 2))[:-2]
+        if kind == b'*':
+            size = int(payload)
+            if size < 0:
+                return None
+            return [await self.read_reply() for _ in range(size)]
+
+        raise RedisError(f'Unexpected reply: {line!r}')
+
+    async def roundtrip(self, *args):
+        encoded = [
+            arg if isinstance(arg, bytes) else str(arg).encode()
+            for arg in args
+        ]
+        self.writer.write(
+            b'*%d\r\n' % len(encoded)
+            + b''.join(b'$%d\r\n%s\r\n' % (len(arg), arg) for arg in encoded)
+        )
+        await self.writer.drain()
+        return await self.read_reply()
+
+
+class RedisCache:
+    """Cliente RESP mínimo: só ``GET``, ``SET ... PX [NX]`` e ``DEL``.
+
+    Até ``pool_size`` conexões por event loop, cada uma usada por um
+    comando de cada vez. A espera por uma conexão livre conta no mesmo
+    ``timeout`` do comando: com o Redis lento a requisição desiste e vai
+    ao banco, em vez de entrar numa fila sem fim.
+    """
+
+    def __init__(
+        self, url: str, ttl: float, timeout: float = 0.5, pool_size: int = 4
+    ):
+        parts = urlsplit(url)
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.lstrip('/') or 0)
+        self.ttl = ttl
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._loop = None
+        self._slots = None
+        self._idle: list[RedisConnection] = []
+
+    async def _connect(self):
+        connection = RedisConnection(
+            *await asyncio.open_connection(self.host, self.port)
+        )
+        try:
+            if self.password:
+                await connection.roundtrip('AUTH', self.password)
+            if self.db:
+                await connection.roundtrip('SELECT', self.db)
+        except BaseException:
+            connection.close()
+            raise
+
+        return connection
+
+    def clear(self):
+        """Fecha as conexões ociosas.
+
+        As entradas ficam no servidor, que pode ser compartilhado, e
+        expiram pelo TTL.
+        """
+        for connection in self._idle:
+            connection.close()
+        self._idle.clear()
+
+    async def _command(self, *args):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self.clear()
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.pool_size)
+
+        connection = None
+        try:
+            async with asyncio.timeout(self.timeout), self._slots:
+                if self._idle:
+                    connection = self._idle.pop()
+                else:
+                    connection = await self._connect()
+                reply = await connection.roundtrip(*args)
+                self._idle.append(connection)
+                return reply
+        except CACHE_ERRORS:
+            # no meio de uma resposta a conexão não serve para mais nada
+            if connection is not None:
+                connection.close()
+            raise
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._command('GET', key)
+
+    async def set(self, key: str, value: bytes):
+        await self._command('SET', key, value, 'PX', int(self.ttl * 1000))
+
+    async def add(self, key: str, value: bytes):
+        await self._command(
+            'SET', key, value, 'PX', int(self.ttl * 1000), 'NX'
+        )
+
+    async def delete(self, key: str):
+        await self._command('DEL', key)
+
+
+# entrada invalidada; nenhum valor de verdade é vazio
+TOMBSTONE = b''
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    errors: int = 0
+
+
+class ResponseCache:
+    """Guarda ``(etag, corpo)`` por rota e chave."""
+
+    def __init__(self, backend, max_age: int):
+        self.backend = backend
+        self.max_age = max_age
+        self._stats: defaultdict[str, CacheStats] = defaultdict(CacheStats)
+
+    @property
+    def cache_control(self):
+        return f'public, max-age={self.max_age}'
+
+    async def get(self, route: str, key) -> tuple[str, bytes] | None:
+        stats = self._stats[route]
+        try:
+            value = await self.backend.get(f'{route}:{key}')
+        except CACHE_ERRORS:
+            stats.errors += 1
+            value = None
+
+        if not value:  # ausente ou lápide
+            stats.misses += 1
+            return None
+
+        stats.hits += 1
+        etag, body = value.split(b'\n', 1)
+        return etag.decode(), body
+
+    async def set(self, route: str, key, etag: str, body: bytes):
+        """Preenche a entrada, se ela não existir nem tiver lápide."""
+        try:
+            await self.backend.add(
+                f'{route}:{key}', etag.encode() + b'\n' + body
+            )
+        except CACHE_ERRORS:
+            self._stats[route].errors += 1
+
+    async def invalidate(self, route: str, key):
+        try:
+            await self.backend.set(f'{route}:{key}', TOMBSTONE)
+        except CACHE_ERRORS:
+            self._stats[route].errors += 1
+
+    def stats(self):
+        return {
+            route: {
+                'hits': stats.hits,
+                'misses': stats.misses,
+                'errors': stats.errors,
+            }
+            for route, stats in self._stats.items()
+        }
+
+    def reset_stats(self):
+        self._stats.clear()
+
+
+def create_response_cache(settings: Settings):
+    if settings.RESPONSE_CACHE_BACKEND == 'redis':
+        backend = RedisCache(
+            settings.RESPONSE_CACHE_URL, ttl=settings.RESPONSE_CACHE_TTL
+        )
+    else:
+        maxsize = settings.RESPONSE_CACHE_SIZE
+        if settings.SERVER_WORKERS > 1:
+            maxsize = 0
+
+        backend = MemoryCache(
+            maxsize=maxsize,
+            ttl=settings.RESPONSE_CACHE_TTL,
+        )
+
+    return ResponseCache(backend, max_age=settings.RESPONSE_CACHE_MAX_AGE)
+
+
+response_cache = create_response_cache(get_settings())
@@ -0,0 +1,224 @@
+"""Compressão negociada das respostas (zstd, brotli ou gzip).
+
+O middleware escolhe a codificação pelo ``Accept-Encoding`` entre as
+disponíveis: gzip sempre (``zlib``), brotli se o pacote ``brotli``
+estiver instalado e zstd com ``compression.zstd`` (Python 3.14) ou o
+pacote ``zstandard``.
+
+O corpo é acumulado até ``minimum_size`` bytes; respostas menores que
+isso (``read_root``, uma tarefa só) saem intactas, sem gastar CPU. Em
+respostas em streaming, como o export, cada pedaço é comprimido e
+descarregado na hora, então o cliente continua recebendo os dados aos
+poucos.
+"""
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int):
+        if zstd is not None:
+            self._compressor = zstd.ZstdCompressor(level)
+            self._flush_block = zstd.ZstdCompressor.FLUSH_BLOCK
+        else:
+            self._compressor = zstandard.ZstdCompressor(
+                level=level
+            ).compressobj()
+            self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            self._flush_block
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encodings():
+    """Codificações suportadas, na ordem de preferência do servidor."""
+    encodings = {}
+    if zstd is not None or zstandard is not None:
+        encodings['zstd'] = ZstdCompressor
+    if brotli is not None:
+        encodings['br'] = BrotliCompressor
+    encodings['gzip'] = GzipCompressor
+    return encodings
+
+
+def choose_encoding(accept_encoding: str, encodings) -> str | None:
+    """Maior ``q`` do cliente; empates ficam com a ordem do servidor."""
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, *params = item.strip().lower().split(';')
+        weight = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, levels=None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {'gzip': 6, 'br': 4, 'zstd': 3} | (levels or {})
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(
+            Headers(scope=scope).get('accept-encoding', ''), self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(
+            send,
+            minimum_size=self.minimum_size,
+            encoding=encoding,
+            compressor=lambda: self.encodings[encoding](self.levels[encoding]),
+        )
+        await self.app(scope, receive, responder)
+
+
+class _CompressingResponder:
+    def __init__(self, send, minimum_size, encoding, compressor):
+        self.send = send
+        self.minimum_size = minimum_size
+        self.encoding = encoding
+        self.make_compressor = compressor
+        self.start = None
+        self.buffer = []
+        self.buffered = 0
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if message['type'] == 'http.response.start':
+            self.start = message
+            headers = Headers(raw=message['headers'])
+            self.passthrough = 'content-encoding' in headers
+            return
+
+        if message['type'] != 'http.response.body':
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            await self._send_start()
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.compressor is None:
+            self.buffer.append(body)
+            self.buffered += len(body)
+            if more_body and self.buffered < self.minimum_size:
+                return
+
+            body = b''.join(self.buffer)
+            self.buffer = []
+            if not more_body and len(body) < self.minimum_size:
+                await self._send_start()
+                await self.send({
+                    'type': 'http.response.body',
+                    'body': body,
+                    'more_body': False,
+                })
+                return
+
+            self.compressor = self.make_compressor()
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+
+        # corpo inteiro numa mensagem só: o tamanho final já é conhecido
+        await self._send_start(
+            compressed=True, content_length=None if more_body else len(data)
+        )
+        await self.send({
+            'type': 'http.response.body',
+            'body': data,
+            'more_body': more_body,
+        })
+
+    async def _send_start(
+        self, compressed: bool = False, content_length: int | None = None
+    ):
+        if self.start is None:
+            return
+
+        headers = MutableHeaders(raw=self.start['headers'])
+        headers.add_vary_header('Accept-Encoding')
+        if compressed:
+            headers['Content-Encoding'] = self.encoding
+            del headers['Content-Length']
+            if content_length is not None:
+                headers['Content-Length'] = str(content_length)
+            # o ETag do corpo original não vale para o comprimido
+            if 'etag' in headers and not headers['etag'].startswith('W/'):
+                headers['ETag'] = f'W/{headers["etag"]}'
+
+        await self.send(self.start)
+        self.start = None
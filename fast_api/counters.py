@@ -0,0 +1,116 @@
+"""Contadores de tarefas por usuário e estado.
+
+Cada rota que cria, remove ou muda o estado de tarefas ajusta
+``todo_counters`` na mesma transação, então ``GET /todos/stats`` lê
+algumas linhas pela chave primária em vez de contar as tarefas.
+
+Se os contadores se desviarem (carga direta no banco, por exemplo),
+recalcule com::
+
+    python -m fast_api.counters [--user-id ID]
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_api.database import engine
+from fast_api.models import Todo, TodoCounter, TodoState
+
+
+def state_changes(changes):
+    """Soma os deltas de ``(estado antigo, estado novo)``.
+
+    ``None`` de um lado indica tarefa criada ou removida.
+    """
+    deltas = Counter()
+    for old_state, new_state in changes:
+        if old_state == new_state:
+            continue
+        if old_state is not None:
+            deltas[old_state] -= 1
+        if new_state is not None:
+            deltas[new_state] += 1
+
+    return deltas
+
+
+async def adjust_counters(session, user_id: int, deltas):
+    """Aplica ``deltas`` (estado -> variação) num único upsert."""
+    rows = [
+        {'user_id': user_id, 'state': state, 'count': delta}
+        # ordem fixa: transações concorrentes travam as linhas na mesma ordem
+        for state, delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+
+    query = insert(TodoCounter).values(rows)
+    await session.execute(
+        query.on_conflict_do_update(
+            index_elements=[TodoCounter.user_id, TodoCounter.state],
+            set_={'count': TodoCounter.count + query.excluded.count},
+        )
+    )
+
+
+async def read_counters(session, user_id: int):
+    counters = await session.execute(
+        select(TodoCounter.state, TodoCounter.count).where(
+            TodoCounter.user_id == user_id
+        )
+    )
+    states = dict.fromkeys(TodoState, 0) | dict(counters.all())
+
+    return {'total': sum(states.values()), 'states': states}
+
+
+async def rebuild_counters(session, user_id: int | None = None):
+    """Recalcula os contadores a partir de ``todos``.
+
+    A tabela fica travada contra escrita até o commit para que nenhum
+    ajuste concorrente se perca entre o ``DELETE`` e a recontagem.
+    """
+    await session.execute(
+        text('LOCK TABLE todo_counters IN SHARE ROW EXCLUSIVE MODE')
+    )
+
+    clear = delete(TodoCounter)
+    counts = select(Todo.user_id, Todo.state, func.count()).group_by(
+        Todo.user_id, Todo.state
+    )
+    if user_id is not None:
+        clear = clear.where(TodoCounter.user_id == user_id)
+        counts = counts.where(Todo.user_id == user_id)
+
+    await session.execute(clear)
+    rebuilt = await session.scalars(
+        insert(TodoCounter)
+        .from_select(['user_id', 'state', 'count'], counts)
+        .returning(TodoCounter.user_id)
+    )
+
+    return len(rebuilt.all())
+
+
+async def main(user_id: int | None = None):  # pragma: no cover
+    async with AsyncSession(engine) as session:
+        rebuilt = await rebuild_counters(session, user_id)
+        await session.commit()
+
+    await engine.dispose()
+    print(f'Rebuilt {rebuilt} todo counters')
+
+
+if __name__ == '__main__':  # pragma: no cover
+    parser = argparse.ArgumentParser(
+        prog='python -m fast_api.counters',
+        description='Recalcula todo_counters a partir de todos.',
+    )
+    parser.add_argument('--user-id', type=int, default=None)
+    asyncio.run(main(parser.parse_args().user_id))
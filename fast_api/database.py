@@ -1,10 +1,177 @@
+from contextlib import asynccontextmanager
+from time import perf_counter
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from fast_api.metrics import family, registry
+from fast_api.replicas import ReplicaRouter
+from fast_api.settings import Settings, get_settings
+from fast_api.statements import watch_statements
+from fast_api.tracing import traced
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, seconds: float):
+        self.checkouts += 1
+        self.wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+
+class MonitoredPoolMixin:
+    """Mede quanto tempo cada checkout espera por uma conexão."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.record(perf_counter() - started)
+
+
+class MonitoredQueuePool(MonitoredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class MonitoredNullPool(MonitoredPoolMixin, NullPool):
+    pass
+
+
+def create_engine(settings: Settings):
+    return watch_statements(
+        _create_engine(settings), slow_seconds=settings.SLOW_QUERY_SECONDS
+    )
+
 
-from fast_api.settings import Settings
+def _create_engine(settings: Settings):
+    if settings.DATABASE_POOL_MODE == 'external':
+        # Atrás do PgBouncer em modo transaction quem faz o pool é ele:
+        # cada checkout abre uma conexão barata com o PgBouncer e a sessão
+        # só a segura até o fim da transação. Prepared statements
+        # automáticos do psycopg ficariam presos a uma conexão do servidor
+        # que a próxima transação talvez não receba, então são desligados.
+        # O PgBouncer também recusa o parâmetro ``options``; o
+        # statement_timeout deve ser configurado no role do banco.
+        return create_async_engine(
+            settings.DATABASE_URL,
+            poolclass=MonitoredNullPool,
+            connect_args={'prepare_threshold': None},
+        )
 
-engine = create_async_engine(Settings().DATABASE_URL)
+    connect_args = {}
+    if settings.DATABASE_STATEMENT_TIMEOUT:
+        connect_args['options'] = (
+            f'-c statement_timeout={settings.DATABASE_STATEMENT_TIMEOUT}'
+        )
 
+    return create_async_engine(
+        settings.DATABASE_URL,
+        poolclass=MonitoredQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
 
+
+def pool_stats(engine):
+    pool = engine.pool
+    queue_pool = isinstance(pool, AsyncAdaptedQueuePool)
+    return {
+        'size': pool.size() if queue_pool else 0,
+        'checked_in': pool.checkedin() if queue_pool else 0,
+        'checked_out': pool.checkedout() if queue_pool else 0,
+        'overflow': pool.overflow() if queue_pool else 0,
+        'checkouts': pool.stats.checkouts,
+        'timeouts': pool.stats.timeouts,
+        'wait_seconds': pool.stats.wait_seconds,
+        'max_wait_seconds': pool.stats.max_wait_seconds,
+    }
+
+
+settings = get_settings()
+engine = create_engine(settings)
+replicas = ReplicaRouter(
+    engine,
+    [
+        create_engine(settings.model_copy(update={'DATABASE_URL': url}))
+        for url in settings.DATABASE_REPLICA_URLS
+    ],
+    strategy=settings.DATABASE_REPLICA_STRATEGY,
+    pin_seconds=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+)
+
+# campo de ``pool_stats`` -> (métrica, tipo, descrição)
+POOL_METRICS = {
+    'size': ('db_pool_size', 'gauge', 'Connections kept by the pool.'),
+    'checked_in': ('db_pool_checked_in', 'gauge', 'Idle connections.'),
+    'checked_out': ('db_pool_checked_out', 'gauge', 'Connections in use.'),
+    'overflow': ('db_pool_overflow', 'gauge', 'Connections beyond size.'),
+    'checkouts': ('db_pool_checkouts_total', 'counter', 'Checkouts.'),
+    'timeouts': (
+        'db_pool_timeouts_total',
+        'counter',
+        'Checkouts that timed out waiting for a connection.',
+    ),
+    'wait_seconds': (
+        'db_pool_wait_seconds_total',
+        'counter',
+        'Time spent waiting for a connection.',
+    ),
+}
+
+
+@registry.collector
+def collect_pool_metrics():
+    engines = {'primary': replicas.primary} | {
+        f'replica-{n}': replica for n, replica in enumerate(replicas.replicas)
+    }
+    stats = {name: pool_stats(engine) for name, engine in engines.items()}
+
+    return {
+        name: family(
+            kind,
+            documentation,
+            ('pool',),
+            [[[pool], values[field]] for pool, values in stats.items()],
+        )
+        for field, (name, kind, documentation) in POOL_METRICS.items()
+    }
+
+
+@traced('get_session')
 async def get_session():  # pragma: no cover
     async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
+
+
+@asynccontextmanager
+async def read_session(user_id: int | None = None):
+    """Sessão para rotas somente leitura, numa réplica quando possível."""
+    async with AsyncSession(
+        replicas.engine_for(user_id), expire_on_commit=False
+    ) as session:
+        yield session
+
+
+@traced('get_read_session')
+async def get_read_session(user_id: int):
+    """Sessão de leitura para rotas com ``{user_id}`` no caminho."""
+    async with read_session(user_id) as session:
+        yield session
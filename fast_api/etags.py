@@ -0,0 +1,62 @@
+"""GETs condicionais com ``ETag`` / ``If-None-Match``.
+
+A lista de tarefas de um usuário tem uma versão (``users.todos_version``)
+que toda escrita em ``todos`` incrementa na mesma transação. O ETag da
+lista combina essa versão com os filtros pedidos, então basta ler um inteiro
+pela chave primária para saber se o cliente já tem a resposta; nesse
+caso devolvemos ``304`` sem rodar a consulta da lista nem serializar
+nada. O ETag de um usuário vem do seu ``updated_at``.
+"""
+
+from hashlib import blake2b
+from http import HTTPStatus
+
+from fastapi import Response
+from sqlalchemy import select, update
+
+from fast_api.models import User
+
+
+def make_etag(*parts) -> str:
+    digest = blake2b(
+        '\x1f'.join(map(str, parts)).encode(), digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Comparação fraca, como pede o ``If-None-Match``."""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    return any(
+        tag.strip().removeprefix('W/') == etag.removeprefix('W/')
+        for tag in if_none_match.split(',')
+    )
+
+
+def not_modified(etag: str, headers: dict | None = None) -> Response:
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED,
+        headers={'ETag': etag} | (headers or {}),
+    )
+
+
+async def bump_todos_version(session, user_id: int):
+    await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        # a versão das tarefas não é uma alteração do usuário
+        .values(
+            todos_version=User.todos_version + 1, updated_at=User.updated_at
+        )
+    )
+
+
+async def read_todos_version(session, user_id: int) -> int:
+    return await session.scalar(
+        select(User.todos_version).where(User.id == user_id)
+    )
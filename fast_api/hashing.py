@@ -0,0 +1,85 @@
+"""Executor limitado para as chamadas do Argon2.
+
+Hash e verificação levam dezenas de milissegundos; rodando direto nas
+rotas ``async`` eles travam o event loop do worker. Aqui as chamadas vão
+para um pool de threads (o argon2-cffi libera o GIL) com no máximo
+``max_workers`` execuções simultâneas e ``queue_limit`` esperando. Com a
+fila cheia a requisição falha na hora com 503 em vez de acumular
+latência.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from time import perf_counter
+
+from fastapi import HTTPException
+
+
+class HashingExecutor:
+    def __init__(self, max_workers: int, queue_limit: int):
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='argon2'
+        )
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    @property
+    def in_flight(self):
+        return min(self.pending, self.max_workers)
+
+    @property
+    def queued(self):
+        return max(self.pending - self.max_workers, 0)
+
+    async def run(self, func, *args):
+        if self.pending >= self.max_workers + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail='Server busy, try again later',
+                headers={'Retry-After': '1'},
+            )
+
+        def timed():
+            started = perf_counter()
+            result = func(*args)
+            return result, started, perf_counter()
+
+        self.pending += 1
+        submitted = perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(
+                self._executor, timed
+            )
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.wait_seconds += started - submitted
+        self.run_seconds += finished - started
+
+        return result
+
+    async def warm_up(self, func, *args):
+        """Roda ``func`` uma vez no pool, fora das estatísticas."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, func, *args)
+
+    def stats(self):
+        return {
+            'max_workers': self.max_workers,
+            'queue_limit': self.queue_limit,
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'wait_seconds': self.wait_seconds,
+            'run_seconds': self.run_seconds,
+        }
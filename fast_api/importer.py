@@ -0,0 +1,174 @@
+"""Importação em massa de tarefas via ``COPY``.
+
+O corpo da requisição é lido aos pedaços: cada linha (ou registro CSV)
+é validada por ``TodoSchema`` assim que chega, as válidas se acumulam em
+lotes e cada lote vai para o banco com o protocolo ``COPY`` do psycopg.
+Linhas inválidas são contadas e reportadas sem interromper a importação.
+"""
+
+import codecs
+import csv
+import json
+
+from pydantic import ValidationError
+
+from fast_api.schemas import FileFormat, TodoSchema
+from fast_api.statements import measure_statement
+
+COPY_TODOS = 'COPY todos (title, description, state, user_id) FROM STDIN'
+LINE_TOO_LONG = 'Line too long'
+
+
+class _PendingLine:
+    """Pedaços da linha ainda sem ``\\n``, limitados a ``max_length``.
+
+    Passado o limite, o conteúdo é descartado e a linha inteira vira um
+    erro quando terminar.
+    """
+
+    def __init__(self, max_length: int):
+        self.max_length = max_length
+        self._reset()
+
+    def _reset(self):
+        self.parts, self.size, self.too_long = [], 0, False
+
+    def add(self, text: str):
+        self.size += len(text)
+        if self.too_long:
+            return
+        if self.size > self.max_length:
+            self.parts, self.too_long = [], True
+        else:
+            self.parts.append(text)
+
+    def take(self) -> str | None:
+        line, too_long = ''.join(self.parts), self.too_long
+        self._reset()
+        return None if too_long else line.removesuffix('\r')
+
+    def __bool__(self):
+        return self.size > 0
+
+
+async def _lines(chunks, max_length: int):
+    """Gera ``(número, linha)``; ``linha`` é ``None`` se passar do limite.
+
+    Só o texto recém-decodificado é dividido, então cada byte é visto
+    uma vez e no máximo ``max_length`` caracteres ficam pendentes.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = _PendingLine(max_length)
+    number = 0
+
+    async for chunk in chunks:
+        *complete, rest = decoder.decode(chunk).split('\n')
+        for piece in complete:
+            pending.add(piece)
+            number += 1
+            yield number, pending.take()
+        pending.add(rest)
+
+    pending.add(decoder.decode(b'', final=True))
+    if pending:
+        yield number + 1, pending.take()
+
+
+async def _ndjson_records(lines):
+    async for number, line in lines:
+        if line is None:
+            yield number, None, LINE_TOO_LONG
+            continue
+
+        if not line.strip():
+            continue
+
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            yield number, None, 'Invalid JSON'
+            continue
+
+        if not isinstance(data, dict):
+            yield number, None, 'Expected a JSON object'
+            continue
+
+        yield number, data, None
+
+
+async def _csv_records(lines):
+    header = None
+    record, start = [], None
+
+    async for number, line in lines:
+        if line is None:
+            # o registro em andamento se perde junto com a linha
+            yield start or number, None, LINE_TOO_LONG
+            record, start = [], None
+            continue
+
+        if not record and not line.strip():
+            continue
+
+        record.append(line)
+        start = start or number
+        # aspas ímpares: o campo continua na próxima linha
+        if sum(part.count('"') for part in record) % 2:
+            continue
+
+        values = next(csv.reader(['\n'.join(record)]))
+        record, line_number, start = [], start, None
+
+        if header is None:
+            header = values
+        elif len(values) != len(header):
+            yield line_number, None, f'Expected {len(header)} columns'
+        else:
+            yield line_number, dict(zip(header, values)), None
+
+    if record:
+        yield start, None, 'Unterminated quoted field'
+
+
+RECORD_READERS = {
+    FileFormat.ndjson: _ndjson_records,
+    FileFormat.csv: _csv_records,
+}
+
+
+def _validation_detail(exc: ValidationError):
+    return '; '.join(
+        f'{".".join(map(str, error["loc"]))}: {error["msg"]}'
+        for error in exc.errors(include_url=False)
+    )
+
+
+async def read_todos(chunks, file_format: FileFormat, max_line_length: int):
+    """Gera ``(linha, TodoSchema | None, erro | None)`` para cada registro."""
+    records = RECORD_READERS[file_format](_lines(chunks, max_line_length))
+
+    async for number, data, error in records:
+        if error:
+            yield number, None, error
+            continue
+
+        try:
+            yield number, TodoSchema.model_validate(data), None
+        except ValidationError as exc:
+            yield number, None, _validation_detail(exc)
+
+
+async def copy_todos(session, rows, slow_seconds: float = 0.0):
+    """Grava ``rows`` com ``COPY`` na transação da sessão."""
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+
+    async with (
+        measure_statement(COPY_TODOS, slow_seconds),
+        raw_connection.driver_connection.cursor() as cursor,
+        cursor.copy(COPY_TODOS) as copy,
+    ):
+        for row in rows:
+            await copy.write_row(row)
+
+    return len(rows)
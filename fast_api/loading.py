@@ -0,0 +1,40 @@
+"""Estratégias de carregamento usadas pelas rotas.
+
+Nenhum relacionamento é carregado implicitamente (``lazy='raise'`` nos
+models); cada consulta declara aqui exatamente as colunas e
+relacionamentos de que precisa. As colunas públicas seguem a ordem dos
+campos das linhas de ``fast_api.rows``.
+"""
+
+from sqlalchemy.orm import load_only, raiseload
+
+from fast_api.models import Todo, User
+
+# Usuário autenticado: só o que vai para o ``Principal``.
+PRINCIPAL_COLUMNS = (User.id, User.username, User.email)
+
+# Campos expostos por ``UserPublic`` (``created_at`` monta o cursor e
+# ``updated_at`` o ETag).
+USER_PUBLIC_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.created_at,
+    User.updated_at,
+)
+
+# Login só precisa comparar o hash e montar o ``sub`` do token.
+USER_CREDENTIALS = (
+    load_only(User.id, User.email, User.password),
+    raiseload('*'),
+)
+
+# Campos expostos por ``TodoPublic`` (o ``user_id`` só é filtrado).
+TODO_PUBLIC_COLUMNS = (
+    Todo.id,
+    Todo.title,
+    Todo.description,
+    Todo.state,
+    Todo.created_at,
+    Todo.updated_at,
+)
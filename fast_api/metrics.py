@@ -0,0 +1,373 @@
+"""Métricas no formato de texto do Prometheus (``GET /metrics``).
+
+Contadores e histogramas ficam em memória no processo e são atualizados
+com um lock, pois o Argon2 roda em threads. Valores que já existem em
+outro lugar (pool de conexões, fila do Argon2) são lidos na hora da
+coleta por *collectors*.
+
+Com vários workers, cada um grava um snapshot em
+``METRICS_DIR/worker-<pid>.json`` a cada ``METRICS_FLUSH_INTERVAL``
+segundos e no desligamento. O worker que atende o scrape soma os
+arquivos de todos: contadores e histogramas de todos os processos,
+gauges só dos vivos. Os contadores de workers mortos (reciclados, por
+exemplo) são incorporados a ``archive.json`` e o arquivo deles é
+apagado. O diretório compartilhado só funciona em POSIX.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from http import HTTPStatus
+from math import inf
+from pathlib import Path
+from time import perf_counter
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.25, 1)
+HASHING_BUCKETS = (0.025, 0.05, 0.1, 0.2, 0.4, 0.8, 1.6)
+
+
+def family(kind, documentation, labelnames, samples, buckets=None):
+    """Uma métrica serializável: ``samples`` é ``[[rótulos], valor]``."""
+    entry = {
+        'kind': kind,
+        'help': documentation,
+        'labels': list(labelnames),
+        'samples': samples,
+    }
+    if buckets is not None:
+        entry['buckets'] = list(buckets)
+    return entry
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] += amount
+
+    def collect(self):
+        with self._lock:
+            samples = [[list(k), v] for k, v in self._values.items()]
+        return family('counter', self.documentation, self.labelnames, samples)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Contagem por faixa (não cumulativa) seguida da soma observada."""
+
+    def __init__(
+        self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = [0] * (len(self.buckets) + 1) + [0.0]
+                self._values[labels] = entry
+            entry[index] += 1
+            entry[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - started, *labels)
+
+    def collect(self):
+        with self._lock:
+            samples = [[list(k), list(v)] for k, v in self._values.items()]
+        return family(
+            'histogram',
+            self.documentation,
+            self.labelnames,
+            samples,
+            buckets=self.buckets,
+        )
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        self._metrics[name] = Counter(name, documentation, labelnames)
+        return self._metrics[name]
+
+    def histogram(self, name, documentation, labelnames=(), **kwargs):
+        self._metrics[name] = Histogram(
+            name, documentation, labelnames, **kwargs
+        )
+        return self._metrics[name]
+
+    def collector(self, func):
+        """Registra ``func() -> {nome: family(...)}``, chamada na coleta."""
+        self._collectors.append(func)
+        return func
+
+    def snapshot(self):
+        snapshot = {
+            name: metric.collect() for name, metric in self._metrics.items()
+        }
+        for collector in self._collectors:
+            snapshot.update(collector())
+        return snapshot
+
+    def clear(self):
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+def merge(target, snapshot, gauges: bool = True):
+    """Soma ``snapshot`` em ``target``, amostra por amostra."""
+    for name, entry in snapshot.items():
+        if entry['kind'] == 'gauge' and not gauges:
+            continue
+
+        merged = target.setdefault(name, {**entry, 'samples': []})
+        samples = {tuple(labels): value for labels, value in merged['samples']}
+        for labels, value in entry['samples']:
+            key = tuple(labels)
+            current = samples.get(key)
+            if current is None:
+                samples[key] = value
+            elif entry['kind'] == 'histogram':
+                samples[key] = [a + b for a, b in zip(current, value)]
+            else:
+                samples[key] = current + value
+        merged['samples'] = [[list(k), v] for k, v in samples.items()]
+
+    return target
+
+
+def _escape(value) -> str:
+    return (
+        str(value)
+        .replace('\\', r'\\')
+        .replace('\n', r'\n')
+        .replace('"', r'\"')
+    )
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _number(value) -> str:
+    if value == inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+def render(snapshot) -> str:
+    lines = []
+    for name, entry in sorted(snapshot.items()):
+        lines.append(f'# HELP {name} {entry["help"]}')
+        lines.append(f'# TYPE {name} {entry["kind"]}')
+        for labels, value in entry['samples']:
+            pairs = list(zip(entry['labels'], labels))
+            if entry['kind'] != 'histogram':
+                lines.append(f'{name}{_labels(pairs)} {_number(value)}')
+                continue
+
+            cumulative = 0
+            for bound, count in zip([*entry['buckets'], inf], value[:-1]):
+                cumulative += count
+                le = _labels([*pairs, ('le', _number(bound))])
+                lines.append(f'{name}_bucket{le} {cumulative}')
+            lines.append(f'{name}_sum{_labels(pairs)} {_number(value[-1])}')
+            lines.append(f'{name}_count{_labels(pairs)} {cumulative}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def _alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # pragma: no cover - existe, de outro usuário
+        return True
+    return True
+
+
+class MetricsStore:
+    """Snapshots dos workers num diretório compartilhado."""
+
+    def __init__(self, directory, registry: Registry):
+        self.directory = Path(directory)
+        self.registry = registry
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def path(self):
+        return self.directory / f'worker-{os.getpid()}.json'
+
+    def flush(self):
+        temporary = self.path.with_suffix('.tmp')
+        temporary.write_text(
+            json.dumps(self.registry.snapshot()), encoding='utf-8'
+        )
+        temporary.replace(self.path)
+
+    async def flush_periodically(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.flush()
+
+    @contextmanager
+    def _locked(self):
+        with open(self.directory / '.lock', 'w', encoding='utf-8') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def collect(self):
+        self.flush()
+        archive_path = self.directory / 'archive.json'
+        with self._locked():
+            archive = {}
+            if archive_path.exists():
+                archive = json.loads(archive_path.read_text(encoding='utf-8'))
+
+            merged, dead = {}, []
+            for path in sorted(self.directory.glob('worker-*.json')):
+                pid = int(path.stem.removeprefix('worker-'))
+                try:
+                    snapshot = json.loads(path.read_text(encoding='utf-8'))
+                except (OSError, ValueError):
+                    continue
+                if _alive(pid):
+                    merge(merged, snapshot)
+                else:
+                    merge(archive, snapshot, gauges=False)
+                    dead.append(path)
+
+            if dead:
+                temporary = archive_path.with_suffix('.tmp')
+                temporary.write_text(json.dumps(archive), encoding='utf-8')
+                temporary.replace(archive_path)
+                for path in dead:
+                    path.unlink()
+
+        return merge(merged, archive)
+
+
+def reset_directory(directory):
+    """Apaga os snapshots de uma execução anterior."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in directory.glob('*.json'):
+        path.unlink()
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.counter(
+    'http_requests_total',
+    'HTTP requests by route and status code.',
+    ('method', 'route', 'status'),
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by route.',
+    ('method', 'route'),
+)
+DB_STATEMENT_SECONDS = registry.histogram(
+    'db_statement_duration_seconds',
+    'Database statement execution time.',
+    ('operation',),
+    buckets=STATEMENT_BUCKETS,
+)
+DB_STATEMENT_ERRORS = registry.counter(
+    'db_statement_errors_total',
+    'Database statements that raised an error.',
+    ('operation',),
+)
+PASSWORD_HASHING_SECONDS = registry.histogram(
+    'password_hashing_duration_seconds',
+    'Argon2 hash and verify time.',
+    ('operation',),
+    buckets=HASHING_BUCKETS,
+)
+
+OPERATIONS = frozenset({'SELECT', 'INSERT', 'UPDATE', 'DELETE'})
+
+
+def statement_operation(statement: str) -> str:
+    """Primeira palavra do SQL, agrupando o resto em ``OTHER``."""
+    keyword = statement.lstrip()[:6].upper()
+    if keyword in OPERATIONS:
+        return keyword
+    return 'WITH' if keyword.startswith('WITH') else 'OTHER'
+
+
+class MetricsMiddleware:
+    """Conta requisições e mede a latência pelo caminho da rota."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = HTTPStatus.INTERNAL_SERVER_ERROR.value
+        started = perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # o caminho com parâmetros: a rota, não o valor de cada id
+            route = scope.get('route')
+            path = getattr(route, 'path', 'unmatched')
+            HTTP_REQUEST_SECONDS.observe(
+                perf_counter() - started, scope['method'], path
+            )
+            HTTP_REQUESTS.inc(scope['method'], path, str(status))
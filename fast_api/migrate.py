@@ -0,0 +1,71 @@
+"""Roda ``alembic upgrade head`` só quando o banco está atrás.
+
+Com o banco já no head, ``alembic upgrade head`` continua carregando o
+``env.py`` e conectando pelo Alembic só para descobrir que não há nada a
+fazer, e isso atrasa toda partida a frio. Aqui uma única consulta a
+``alembic_version`` é comparada com os heads dos scripts, e o Alembic só
+entra em cena quando falta alguma migração.
+
+Uso::
+
+    python -m fast_api.migrate [--config alembic.ini]
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+from fast_api.database import create_engine
+from fast_api.settings import Settings, get_settings
+
+
+def script_heads(config: Config) -> set[str]:
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+async def database_revisions(settings: Settings) -> set[str]:
+    """Revisões gravadas no banco; vazio se ele nunca foi migrado."""
+    engine = create_engine(settings)
+    try:
+        async with engine.connect() as connection:
+            revisions = await connection.scalars(
+                text('SELECT version_num FROM alembic_version')
+            )
+            return set(revisions)
+    except ProgrammingError:  # a tabela alembic_version ainda não existe
+        return set()
+    finally:
+        await engine.dispose()
+
+
+def migrate(config: Config, settings: Settings) -> bool:
+    """Aplica o que falta; ``False`` se o banco já estava no head."""
+    if asyncio.run(database_revisions(settings)) == script_heads(config):
+        return False
+
+    command.upgrade(config, 'head')
+    return True
+
+
+def main(config_file: str):  # pragma: no cover
+    started = perf_counter()
+    upgraded = migrate(Config(config_file), get_settings())
+    elapsed = (perf_counter() - started) * 1000
+
+    status = 'Migrated to head' if upgraded else 'Database already at head'
+    print(f'{status} in {elapsed:.0f} ms')
+
+
+if __name__ == '__main__':  # pragma: no cover
+    parser = argparse.ArgumentParser(
+        prog='python -m fast_api.migrate',
+        description='Aplica as migrações só se o banco estiver atrás.',
+    )
+    parser.add_argument('--config', default='alembic.ini')
+    main(parser.parse_args().config)
@@ -1,11 +1,28 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Computed,
+    ForeignKey,
+    Index,
+    event,
+    func,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
 
 table_registry = registry()
 
+# Os índices de busca por substring usam operadores do pg_trgm.
+event.listen(
+    table_registry.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'),
+)
+
 
 class TodoState(str, Enum):
     draft = 'draft'
@@ -18,6 +35,7 @@ class TodoState(str, Enum):
 @table_registry.mapped_as_dataclass
 class User:
     __tablename__ = 'users'
+    __table_args__ = (Index('ix_users_created_at_id', 'created_at', 'id'),)
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     username: Mapped[str] = mapped_column(unique=True)
@@ -29,24 +47,91 @@ class User:
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+    # incrementada a cada escrita em ``todos`` (ETag da lista)
+    todos_version: Mapped[int] = mapped_column(
+        BigInteger, init=False, default=0, server_default='0'
+    )
     todos: Mapped[list['Todo']] = relationship(
-        init=False, cascade='all, delete-orphan', lazy='selectin'
+        init=False,
+        cascade='all, delete-orphan',
+        lazy='raise',
+        passive_deletes=True,
     )
 
 
 @table_registry.mapped_as_dataclass
 class Todo:
     __tablename__ = 'todos'
+    __mapper_args__ = {'eager_defaults': True}
+    __table_args__ = (
+        Index('ix_todos_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        Index(
+            'ix_todos_user_id_state_created_at_id',
+            'user_id',
+            'state',
+            'created_at',
+            'id',
+        ),
+        Index(
+            'ix_todos_title_trgm',
+            'title',
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+        ),
+        Index(
+            'ix_todos_description_trgm',
+            'description',
+            postgresql_using='gin',
+            postgresql_ops={'description': 'gin_trgm_ops'},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     title: Mapped[str]
     description: Mapped[str]
     state: Mapped[TodoState]
 
-    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE')
+    )
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+
+
+@table_registry.mapped_as_dataclass
+class TodoCounter:
+    """Quantas tarefas cada usuário tem em cada estado."""
+
+    __tablename__ = 'todo_counters'
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE'), primary_key=True
+    )
+    state: Mapped[TodoState] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(default=0, server_default='0')
+
+
+# Colunas de busca geradas pelo banco. Ficam só na tabela, fora do
+# mapeamento, para nunca serem carregadas (nem pelo RETURNING do INSERT).
+todo_title_search = Column(
+    'title_search',
+    TSVECTOR,
+    Computed("to_tsvector('simple', title)", persisted=True),
+)
+todo_description_search = Column(
+    'description_search',
+    TSVECTOR,
+    Computed("to_tsvector('simple', description)", persisted=True),
+)
+Todo.__table__.append_column(todo_title_search)
+Todo.__table__.append_column(todo_description_search)
+Index('ix_todos_title_search', todo_title_search, postgresql_using='gin')
+Index(
+    'ix_todos_description_search',
+    todo_description_search,
+    postgresql_using='gin',
+)
@@ -0,0 +1,57 @@
+"""Paginação por cursor (keyset) sobre ``(created_at, id)``.
+
+O cursor é opaco para o cliente: é a posição da última linha da página
+codificada em base64. Buscar a próxima página vira um
+``WHERE (created_at, id) > (...)`` servido pelo índice composto, em vez
+de um ``OFFSET`` que lê e descarta todas as linhas anteriores.
+"""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), id]).encode()
+    return urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        created_at, id = json.loads(urlsafe_b64decode(cursor + padding))
+        return datetime.fromisoformat(created_at), int(id)
+    except (Base64Error, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def paginate(query, model, page):
+    """Ordena de forma estável e aplica o modo de paginação pedido.
+
+    Busca uma linha a mais que ``page.limit`` para saber se existe uma
+    próxima página; ``page_results`` descarta essa linha.
+    """
+    query = query.order_by(model.created_at, model.id)
+
+    if page.cursor:
+        created_at, id = decode_cursor(page.cursor)
+        query = query.where(
+            tuple_(model.created_at, model.id) > tuple_(created_at, id)
+        )
+    else:
+        query = query.offset(page.offset)
+
+    return query.limit(page.limit + 1)
+
+
+def page_results(rows, page):
+    rows = list(rows)
+    if len(rows) <= page.limit or page.limit == 0:
+        return rows[: page.limit], None
+
+    rows = rows[: page.limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,72 @@
+"""Cache em memória dos usuários autenticados.
+
+``get_current_user`` roda em toda rota protegida; em vez de buscar o
+``User`` a cada requisição, guardamos um ``Principal`` enxuto por
+``sub`` do token. O cache é por processo: ``update_user`` e
+``delete_user`` invalidam a entrada só no worker que atendeu a escrita.
+Com mais de um worker os outros seguiriam autenticando um usuário
+removido até o TTL (e as escritas dele cairiam numa violação de chave
+estrangeira), então ``create_principal_cache`` desliga o cache.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+
+from fast_api.settings import Settings
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: int
+    username: str
+    email: str
+
+
+class PrincipalCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Principal]] = (
+            OrderedDict()
+        )
+
+    def get(self, subject: str) -> Principal | None:
+        entry = self._entries.get(subject)
+        if entry is None:
+            return None
+
+        expires_at, principal = entry
+        if expires_at <= monotonic():
+            del self._entries[subject]
+            return None
+
+        self._entries.move_to_end(subject)
+        return principal
+
+    def set(self, subject: str, principal: Principal):
+        if self.maxsize <= 0:
+            return
+
+        self._entries[subject] = (monotonic() + self.ttl, principal)
+        self._entries.move_to_end(subject)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str):
+        self._entries.pop(subject, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def create_principal_cache(settings: Settings) -> PrincipalCache:
+    maxsize = settings.PRINCIPAL_CACHE_SIZE
+    if settings.SERVER_WORKERS > 1:
+        maxsize = 0
+
+    return PrincipalCache(maxsize=maxsize, ttl=settings.PRINCIPAL_CACHE_TTL)
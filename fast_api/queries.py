@@ -0,0 +1,112 @@
+"""Consultas por requisição: contagem, tempo no banco e repetições.
+
+Os listeners de ``fast_api.statements`` entregam cada statement medido a
+``statement_finished``. Dentro de uma requisição (aberta pelo
+``QueryStatsMiddleware``) o statement entra na conta dela; em qualquer
+caso, os que passam de ``SLOW_QUERY_SECONDS`` vão para o log.
+
+No fim da requisição, um mesmo SQL executado ``QUERY_REPEAT_THRESHOLD``
+vezes ou mais é registrado como suspeita de N+1: o texto é o mesmo, só
+mudam os parâmetros, como num lazy load dentro de um laço. Com ``DEBUG``
+a resposta também leva ``X-DB-Queries`` e ``Server-Timing``
+(``db;dur=<ms>``), que o DevTools do navegador mostra na aba Timing.
+"""
+
+import logging
+from collections import Counter
+from contextvars import ContextVar
+
+logger = logging.getLogger('uvicorn.error')
+
+MAX_LOGGED_STATEMENT = 1000
+
+_current: ContextVar['RequestQueries | None'] = ContextVar(
+    'queries', default=None
+)
+
+
+class RequestQueries:
+    __slots__ = ('count', 'seconds', 'statements')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int):
+        """Statements executados ao menos ``threshold`` vezes."""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+def statement_finished(statement: str, seconds: float, slow_seconds: float):
+    queries = _current.get()
+    if queries is not None:
+        queries.record(statement, seconds)
+
+    if slow_seconds and seconds >= slow_seconds:
+        logger.warning(
+            'Slow query (%.1f ms): %s',
+            seconds * 1000,
+            statement[:MAX_LOGGED_STATEMENT],
+        )
+
+
+def server_timing(queries: RequestQueries) -> str:
+    return (
+        f'db;dur={queries.seconds * 1000:.1f};desc="{queries.count} queries"'
+    )
+
+
+class QueryStatsMiddleware:
+    """Abre a contagem da requisição e a relata ao final."""
+
+    def __init__(self, app, headers: bool = False, repeat_threshold: int = 0):
+        self.app = app
+        self.headers = headers
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+
+        async def send_with_headers(message):
+            # só o que rodou até o início da resposta entra nos headers
+            if message['type'] == 'http.response.start':
+                message['headers'] = [
+                    *message.get('headers', []),
+                    (b'x-db-queries', str(queries.count).encode()),
+                    (b'server-timing', server_timing(queries).encode()),
+                ]
+            await send(message)
+
+        token = _current.set(queries)
+        try:
+            await self.app(
+                scope, receive, send_with_headers if self.headers else send
+            )
+        finally:
+            _current.reset(token)
+            if self.repeat_threshold:
+                self.report_repeated(scope, queries)
+
+    def report_repeated(self, scope, queries: RequestQueries):
+        for statement, count in queries.repeated(self.repeat_threshold):
+            logger.warning(
+                'Possible N+1: statement ran %d times in %s %s: %s',
+                count,
+                scope['method'],
+                scope['path'],
+                statement[:MAX_LOGGED_STATEMENT],
+            )
@@ -0,0 +1,156 @@
+"""Roteamento das leituras para réplicas do banco.
+
+Rotas somente leitura pedem uma sessão a ``ReplicaRouter.engine_for``,
+que escolhe uma réplica por round-robin ou pela que tem menos conexões
+em uso. Depois que um usuário escreve, as leituras dele ficam presas ao
+primário por alguns segundos para não enxergar uma réplica atrasada.
+
+O pin fica em dois lugares: na memória do worker que atendeu a escrita,
+por usuário, e no cookie ``db_primary_until`` que o
+``ReplicaPinMiddleware`` devolve ao cliente. Com vários workers (ou
+máquinas) a próxima leitura pode cair em outro processo, que não viu a
+escrita; o cookie leva junto o prazo (epoch) e qualquer worker o
+respeita. Clientes sem cookies só contam com o pin do próprio worker.
+"""
+
+from contextvars import ContextVar
+from itertools import count
+from math import ceil
+from time import monotonic, time
+
+from starlette.requests import HTTPConnection
+
+STRATEGIES = ('round_robin', 'least_loaded')
+PRUNE_THRESHOLD = 1024
+PIN_COOKIE = 'db_primary_until'
+
+_request_pin: ContextVar['RequestPin | None'] = ContextVar(
+    'replica_pin', default=None
+)
+
+
+class RequestPin:
+    """Até quando (epoch) o cliente da requisição lê do primário."""
+
+    __slots__ = ('changed', 'until')
+
+    def __init__(self, until: float = 0.0):
+        self.until = until
+        self.changed = False
+
+
+def _checked_out(engine):
+    # NullPool (modo ``external``) não sabe quantas conexões estão em uso
+    checkedout = getattr(engine.pool, 'checkedout', None)
+    return checkedout() if checkedout else 0
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary,
+        replicas=(),
+        strategy: str = 'round_robin',
+        pin_seconds: float = 5.0,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f'Unknown replica strategy: {strategy}')
+
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.pin_seconds = pin_seconds
+        self._turn = count()
+        self._pins: dict[int, float] = {}
+
+    def pin(self, user_id: int):
+        """Prende as leituras de ``user_id`` ao primário."""
+        if not self.replicas or self.pin_seconds <= 0:
+            return
+
+        now = monotonic()
+        if len(self._pins) >= PRUNE_THRESHOLD:
+            self._pins = {
+                key: expires_at
+                for key, expires_at in self._pins.items()
+                if expires_at > now
+            }
+
+        self._pins[user_id] = now + self.pin_seconds
+
+        request_pin = _request_pin.get()
+        if request_pin is not None:
+            request_pin.until = time() + self.pin_seconds
+            request_pin.changed = True
+
+    def is_pinned(self, user_id: int | None) -> bool:
+        request_pin = _request_pin.get()
+        if request_pin is not None and request_pin.until > time():
+            return True
+
+        expires_at = self._pins.get(user_id)
+        if expires_at is None:
+            return False
+
+        if expires_at <= monotonic():
+            del self._pins[user_id]
+            return False
+
+        return True
+
+    def engine_for(self, user_id: int | None = None):
+        if not self.replicas or self.is_pinned(user_id):
+            return self.primary
+
+        if self.strategy == 'least_loaded':
+            return min(self.replicas, key=_checked_out)
+
+        return self.replicas[next(self._turn) % len(self.replicas)]
+
+
+class ReplicaPinMiddleware:
+    """Lê e renova o cookie de pin para que todo worker o respeite."""
+
+    def __init__(self, app, router: ReplicaRouter):
+        self.app = app
+        self.router = router
+
+    @staticmethod
+    def _until(scope) -> float:
+        # forjar o cookie só prende ao primário quem o forjou, como
+        # escrever a cada poucos segundos faria
+        try:
+            return float(HTTPConnection(scope).cookies.get(PIN_COOKIE, 0))
+        except ValueError:
+            return 0.0
+
+    def _set_cookie(self, until: float) -> bytes:
+        max_age = ceil(self.router.pin_seconds)
+        return (
+            f'{PIN_COOKIE}={until:.3f}; Max-Age={max_age}; Path=/; '
+            'HttpOnly; SameSite=lax'
+        ).encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_pin = RequestPin(self._until(scope))
+
+        async def send_with_cookie(message):
+            if (
+                message['type'] == 'http.response.start'
+                and request_pin.changed
+            ):
+                message['headers'] = [
+                    *message.get('headers', []),
+                    (b'set-cookie', self._set_cookie(request_pin.until)),
+                ]
+            await send(message)
+
+        token = _request_pin.set(request_pin)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _request_pin.reset(token)
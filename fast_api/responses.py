@@ -0,0 +1,29 @@
+"""Respostas JSON serializadas direto pelo pydantic-core.
+
+Quando a rota devolve os objetos do ORM, o FastAPI valida cada item
+contra o ``response_model``, converte tudo para tipos JSON em Python e
+só então chama ``json.dumps``. Aqui cada resultado passa uma única vez
+pelo validador (``from_attributes``) de um ``TypeAdapter`` montado na
+importação e vira bytes no ``dump_json``, com datas serializadas em
+Rust. Como a rota devolve um ``Response`` pronto, o FastAPI não valida
+de novo; o ``response_model`` continua valendo para a documentação.
+"""
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from fast_api.schemas import TodoList, UserList
+from fast_api.tracing import span
+
+TODO_LIST = TypeAdapter(TodoList)
+USER_LIST = TypeAdapter(UserList)
+
+
+def json_response(
+    adapter: TypeAdapter, content, headers: dict | None = None
+) -> Response:
+    with span('serialize'):
+        body = adapter.dump_json(
+            adapter.validate_python(content, from_attributes=True)
+        )
+    return Response(body, media_type='application/json', headers=headers)
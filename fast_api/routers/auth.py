@@ -7,12 +7,14 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_api.database import get_session
+from fast_api.loading import USER_CREDENTIALS
 from fast_api.models import User
+from fast_api.principals import Principal
 from fast_api.schemas import Token
 from fast_api.security import (
     create_access_token,
     get_current_user,
-    verify_password,
+    verify_password_async,
 )
 
 router = APIRouter(prefix='/auth', tags=['auth'])
@@ -27,7 +29,9 @@ async def login_for_access_token(
 ):
 
     user = await session.scalar(
-        select(User).where(User.email == form_data.username)
+        select(User)
+        .where(User.email == form_data.username)
+        .options(*USER_CREDENTIALS)
     )
     if not user:
         raise HTTPException(
@@ -35,7 +39,7 @@ async def login_for_access_token(
             detail='Incorrect email or password',
         )
 
-    if not verify_password(
+    if not await verify_password_async(
         plain_password=form_data.password, hashed_password=user.password
     ):
         raise HTTPException(
@@ -50,7 +54,7 @@ async def login_for_access_token(
 
 @router.post('/refresh_token', response_model=Token)
 async def refresh_access_token(
-    user: Annotated[User, Depends(get_current_user)],
+    user: Annotated[Principal, Depends(get_current_user)],
 ):
     new_access_token = create_access_token(data={'sub': user.email})
 
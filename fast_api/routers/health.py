@@ -0,0 +1,51 @@
+import asyncio
+from http import HTTPStatus
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_api.cache import response_cache
+from fast_api.database import engine, get_session, pool_stats
+from fast_api.schemas import CacheRouteStatus, Message, PoolStatus
+
+router = APIRouter(prefix='/health', tags=['health'])
+Session = Annotated[AsyncSession, Depends(get_session)]
+
+READY_TIMEOUT = 2.0  # s; o balanceador não deve esperar o pool_timeout
+
+
+@router.get('/ready', status_code=HTTPStatus.OK, response_model=Message)
+async def read_readiness(request: Request, session: Session):
+    if not getattr(request.app.state, 'ready', False):
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Starting up',
+        )
+
+    try:
+        async with asyncio.timeout(READY_TIMEOUT):
+            await session.execute(text('SELECT 1'))
+    except (OSError, TimeoutError, SQLAlchemyError):
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Database unavailable',
+        )
+
+    return {'message': 'Ready'}
+
+
+@router.get('/pool', status_code=HTTPStatus.OK, response_model=PoolStatus)
+async def read_pool_status():
+    return pool_stats(engine)
+
+
+@router.get(
+    '/cache',
+    status_code=HTTPStatus.OK,
+    response_model=dict[str, CacheRouteStatus],
+)
+async def read_cache_status():
+    return response_cache.stats()
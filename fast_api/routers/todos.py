@@ -1,25 +1,81 @@
+import csv
+import io
+import operator
+from collections import Counter
+from functools import reduce
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import (
+    Integer,
+    String,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fast_api.database import get_session
-from fast_api.models import Todo, User
+from fast_api.counters import adjust_counters, read_counters, state_changes
+from fast_api.database import get_session, replicas
+from fast_api.etags import (
+    bump_todos_version,
+    etag_matches,
+    make_etag,
+    not_modified,
+    read_todos_version,
+)
+from fast_api.importer import copy_todos, read_todos
+from fast_api.loading import TODO_PUBLIC_COLUMNS
+from fast_api.models import Todo, todo_description_search, todo_title_search
+from fast_api.pagination import page_results, paginate
+from fast_api.principals import Principal
+from fast_api.responses import TODO_LIST, json_response
+from fast_api.rows import TodoRow, fetch_rows
 from fast_api.schemas import (
+    FileFormat,
+    FileOptions,
+    FilterExport,
     FilterTodo,
     Message,
+    SearchMode,
+    TodoBatchCreate,
+    TodoBatchDelete,
+    TodoBatchResult,
+    TodoBatchUpdate,
+    TodoImportResult,
     TodoList,
     TodoPublic,
     TodoSchema,
+    TodoStats,
     TodoUpdate,
 )
-from fast_api.security import get_current_user
+from fast_api.security import (
+    get_current_user,
+    get_current_user_read_session,
+)
+from fast_api.settings import get_settings
 
 router = APIRouter(prefix='/todos', tags=['todos'])
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+ReadSession = Annotated[AsyncSession, Depends(get_current_user_read_session)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+settings = get_settings()
+
+EXPORT_CHUNK_SIZE = 500
 
 # O usuário tem que estar conectado, ou seja, tem que te ro current_user
 
@@ -37,20 +93,37 @@ async def create_todo(
         user_id=user.id,
     )
 
+    # eager_defaults: o INSERT já traz id e datas via RETURNING
     session.add(db_todo)
+    await adjust_counters(session, user.id, {todo.state: 1})
+    await bump_todos_version(session, user.id)
     await session.commit()
-    await session.refresh(db_todo)
+    replicas.pin(user.id)
 
     return db_todo
 
 
-@router.get('/', status_code=HTTPStatus.OK, response_model=TodoList)
-async def list_todos(
-    user: CurrentUser,
-    session: Session,
-    todo_filter: Annotated[FilterTodo, Query()],
-):
-    query = select(Todo).where(user.id == Todo.user_id)
+def _filter_todos(query, todo_filter):
+    """Aplica os filtros de ``TodoFilters`` à query.
+
+    Retorna também a relevância da busca full-text, ou ``None`` quando a
+    ordenação padrão deve ser usada.
+    """
+    if todo_filter.state:
+        query = query.filter(Todo.state == todo_filter.state)
+
+    if todo_filter.search == SearchMode.fulltext:
+        ranks = []
+        for search_column, terms in (
+            (todo_title_search, todo_filter.title),
+            (todo_description_search, todo_filter.description),
+        ):
+            if terms:
+                tsquery = func.websearch_to_tsquery('simple', terms)
+                query = query.filter(search_column.bool_op('@@')(tsquery))
+                ranks.append(func.ts_rank(search_column, tsquery))
+
+        return query, reduce(operator.add, ranks) if ranks else None
 
     if todo_filter.title:
         query = query.filter(Todo.title.contains(todo_filter.title))
@@ -60,29 +133,363 @@ async def list_todos(
             Todo.description.contains(todo_filter.description)
         )
 
-    if todo_filter.state:
-        query = query.filter(Todo.state == todo_filter.state)
+    return query, None
+
+
+@router.get('/', status_code=HTTPStatus.OK, response_model=TodoList)
+async def list_todos(
+    user: CurrentUser,
+    session: ReadSession,
+    todo_filter: Annotated[FilterTodo, Query()],
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    version = await read_todos_version(session, user.id)
+    etag = make_etag('todos', user.id, version, todo_filter.model_dump_json())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    headers = {'ETag': etag}
+    query, rank = _filter_todos(
+        select(*TODO_PUBLIC_COLUMNS).where(user.id == Todo.user_id),
+        todo_filter,
+    )
+
+    if rank is not None:
+        todos = await fetch_rows(
+            session,
+            query.order_by(rank.desc(), Todo.id)
+            .offset(todo_filter.offset)
+            .limit(todo_filter.limit),
+            TodoRow,
+        )
+        return json_response(TODO_LIST, {'todos': todos}, headers)
+
+    todos = await fetch_rows(
+        session, paginate(query, Todo, todo_filter), TodoRow
+    )
+    todos, next_cursor = page_results(todos, todo_filter)
+
+    return json_response(
+        TODO_LIST, {'todos': todos, 'next_cursor': next_cursor}, headers
+    )
+
+
+async def _export_ndjson(result):
+    async for rows in result.partitions():
+        yield ''.join(
+            TodoPublic.model_validate(row).model_dump_json() + '\n'
+            for row in rows
+        )
+
+
+def _drain(buffer: io.StringIO) -> str:
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+
+async def _export_csv(result):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(TodoPublic.model_fields)
+    # o cabeçalho sai mesmo quando nenhuma tarefa passa no filtro
+    yield _drain(buffer)
+
+    async for rows in result.partitions():
+        for row in rows:
+            todo = TodoPublic.model_validate(row).model_dump(mode='json')
+            writer.writerow(todo.values())
+
+        yield _drain(buffer)
+
+
+EXPORTERS = {
+    FileFormat.ndjson: (_export_ndjson, 'application/x-ndjson'),
+    FileFormat.csv: (_export_csv, 'text/csv'),
+}
+
+
+@router.get('/stats', status_code=HTTPStatus.OK, response_model=TodoStats)
+async def read_todo_stats(user: CurrentUser, session: ReadSession):
+    return await read_counters(session, user.id)
+
+
+@router.get(
+    '/export', status_code=HTTPStatus.OK, response_class=StreamingResponse
+)
+async def export_todos(
+    user: CurrentUser,
+    session: ReadSession,
+    export_filter: Annotated[FilterExport, Query()],
+):
+    """Exporta todas as tarefas filtradas sem carregá-las de uma vez.
+
+    As linhas vêm de um cursor no servidor em lotes de
+    ``EXPORT_CHUNK_SIZE`` e cada lote é serializado e enviado antes do
+    próximo ser lido, então a memória não cresce com o total de tarefas.
+    """
+    query, rank = _filter_todos(
+        select(*TODO_PUBLIC_COLUMNS).where(user.id == Todo.user_id),
+        export_filter,
+    )
+    if rank is not None:
+        query = query.order_by(rank.desc(), Todo.id)
+    else:
+        query = query.order_by(Todo.created_at, Todo.id)
+
+    result = await session.stream(
+        query.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    exporter, media_type = EXPORTERS[export_filter.format]
 
-    todos = await session.scalars(
-        query.offset(todo_filter.offset).limit(todo_filter.limit)
+    return StreamingResponse(
+        exporter(result),
+        media_type=media_type,
+        headers={
+            'Content-Disposition': (
+                f'attachment; filename="todos.{export_filter.format.value}"'
+            )
+        },
     )
 
-    return {'todos': todos.all()}
+
+@router.post(
+    '/import', status_code=HTTPStatus.CREATED, response_model=TodoImportResult
+)
+async def import_todos(
+    user: CurrentUser,
+    session: Session,
+    request: Request,
+    options: Annotated[FileOptions, Query()],
+):
+    """Importa tarefas em NDJSON ou CSV (com cabeçalho) via ``COPY``.
+
+    Só um lote de ``TODO_IMPORT_CHUNK_SIZE`` linhas válidas fica em
+    memória por vez; as inválidas são puladas e até
+    ``TODO_IMPORT_MAX_ERRORS`` delas voltam na resposta.
+    """
+    imported, failed, errors, rows = 0, 0, [], []
+    states = Counter()
+
+    async for line, todo, error in read_todos(
+        request.stream(),
+        options.format,
+        settings.TODO_IMPORT_MAX_LINE_LENGTH,
+    ):
+        if error:
+            failed += 1
+            if len(errors) < settings.TODO_IMPORT_MAX_ERRORS:
+                errors.append({'line': line, 'detail': error})
+            continue
+
+        rows.append((todo.title, todo.description, todo.state.value, user.id))
+        states[todo.state] += 1
+        if len(rows) >= settings.TODO_IMPORT_CHUNK_SIZE:
+            imported += await copy_todos(
+                session, rows, settings.SLOW_QUERY_SECONDS
+            )
+            rows = []
+
+    if rows:
+        imported += await copy_todos(
+            session, rows, settings.SLOW_QUERY_SECONDS
+        )
+
+    await adjust_counters(session, user.id, states)
+    await bump_todos_version(session, user.id)
+    await session.commit()
+    replicas.pin(user.id)
+
+    return {'imported': imported, 'failed': failed, 'errors': errors}
+
+
+def _check_batch_size(size: int):
+    if size > settings.TODO_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=f'Batch size limit is {settings.TODO_BATCH_MAX_SIZE}',
+        )
+
+
+def _batch_result(ids, found, status):
+    return {
+        'results': [
+            {'id': id, 'status': status, 'todo': found[id]}
+            if id in found
+            else {
+                'id': id,
+                'status': HTTPStatus.NOT_FOUND,
+                'detail': 'Task not found',
+            }
+            for id in ids
+        ]
+    }
+
+
+@router.post(
+    '/batch', status_code=HTTPStatus.CREATED, response_model=TodoBatchResult
+)
+async def create_todos(
+    user: CurrentUser,
+    session: Session,
+    batch: TodoBatchCreate,
+):
+    _check_batch_size(len(batch.todos))
+
+    result = await session.execute(
+        insert(Todo).returning(
+            *TODO_PUBLIC_COLUMNS, sort_by_parameter_order=True
+        ),
+        [todo.model_dump() | {'user_id': user.id} for todo in batch.todos],
+    )
+    todos = result.all()
+    await adjust_counters(
+        session, user.id, state_changes((None, todo.state) for todo in todos)
+    )
+    await bump_todos_version(session, user.id)
+    await session.commit()
+    replicas.pin(user.id)
+
+    return _batch_result(
+        [todo.id for todo in todos],
+        {todo.id: todo for todo in todos},
+        HTTPStatus.CREATED,
+    )
+
+
+def _has_changes(todo) -> bool:
+    return bool(todo.model_fields_set - {'id'})
+
+
+@router.patch(
+    '/batch', status_code=HTTPStatus.OK, response_model=TodoBatchResult
+)
+async def update_todos(
+    user: CurrentUser,
+    session: Session,
+    batch: TodoBatchUpdate,
+):
+    _check_batch_size(len(batch.todos))
+
+    # como no PATCH de uma tarefa só, campos ausentes mantêm o valor atual
+    # (``null`` é recusado pelo schema, então o coalesce só vê ausentes) e
+    # itens sem nenhum campo ficam fora do UPDATE, sem updated_at novo
+    changed = [todo for todo in batch.todos if _has_changes(todo)]
+    unchanged = [todo.id for todo in batch.todos if not _has_changes(todo)]
+
+    todos = []
+    if changed:
+        data = values(
+            column('id', Integer),
+            column('title', String),
+            column('description', String),
+            column('state', String),
+            name='data',
+        ).data([
+            (todo.id, todo.title, todo.description, todo.state)
+            for todo in changed
+        ])
+
+        # estado anterior de cada tarefa, travada até o commit
+        old = (
+            select(Todo.id, Todo.state)
+            .where(Todo.id.in_(todo.id for todo in changed))
+            .where(Todo.user_id == user.id)
+            .with_for_update()
+            .subquery('old')
+        )
+
+        result = await session.execute(
+            update(Todo)
+            .where(Todo.id == data.c.id, Todo.id == old.c.id)
+            .values(
+                title=func.coalesce(data.c.title, Todo.title),
+                description=func.coalesce(
+                    data.c.description, Todo.description
+                ),
+                state=func.coalesce(
+                    cast(data.c.state, Todo.state.type), Todo.state
+                ),
+            )
+            .returning(*TODO_PUBLIC_COLUMNS, old.c.state.label('old_state'))
+        )
+        todos = result.all()
+
+    if unchanged:
+        result = await session.execute(
+            select(*TODO_PUBLIC_COLUMNS).where(
+                Todo.id.in_(unchanged), Todo.user_id == user.id
+            )
+        )
+        found = {todo.id: todo for todo in result}
+    else:
+        found = {}
+
+    if todos:
+        await adjust_counters(
+            session,
+            user.id,
+            state_changes((todo.old_state, todo.state) for todo in todos),
+        )
+        await bump_todos_version(session, user.id)
+        await session.commit()
+        replicas.pin(user.id)
+
+    return _batch_result(
+        [todo.id for todo in batch.todos],
+        found | {todo.id: todo for todo in todos},
+        HTTPStatus.OK,
+    )
+
+
+@router.delete(
+    '/batch', status_code=HTTPStatus.OK, response_model=TodoBatchResult
+)
+async def delete_todos(
+    user: CurrentUser,
+    session: Session,
+    batch: TodoBatchDelete,
+):
+    _check_batch_size(len(batch.ids))
+
+    deleted = await session.execute(
+        delete(Todo)
+        .where(Todo.id.in_(batch.ids), Todo.user_id == user.id)
+        .returning(Todo.id, Todo.state)
+    )
+    deleted = dict(deleted.all())
+    # nenhum id era do usuário: nada mudou, sem nova versão nem pin
+    if deleted:
+        await adjust_counters(
+            session,
+            user.id,
+            state_changes((state, None) for state in deleted.values()),
+        )
+        await bump_todos_version(session, user.id)
+        await session.commit()
+        replicas.pin(user.id)
+
+    return _batch_result(batch.ids, dict.fromkeys(deleted), HTTPStatus.OK)
 
 
 @router.delete('/{todo_id}', status_code=HTTPStatus.OK, response_model=Message)
 async def delete_todo(todo_id: int, session: Session, user: CurrentUser):
-    todo = await session.scalar(
-        select(Todo).where(todo_id == Todo.id, user.id == Todo.user_id)
+    deleted_state = await session.scalar(
+        delete(Todo)
+        .where(todo_id == Todo.id, user.id == Todo.user_id)
+        .returning(Todo.state)
     )
 
-    if not todo:
+    if deleted_state is None:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Task not found'
         )
 
-    await session.delete(todo)
+    await adjust_counters(session, user.id, {deleted_state: -1})
+    await bump_todos_version(session, user.id)
     await session.commit()
+    replicas.pin(user.id)
 
     return {'message': 'Task has been deleted successfully'}
 
@@ -93,20 +500,55 @@ async def delete_todo(todo_id: int, session: Session, user: CurrentUser):
 async def update_todo(
     todo_id: int, session: Session, user: CurrentUser, todo: TodoUpdate
 ):
-    db_todo = await session.scalar(
-        select(Todo).where(todo_id == Todo.id, user.id == Todo.user_id)
-    )
+    changes = todo.model_dump(exclude_unset=True)
+    criteria = (todo_id == Todo.id, user.id == Todo.user_id)
+
+    if not changes:
+        result = await session.execute(
+            select(*TODO_PUBLIC_COLUMNS).where(*criteria)
+        )
+    elif 'state' in changes:
+        # o FROM devolve o estado anterior para ajustar os contadores
+        old = (
+            select(Todo.id, Todo.state)
+            .where(*criteria)
+            .with_for_update()
+            .subquery('old')
+        )
+        result = await session.execute(
+            update(Todo)
+            .where(Todo.id == old.c.id)
+            .values(**changes)
+            .returning(*TODO_PUBLIC_COLUMNS, old.c.state.label('old_state'))
+        )
+    else:
+        result = await session.execute(
+            update(Todo)
+            .where(*criteria)
+            .values(**changes)
+            .returning(*TODO_PUBLIC_COLUMNS)
+        )
+
+    db_todo = result.one_or_none()
 
     if not db_todo:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Task not found'
         )
 
-    for key, value in todo.model_dump(exclude_unset=True).items():
-        setattr(db_todo, key, value)
+    if not changes:
+        # sem campos para alterar não há UPDATE, commit nem pin ao primário
+        return db_todo
 
-    session.add(db_todo)
+    if 'state' in changes:
+        await adjust_counters(
+            session,
+            user.id,
+            state_changes([(db_todo.old_state, db_todo.state)]),
+        )
+
+    await bump_todos_version(session, user.id)
     await session.commit()
-    await session.refresh(db_todo)
+    replicas.pin(user.id)
 
     return db_todo
@@ -1,15 +1,22 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import delete, select, update
 from sqlalchemy.exc import IntegrityError
 
 # from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fast_api.database import get_session
+from fast_api.cache import response_cache
+from fast_api.database import get_read_session, get_session, replicas
+from fast_api.etags import etag_matches, make_etag, not_modified
+from fast_api.loading import USER_PUBLIC_COLUMNS
 from fast_api.models import User
+from fast_api.pagination import page_results, paginate
+from fast_api.principals import Principal
+from fast_api.responses import USER_LIST, json_response
+from fast_api.rows import UserRow, fetch_row, fetch_rows
 from fast_api.schemas import (
     FilterPage,
     Message,
@@ -17,18 +24,24 @@ from fast_api.schemas import (
     UserPublic,
     UserSchema,
 )
-from fast_api.security import get_current_user, get_password_hash
+from fast_api.security import (
+    get_current_user,
+    get_current_user_read_session,
+    get_password_hash_async,
+    principal_cache,
+)
 
 router = APIRouter(prefix='/users', tags=['users'])
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+ReadSession = Annotated[AsyncSession, Depends(get_current_user_read_session)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
 
 
 @router.post('/', status_code=HTTPStatus.CREATED, response_model=UserPublic)
 async def create_user(user: UserSchema, session: Session):
 
     db_user = await session.scalar(
-        select(User).where(
+        select(User.id).where(
             (user.username == User.username) | (user.email == User.email)
         )
     )
@@ -42,12 +55,13 @@ async def create_user(user: UserSchema, session: Session):
     db_user = User(
         username=user.username,
         email=user.email,
-        password=get_password_hash(user.password),
+        password=await get_password_hash_async(user.password),
     )
 
     session.add(db_user)
     await session.commit()
     await session.refresh(db_user)
+    replicas.pin(db_user.id)
     return db_user
 
 
@@ -57,15 +71,20 @@ async def create_user(user: UserSchema, session: Session):
     response_model=UserList,
 )
 async def read_users(
-    session: Session,
+    session: ReadSession,
     current_user: CurrentUser,
     filter_users: Annotated[FilterPage, Query()],
 ):
-    users = await session.scalars(
-        select(User).limit(filter_users.limit).offset(filter_users.offset)
+    users = await fetch_rows(
+        session,
+        paginate(select(*USER_PUBLIC_COLUMNS), User, filter_users),
+        UserRow,
     )
+    users, next_cursor = page_results(users, filter_users)
 
-    return {'users': users}
+    return json_response(
+        USER_LIST, {'users': users, 'next_cursor': next_cursor}
+    )
 
 
 @router.put('/{user_id}', status_code=HTTPStatus.OK, response_model=UserPublic)
@@ -80,14 +99,17 @@ async def update_user(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
     try:
-        current_user.username = user.username
-        current_user.email = user.email
-        current_user.password = get_password_hash(user.password)
-        session.add(current_user)
+        db_user = await session.scalar(
+            update(User)
+            .where(User.id == current_user.id)
+            .values(
+                username=user.username,
+                email=user.email,
+                password=await get_password_hash_async(user.password),
+            )
+            .returning(User)
+        )
         await session.commit()
-        await session.refresh(current_user)
-
-        return current_user
 
     except IntegrityError:
         raise HTTPException(
@@ -95,6 +117,12 @@ async def update_user(
             detail='Username or Email already exists',
         )
 
+    principal_cache.invalidate(current_user.email)
+    await response_cache.invalidate('users', current_user.id)
+    replicas.pin(current_user.id)
+
+    return db_user
+
 
 @router.delete('/{user_id}', status_code=HTTPStatus.OK, response_model=Message)
 async def delete_user(
@@ -115,20 +143,49 @@ async def delete_user(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
 
-    await session.delete(current_user)
+    await session.execute(delete(User).where(User.id == current_user.id))
     await session.commit()
 
-    return {'message': 'User deleted'}
+    principal_cache.invalidate(current_user.email)
+    await response_cache.invalidate('users', current_user.id)
+    replicas.pin(current_user.id)
 
+    return {'message': 'User deleted'}
 
-@router.get('/{user_id}', status_code=HTTPStatus.OK, response_model=UserPublic)
-async def get_user_id(user_id: int, session: Session):
 
-    db_user = await session.scalar(select(User).where(User.id == user_id))
+async def _load_public_user(session, user_id: int):
+    db_user = await fetch_row(
+        session,
+        select(*USER_PUBLIC_COLUMNS).where(User.id == user_id),
+        UserRow,
+    )
 
     if not db_user:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='User not found!'
         )
 
-    return db_user
+    etag = make_etag('user', db_user.id, db_user.updated_at.isoformat())
+    body = UserPublic.model_validate(db_user).model_dump_json().encode()
+    await response_cache.set('users', user_id, etag, body)
+
+    return etag, body
+
+
+@router.get('/{user_id}', status_code=HTTPStatus.OK, response_model=UserPublic)
+async def get_user_id(
+    user_id: int,
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    cached = await response_cache.get('users', user_id)
+    if cached:
+        etag, body = cached
+    else:
+        etag, body = await _load_public_user(session, user_id)
+
+    headers = {'ETag': etag, 'Cache-Control': response_cache.cache_control}
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, headers)
+
+    return Response(body, media_type='application/json', headers=headers)
@@ -0,0 +1,43 @@
+"""Linhas enxutas para as rotas de leitura.
+
+As listagens não precisam de objetos do ORM: cada instância de ``Todo``
+ou ``User`` passaria pelo identity map, ganharia estado de
+instrumentação e um ``__dict__`` próprio, tudo descartado logo depois da
+serialização. As rotas de leitura selecionam só as colunas de
+``fast_api.loading`` e cada ``Row`` vira uma dataclass com ``slots``,
+casando os campos pelo nome das colunas (não pela ordem).
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from fast_api.models import TodoState
+
+
+@dataclass(frozen=True, slots=True)
+class TodoRow:
+    id: int
+    title: str
+    description: str
+    state: TodoState
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class UserRow:
+    id: int
+    username: str
+    email: str
+    created_at: datetime
+    updated_at: datetime
+
+
+async def fetch_rows(session, query, row_type):
+    result = await session.execute(query)
+    return [row_type(**row._mapping) for row in result]
+
+
+async def fetch_row(session, query, row_type):
+    row = (await session.execute(query)).one_or_none()
+    return row_type(**row._mapping) if row else None
@@ -1,8 +1,24 @@
 from datetime import datetime
+from enum import Enum
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    field_validator,
+    model_validator,
+)
 
 from fast_api.models import TodoState
+from fast_api.pagination import decode_cursor
+
+MAX_PAGE_SIZE = 100
+
+
+class SearchMode(str, Enum):
+    substring = 'substring'
+    fulltext = 'fulltext'
 
 
 class Message(BaseModel):
@@ -24,6 +40,7 @@ class UserPublic(BaseModel):
 
 class UserList(BaseModel):
     users: list[UserPublic]
+    next_cursor: str | None = None
 
 
 class Token(BaseModel):
@@ -33,20 +50,65 @@ class Token(BaseModel):
 
 class FilterPage(BaseModel):
     offset: int = Field(ge=0, default=0)
-    limit: int = Field(ge=0, default=10)
+    limit: int = Field(ge=0, le=MAX_PAGE_SIZE, default=10)
+    cursor: str | None = None
+
+    @field_validator('cursor')
+    @classmethod
+    def validate_cursor(cls, cursor: str | None):
+        if cursor is not None:
+            decode_cursor(cursor)
+        return cursor
+
+    @model_validator(mode='after')
+    def check_offset_or_cursor(self):
+        if self.cursor and self.offset:
+            raise ValueError('Use either offset or cursor, not both')
+        return self
 
 
-class FilterTodo(FilterPage):
+class TodoFilters(BaseModel):
     title: str | None = Field(default=None, min_length=3)
     description: str | None = None
     state: TodoState | None = None
+    search: SearchMode = SearchMode.substring
+
+
+class FilterTodo(FilterPage, TodoFilters):
+    @model_validator(mode='after')
+    def check_fulltext_pagination(self):
+        if self.cursor and self.search == SearchMode.fulltext:
+            raise ValueError('Full-text search is paginated by offset')
+        return self
+
+
+class FileFormat(str, Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
+
+
+class FileOptions(BaseModel):
+    format: FileFormat = FileFormat.ndjson
+
+
+class FilterExport(TodoFilters, FileOptions):
+    pass
 
 
 class TodoUpdate(BaseModel):
+    """Campo ausente mantém o valor atual; ``null`` não é um valor."""
+
     title: str | None = None
     description: str | None = None
     state: TodoState | None = None
 
+    @field_validator('title', 'description', 'state')
+    @classmethod
+    def check_not_null(cls, value):
+        if value is None:
+            raise ValueError('Omit the field to keep its value')
+        return value
+
 
 class TodoSchema(BaseModel):
     title: str
@@ -63,3 +125,71 @@ class TodoPublic(TodoSchema):
 
 class TodoList(BaseModel):
     todos: list[TodoPublic]
+    next_cursor: str | None = None
+
+
+class TodoStats(BaseModel):
+    total: int
+    states: dict[TodoState, int]
+
+
+class TodoBatchCreate(BaseModel):
+    todos: list[TodoSchema] = Field(min_length=1)
+
+
+class TodoBatchUpdateItem(TodoUpdate):
+    id: int
+
+
+class TodoBatchUpdate(BaseModel):
+    todos: list[TodoBatchUpdateItem] = Field(min_length=1)
+
+    @model_validator(mode='after')
+    def check_unique_ids(self):
+        ids = [todo.id for todo in self.todos]
+        if len(set(ids)) != len(ids):
+            raise ValueError('Duplicated todo ids')
+        return self
+
+
+class TodoBatchDelete(BaseModel):
+    ids: list[int] = Field(min_length=1)
+
+
+class TodoBatchItem(BaseModel):
+    id: int
+    status: int
+    todo: TodoPublic | None = None
+    detail: str | None = None
+
+
+class TodoBatchResult(BaseModel):
+    results: list[TodoBatchItem]
+
+
+class TodoImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class TodoImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: list[TodoImportError]
+
+
+class PoolStatus(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_seconds: float
+    max_wait_seconds: float
+
+
+class CacheRouteStatus(BaseModel):
+    hits: int
+    misses: int
+    errors: int
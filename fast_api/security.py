@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 from http import HTTPStatus
 from zoneinfo import ZoneInfo
 
+from argon2.low_level import Type, hash_secret_raw
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import DecodeError, ExpiredSignatureError, decode, encode
@@ -9,21 +10,86 @@ from pwdlib import PasswordHash
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fast_api.database import get_session
+from fast_api.database import get_session, read_session
+from fast_api.hashing import HashingExecutor
+from fast_api.loading import PRINCIPAL_COLUMNS
+from fast_api.metrics import PASSWORD_HASHING_SECONDS, family, registry
 from fast_api.models import User
-from fast_api.settings import Settings
+from fast_api.principals import Principal, create_principal_cache
+from fast_api.settings import get_settings
+from fast_api.tracing import span, traced
 
 pwd_context = PasswordHash.recommended()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/token')
-settings = Settings()
+settings = get_settings()
+principal_cache = create_principal_cache(settings)
+hashing_executor = HashingExecutor(
+    max_workers=settings.HASH_WORKERS, queue_limit=settings.HASH_QUEUE_LIMIT
+)
+
+
+@registry.collector
+def collect_hashing_metrics():
+    stats = hashing_executor.stats()
+    return {
+        'password_hashing_in_flight': family(
+            'gauge', 'Argon2 calls running.', (), [[[], stats['in_flight']]]
+        ),
+        'password_hashing_queued': family(
+            'gauge', 'Argon2 calls waiting.', (), [[[], stats['queued']]]
+        ),
+        'password_hashing_rejected_total': family(
+            'counter',
+            'Argon2 calls rejected with 503 (queue full).',
+            (),
+            [[[], stats['rejected']]],
+        ),
+        'password_hashing_wait_seconds_total': family(
+            'counter',
+            'Time Argon2 calls spent queued.',
+            (),
+            [[[], stats['wait_seconds']]],
+        ),
+    }
 
 
 def get_password_hash(password: str):
-    return pwd_context.hash(password)
+    with PASSWORD_HASHING_SECONDS.time('hash'):
+        return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+    with PASSWORD_HASHING_SECONDS.time('verify'):
+        return pwd_context.verify(plain_password, hashed_password)
+
+
+def warm_up_hashing():
+    """Hash de custo mínimo: inicializa o Argon2 sem gastar CPU.
+
+    Um hash com os parâmetros reais custa ~100 ms de CPU e quase não
+    acelera o seguinte, pois a memória é alocada a cada chamada.
+    """
+    hash_secret_raw(
+        b'warm-up',
+        b'warm-up-salt',
+        time_cost=1,
+        memory_cost=8,
+        parallelism=1,
+        hash_len=16,
+        type=Type.ID,
+    )
+
+
+async def get_password_hash_async(password: str):
+    with span('argon2.hash'):
+        return await hashing_executor.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str):
+    with span('argon2.verify'):
+        return await hashing_executor.run(
+            verify_password, plain_password, hashed_password
+        )
 
 
 def create_access_token(data: dict):
@@ -40,6 +106,7 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
+@traced('get_current_user')
 async def get_current_user(
     session: AsyncSession = Depends(get_session),
     token: str = Depends(oauth2_scheme),
@@ -65,10 +132,27 @@ async def get_current_user(
     except ExpiredSignatureError:
         raise credentials_exception
 
-    user = await session.scalar(
-        select(User).where(User.email == subject_email)
+    principal = principal_cache.get(subject_email)
+    if principal:
+        return principal
+
+    result = await session.execute(
+        select(*PRINCIPAL_COLUMNS).where(User.email == subject_email)
     )
+    user = result.one_or_none()
     if not user:
         raise credentials_exception
 
-    return user
+    principal = Principal(id=user.id, username=user.username, email=user.email)
+    principal_cache.set(subject_email, principal)
+
+    return principal
+
+
+@traced('get_current_user_read_session')
+async def get_current_user_read_session(
+    current_user: Principal = Depends(get_current_user),
+):
+    """Sessão de leitura com as escritas recentes do usuário visíveis."""
+    async with read_session(current_user.id) as session:
+        yield session
@@ -0,0 +1,160 @@
+"""Servidor de produção: uvicorn com vários workers.
+
+Uso::
+
+    python -m fast_api.serve
+
+Sobe ``SERVER_WORKERS`` processos (por padrão um por CPU que o processo
+pode usar, respeitando afinidade e a cota do cgroup do container), cada
+um com seu event loop, usando uvloop e httptools quando instalados.
+
+No ``SIGTERM`` os workers param de aceitar conexões e esperam as
+requisições em andamento por até ``SERVER_GRACEFUL_TIMEOUT`` segundos.
+Com ``SERVER_MAX_REQUESTS`` cada worker sai depois de atender esse
+número de requisições (mais um sorteio até ``SERVER_MAX_REQUESTS_JITTER``,
+para não reciclarem todos juntos) e o supervisor sobe outro no lugar.
+
+Com o supervisor, os workers somam as métricas do ``/metrics`` em
+``METRICS_DIR`` (um diretório temporário se não for configurado).
+
+Cada worker tem o próprio pool do SQLAlchemy: no modo ``internal`` o
+banco recebe até ``workers * (DATABASE_POOL_SIZE +
+DATABASE_MAX_OVERFLOW)`` conexões.
+"""
+
+import inspect
+import logging
+import math
+import os
+import tempfile
+from importlib.util import find_spec
+from pathlib import Path
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from fast_api.metrics import reset_directory
+from fast_api.settings import Settings, get_settings
+
+APP = 'fast_api.app:app'
+CGROUP_CPU_MAX = Path('/sys/fs/cgroup/cpu.max')
+
+logger = logging.getLogger('uvicorn.error')
+
+
+def available_cpus(cpu_max: Path = CGROUP_CPU_MAX) -> int:
+    """CPUs que este processo pode usar de fato."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover
+        cpus = os.cpu_count() or 1
+
+    # cgroup v2: '<cota> <período>' em µs, ou 'max <período>' sem limite
+    try:
+        quota, period = cpu_max.read_text(encoding='ascii').split()
+        cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return cpus
+
+
+def worker_count(settings: Settings) -> int:
+    if settings.SERVER_WORKERS > 0:
+        return settings.SERVER_WORKERS
+
+    return available_cpus()
+
+
+def event_loop() -> str:
+    return 'uvloop' if find_spec('uvloop') else 'asyncio'
+
+
+def http_protocol() -> str:
+    return 'httptools' if find_spec('httptools') else 'h11'
+
+
+def server_options(settings: Settings):
+    options = {
+        'host': settings.SERVER_HOST,
+        'port': settings.SERVER_PORT,
+        'workers': worker_count(settings),
+        'loop': event_loop(),
+        'http': http_protocol(),
+        'backlog': settings.SERVER_BACKLOG,
+        'timeout_keep_alive': settings.SERVER_KEEPALIVE_TIMEOUT,
+        'timeout_graceful_shutdown': settings.SERVER_GRACEFUL_TIMEOUT,
+        'limit_max_requests': settings.SERVER_MAX_REQUESTS or None,
+    }
+
+    # o jitter só existe nas versões mais novas do uvicorn
+    if (
+        'limit_max_requests_jitter'
+        in inspect.signature(uvicorn.Config).parameters
+    ):
+        options['limit_max_requests_jitter'] = (
+            settings.SERVER_MAX_REQUESTS_JITTER
+        )
+    elif settings.SERVER_MAX_REQUESTS_JITTER:
+        logger.warning(
+            'SERVER_MAX_REQUESTS_JITTER ignored: not supported by uvicorn %s',
+            uvicorn.__version__,
+        )
+
+    return options
+
+
+def prepare_metrics_dir(settings: Settings) -> str:
+    """Diretório onde os workers somam as métricas, limpo a cada partida.
+
+    Os workers herdam ``METRICS_DIR`` pelo ambiente do supervisor.
+    """
+    directory = settings.METRICS_DIR or tempfile.mkdtemp(
+        prefix='fast_api-metrics-'
+    )
+    reset_directory(directory)
+    os.environ['METRICS_DIR'] = directory
+    return directory
+
+
+def share_worker_count(workers: int):
+    """Passa aos workers, pelo ambiente, quantos eles são de fato.
+
+    Com ``SERVER_WORKERS=0`` o número sai das CPUs; os caches por
+    processo precisam dele resolvido para saber se podem ficar ligados.
+    """
+    os.environ['SERVER_WORKERS'] = str(workers)
+
+
+def supervisor(config: uvicorn.Config) -> Multiprocess:
+    """Supervisor dos workers, já com o socket de escuta aberto."""
+    sockets = [config.bind_socket()]
+    # até o 0.38 (o do poetry.lock) o supervisor recebe o alvo dos workers
+    if 'target' in inspect.signature(Multiprocess).parameters:
+        return Multiprocess(
+            config, target=uvicorn.Server(config).run, sockets=sockets
+        )
+
+    return Multiprocess(config, sockets=sockets)
+
+
+def serve(settings: Settings):  # pragma: no cover
+    config = uvicorn.Config(APP, **server_options(settings))
+    logger.info(
+        'Serving with %d worker(s), loop=%s, http=%s',
+        config.workers,
+        config.loop,
+        config.http,
+    )
+    share_worker_count(config.workers)
+
+    # sem o supervisor, o worker que atinge o limite derrubaria o servidor
+    if config.workers > 1 or config.limit_max_requests:
+        prepare_metrics_dir(settings)
+        supervisor(config).run()
+    else:
+        uvicorn.Server(config).run()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    serve(get_settings())
@@ -1,3 +1,6 @@
+from functools import lru_cache
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,6 +9,70 @@ class Settings(BaseSettings):
         env_file='.env', env_file_encoding='utf-8'
     )
     DATABASE_URL: str
+    # 'external': atrás de um pooler (PgBouncer em modo transaction)
+    DATABASE_POOL_MODE: Literal['internal', 'external'] = 'internal'
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = 1800
+    # um round trip a mais por checkout; pool_recycle e a invalidação nos
+    # erros já descartam conexões mortas
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_STATEMENT_TIMEOUT: int = 0  # ms; 0 desliga
+    # lista em JSON: '["postgresql+psycopg://...", ...]'
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_STRATEGY: Literal['round_robin', 'least_loaded'] = (
+        'round_robin'
+    )
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 5.0
+    SLOW_QUERY_SECONDS: float = 0.5  # statements mais lentos vão ao log
+    # mesmo SQL N vezes numa requisição: suspeita de N+1; 0 desliga
+    QUERY_REPEAT_THRESHOLD: int = 10
+    DEBUG: bool = False  # X-DB-Queries e Server-Timing nas respostas
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    PRINCIPAL_CACHE_SIZE: int = 1024  # desligado com SERVER_WORKERS > 1
+    PRINCIPAL_CACHE_TTL: float = 30.0
+    HASH_WORKERS: int = 2
+    HASH_QUEUE_LIMIT: int = 32
+    RESPONSE_CACHE_BACKEND: Literal['memory', 'redis'] = 'memory'
+    RESPONSE_CACHE_URL: str = 'redis://localhost:6379/0'
+    # só no backend 'memory', desligado com SERVER_WORKERS > 1; 0 desliga
+    RESPONSE_CACHE_SIZE: int = 4096
+    RESPONSE_CACHE_TTL: float = 30.0
+    RESPONSE_CACHE_MAX_AGE: int = 5  # Cache-Control para os clientes
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_LEVEL: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    SERVER_HOST: str = '0.0.0.0'
+    SERVER_PORT: int = 8000
+    # 0: um por CPU disponível; os workers recebem o número já resolvido
+    SERVER_WORKERS: int = 0
+    SERVER_BACKLOG: int = 2048
+    # maior que o idle do proxy à frente: quem fecha a conexão é o proxy
+    SERVER_KEEPALIVE_TIMEOUT: int = 75
+    SERVER_GRACEFUL_TIMEOUT: int = 30  # s para drenar no SIGTERM
+    SERVER_MAX_REQUESTS: int = 0  # recicla o worker; 0 desliga
+    SERVER_MAX_REQUESTS_JITTER: int = 0
+    STARTUP_WARMUP: bool = True  # pool e Argon2 aquecidos no lifespan
+    STARTUP_WARMUP_TIMEOUT: float = 5.0  # abaixo do grace_period do fly
+    # snapshots dos workers para somar no /metrics; vazio: só o processo
+    METRICS_DIR: str = ''
+    METRICS_FLUSH_INTERVAL: float = 1.0
+    TRACING_EXPORTER: Literal['none', 'file', 'otlp'] = 'none'
+    TRACING_FILE: str = 'traces.jsonl'
+    TRACING_OTLP_ENDPOINT: str = 'http://localhost:4318'
+    TRACING_SAMPLE_RATE: float = 1.0  # fração das requisições sem traceparent
+    TRACING_SERVICE_NAME: str = 'fast_api'
+    TODO_BATCH_MAX_SIZE: int = 500
+    TODO_IMPORT_CHUNK_SIZE: int = 1000
+    TODO_IMPORT_MAX_ERRORS: int = 100
+    TODO_IMPORT_MAX_LINE_LENGTH: int = 65536  # caracteres
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Uma instância por processo: ``.env`` e ambiente lidos uma vez."""
+    return Settings()
@@ -0,0 +1,88 @@
+"""Aquecimento do worker antes do primeiro tráfego.
+
+Com ``auto_stop_machines`` a máquina dorme sem tráfego e a primeira
+requisição pagaria por tudo que é preguiçoso: as conexões do pool
+(TCP e autenticação no Postgres), o cache de SQL compilado do
+SQLAlchemy e a thread e o binding do Argon2. O lifespan do app chama
+``warm_up`` antes de marcar o worker como pronto.
+
+Falhas só vão para o log: o pool volta a conectar sozinho quando o banco
+responder, e ``GET /health/ready`` continua acusando o problema. O mesmo
+vale para um banco que não responde: depois de ``STARTUP_WARMUP_TIMEOUT``
+segundos o aquecimento desiste, para o worker subir dentro do
+``grace_period`` do health check do ``fly.toml``.
+"""
+
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from time import perf_counter
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from fast_api.database import replicas
+from fast_api.loading import PRINCIPAL_COLUMNS
+from fast_api.models import User
+from fast_api.security import hashing_executor, warm_up_hashing
+
+logger = logging.getLogger('uvicorn.error')
+
+
+def pool_target(engine) -> int:
+    """Conexões que o pool mantém abertas; sem pool próprio, uma só."""
+    pool = engine.pool
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        return pool.size()
+
+    return 1
+
+
+async def warm_pool(engine, connections: int):
+    """Abre ``connections`` conexões ao mesmo tempo e valida cada uma.
+
+    A consulta é a mesma de ``get_current_user``, então o SQL compilado
+    já fica no cache do engine. Se uma conexão falha, o ``TaskGroup``
+    cancela e espera as outras antes de a pilha devolver ao pool as que
+    chegaram a abrir.
+    """
+
+    async def open_connection(stack):
+        connection = await stack.enter_async_context(engine.connect())
+        await connection.execute(
+            select(*PRINCIPAL_COLUMNS).where(User.email == 'warm-up')
+        )
+
+    async with AsyncExitStack() as stack, asyncio.TaskGroup() as group:
+        for _ in range(connections):
+            group.create_task(open_connection(stack))
+
+
+async def _warm_engine(engine):
+    try:
+        await warm_pool(engine, pool_target(engine))
+    except* (OSError, SQLAlchemyError) as group:
+        logger.warning(
+            'Pool warm-up failed for %s: %s', engine.url, group.exceptions[0]
+        )
+
+
+async def warm_up(timeout: float) -> float:
+    started = perf_counter()
+    try:
+        async with asyncio.timeout(timeout):
+            await asyncio.gather(
+                *(
+                    _warm_engine(engine)
+                    for engine in (replicas.primary, *replicas.replicas)
+                ),
+                hashing_executor.warm_up(warm_up_hashing),
+            )
+    except TimeoutError:
+        logger.warning('Warm-up gave up after %.1f s', timeout)
+        return perf_counter() - started
+
+    elapsed = perf_counter() - started
+    logger.info('Warm-up finished in %.0f ms', elapsed * 1000)
+    return elapsed
@@ -0,0 +1,112 @@
+"""Um conjunto só de listeners por engine para medir os statements.
+
+``watch_statements`` cronometra cada statement uma vez, entre
+``before_cursor_execute`` e ``after_cursor_execute``, e entrega o tempo
+ao histograma do ``/metrics`` e a ``queries.statement_finished``, que
+soma na conta da requisição e registra os lentos. Numa requisição com
+tracing o statement também ganha um span ``CLIENT``.
+
+O ``COPY`` da importação roda direto no cursor do psycopg, sem esses
+eventos; ``measure_statement`` faz a mesma medição em volta dele.
+
+O statement em andamento fica em ``conn.info`` junto com o seu
+``ExecutionContext``. ``handle_error`` também dispara para erros
+anteriores ao cursor (um parâmetro que o tipo da coluna recusa, por
+exemplo): aí não há statement em andamento para fechar e o erro original
+segue intacto.
+"""
+
+from contextlib import asynccontextmanager
+from time import perf_counter
+
+from sqlalchemy import event
+
+from fast_api.metrics import (
+    DB_STATEMENT_ERRORS,
+    DB_STATEMENT_SECONDS,
+    statement_operation,
+)
+from fast_api.queries import statement_finished
+from fast_api.tracing import statement_span
+
+IN_FLIGHT = 'statement_in_flight'
+
+
+def _take_in_flight(conn, context):
+    """Tira de ``conn.info`` o statement de ``context``, se ele começou."""
+    in_flight = conn.info.get(IN_FLIGHT)
+    if in_flight is None or in_flight[0] is not context:
+        return None
+
+    del conn.info[IN_FLIGHT]
+    return in_flight
+
+
+def _finish(statement, started, span, slow_seconds, error=None):
+    seconds = perf_counter() - started
+    if error is None:
+        DB_STATEMENT_SECONDS.observe(seconds, statement_operation(statement))
+    statement_finished(statement, seconds, slow_seconds)
+    if span is not None:
+        if error is not None:
+            span.fail(error)
+        span.end()
+
+
+@asynccontextmanager
+async def measure_statement(statement: str, slow_seconds: float = 0.0):
+    """Mede o que roda fora do cursor do SQLAlchemy, como o ``COPY``."""
+    started, span = perf_counter(), statement_span(statement)
+    try:
+        yield
+    except Exception as error:
+        DB_STATEMENT_ERRORS.inc(statement_operation(statement))
+        _finish(statement, started, span, slow_seconds, error)
+        raise
+
+    _finish(statement, started, span, slow_seconds)
+
+
+def watch_statements(engine, slow_seconds: float = 0.0):
+    """Mede cada statement do ``engine`` pelos eventos do SQLAlchemy."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, 'before_cursor_execute', named=True)
+    def before_cursor_execute(conn, statement, context, **kw):
+        conn.info[IN_FLIGHT] = (
+            context,
+            perf_counter(),
+            statement_span(statement),
+        )
+
+    @event.listens_for(sync_engine, 'after_cursor_execute', named=True)
+    def after_cursor_execute(conn, statement, context, **kw):
+        in_flight = _take_in_flight(conn, context)
+        if in_flight is None:
+            return
+
+        _, started, span = in_flight
+        _finish(statement, started, span, slow_seconds)
+
+    @event.listens_for(sync_engine, 'handle_error')
+    def handle_error(context):
+        if context.statement is None:  # falha ao conectar
+            return
+
+        DB_STATEMENT_ERRORS.inc(statement_operation(context.statement))
+        in_flight = _take_in_flight(
+            context.connection, context.execution_context
+        )
+        if in_flight is None:
+            return
+
+        _, started, span = in_flight
+        _finish(
+            context.statement,
+            started,
+            span,
+            slow_seconds,
+            context.original_exception,
+        )
+
+    return engine
@@ -0,0 +1,452 @@
+"""Spans da requisição até o SQL, exportados em OTLP/JSON.
+
+Com ``TRACING_EXPORTER`` ligado, cada requisição sorteada (fração
+``TRACING_SAMPLE_RATE``, ou a decisão de um ``traceparent`` recebido)
+abre um span raiz e, dentro dele, um span por dependência marcada com
+``traced`` (``get_session``, ``get_current_user``...), por statement
+SQL, por chamada do Argon2 e pela serialização da resposta. O span
+ativo fica num ``ContextVar``, que o SQLAlchemy propaga para o greenlet
+onde os eventos do engine rodam.
+
+Exportadores:
+
+- ``file``: uma linha de OTLP/JSON por lote em ``TRACING_FILE`` (o
+  receiver ``otlpjsonfile`` do OpenTelemetry Collector lê esse formato);
+- ``otlp``: ``POST {TRACING_OTLP_ENDPOINT}/v1/traces`` em OTLP/HTTP com
+  JSON.
+
+Os spans vão para uma fila e uma thread exporta em lotes; se o destino
+não acompanhar, o excedente é descartado em vez de crescer a memória.
+Desligado, nada disso é instalado: o middleware não existe, ``traced``
+devolve a própria função e ``span`` e ``statement_span`` (chamado pelos
+listeners de ``fast_api.statements``) só leem o ``ContextVar``.
+"""
+
+import json
+import logging
+import random
+import re
+import threading
+import urllib.request
+from contextlib import (
+    AsyncExitStack,
+    asynccontextmanager,
+    contextmanager,
+    nullcontext,
+)
+from contextvars import ContextVar
+from functools import wraps
+from http import HTTPStatus
+from inspect import isasyncgenfunction
+from pathlib import Path
+from time import time_ns
+
+from starlette.datastructures import Headers
+
+from fast_api.metrics import statement_operation
+from fast_api.settings import Settings, get_settings
+
+logger = logging.getLogger('uvicorn.error')
+
+# SpanKind e StatusCode do OTLP
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+STATUS_ERROR = 2
+MAX_STATEMENT_LENGTH = 2048
+TRACEPARENT = re.compile(
+    r'[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})'
+)
+
+_current: ContextVar['Span | None'] = ContextVar('span', default=None)
+
+
+def _new_id(bits: int) -> str:
+    return f'{random.getrandbits(bits):0{bits // 4}x}'
+
+
+def _attribute_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class Span:
+    __slots__ = (
+        'attributes',
+        'end_ns',
+        'error',
+        'finished',
+        'kind',
+        'name',
+        'parent_id',
+        'span_id',
+        'start_ns',
+        'trace_id',
+    )
+
+    def __init__(self, name, trace_id, parent_id=None, kind=INTERNAL):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = {}
+        self.error = None
+        self.start_ns = time_ns()
+        self.end_ns = None
+        # spans encerrados do trace, exportados juntos com a raiz
+        self.finished = []
+
+    def child(self, name, kind=INTERNAL):
+        child = Span(name, self.trace_id, self.span_id, kind)
+        child.finished = self.finished
+        return child
+
+    def fail(self, error: BaseException):
+        self.error = type(error).__name__
+
+    def end(self):
+        self.end_ns = time_ns()
+        self.finished.append(self)
+
+    def to_otlp(self):
+        encoded = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [
+                {'key': key, 'value': _attribute_value(value)}
+                for key, value in self.attributes.items()
+            ],
+        }
+        if self.parent_id:
+            encoded['parentSpanId'] = self.parent_id
+        if self.error:
+            encoded['status'] = {'code': STATUS_ERROR, 'message': self.error}
+        return encoded
+
+
+def encode_batch(spans, service_name: str) -> bytes:
+    return json.dumps({
+        'resourceSpans': [
+            {
+                'resource': {
+                    'attributes': [
+                        {
+                            'key': 'service.name',
+                            'value': {'stringValue': service_name},
+                        }
+                    ]
+                },
+                'scopeSpans': [
+                    {
+                        'scope': {'name': 'fast_api'},
+                        'spans': [span.to_otlp() for span in spans],
+                    }
+                ],
+            }
+        ]
+    }).encode()
+
+
+class FileWriter:
+    """Acrescenta uma linha por lote; vários workers podem dividir o
+    arquivo, pois cada lote é uma única escrita em modo append."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def write(self, payload: bytes):
+        with self.path.open('ab') as file:
+            file.write(payload + b'\n')
+
+
+class OtlpWriter:
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.url = endpoint.rstrip('/') + '/v1/traces'
+        self.timeout = timeout
+
+    def write(self, payload: bytes):
+        request = urllib.request.Request(
+            self.url,
+            data=payload,
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class MemoryWriter:
+    """Guarda os lotes decodificados; útil em testes e depuração."""
+
+    def __init__(self):
+        self.batches = []
+
+    def write(self, payload: bytes):
+        self.batches.append(json.loads(payload))
+
+    @property
+    def spans(self):
+        return [
+            span
+            for batch in self.batches
+            for resource in batch['resourceSpans']
+            for scope in resource['scopeSpans']
+            for span in scope['spans']
+        ]
+
+
+class BatchExporter:
+    """Fila limitada de spans exportada em lotes por uma thread."""
+
+    max_batch = 512
+    max_queue = 4096
+
+    def __init__(self, writer, service_name: str, interval: float = 1.0):
+        self.writer = writer
+        self.service_name = service_name
+        self.interval = interval
+        self.dropped = 0
+        self._spans = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def submit(self, spans):
+        with self._lock:
+            room = self.max_queue - len(self._spans)
+            self.dropped += max(len(spans) - room, 0)
+            self._spans.extend(spans[:room])
+            if self._thread is None:
+                # só na primeira requisição amostrada, já no worker
+                self._thread = threading.Thread(
+                    target=self._run, name='trace-exporter', daemon=True
+                )
+                self._thread.start()
+            if len(self._spans) >= self.max_batch:
+                self._wake.set()
+
+    def _take(self):
+        with self._lock:
+            batch = self._spans[: self.max_batch]
+            del self._spans[: self.max_batch]
+        return batch
+
+    def flush(self):
+        while batch := self._take():
+            try:
+                self.writer.write(encode_batch(batch, self.service_name))
+            except OSError as error:
+                logger.warning(
+                    'Could not export %d spans: %s', len(batch), error
+                )
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def shutdown(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+
+def parse_traceparent(header: str | None):
+    """``(trace_id, parent_id, sampled)`` de um ``traceparent`` W3C."""
+    match = TRACEPARENT.fullmatch(header.strip().lower()) if header else None
+    if match is None:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+class Tracer:
+    def __init__(self, exporter=None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start(self, name: str, traceparent: str | None = None):
+        """Span raiz da requisição, ou ``None`` se ela não foi amostrada.
+
+        Um ``traceparent`` válido decide por nós: o span continua o
+        trace de quem chamou e segue a amostragem dele.
+        """
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+            if not sampled:
+                return None
+            return Span(name, trace_id, parent_id, SERVER)
+
+        if random.random() >= self.sample_rate:
+            return None
+        return Span(name, _new_id(128), kind=SERVER)
+
+    def finish(self, root: Span):
+        root.end()
+        self.exporter.submit(root.finished)
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+def create_tracer(settings: Settings) -> Tracer:
+    if settings.TRACING_EXPORTER == 'file':
+        writer = FileWriter(settings.TRACING_FILE)
+    elif settings.TRACING_EXPORTER == 'otlp':
+        writer = OtlpWriter(settings.TRACING_OTLP_ENDPOINT)
+    else:
+        return Tracer()
+
+    return Tracer(
+        BatchExporter(writer, settings.TRACING_SERVICE_NAME),
+        sample_rate=settings.TRACING_SAMPLE_RATE,
+    )
+
+
+tracer = create_tracer(get_settings())
+
+NOOP = nullcontext()
+
+
+@contextmanager
+def _child_span(parent: Span, name: str, kind: int, attributes):
+    child = parent.child(name, kind)
+    child.attributes.update(attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as error:
+        child.fail(error)
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+
+def span(name: str, kind: int = INTERNAL, **attributes):
+    """Span filho do ativo; fora de uma requisição amostrada, nada."""
+    parent = _current.get()
+    if parent is None:
+        return NOOP
+    return _child_span(parent, name, kind, attributes)
+
+
+def wrap_in_span(func, name: str):
+    """Envolve uma dependência ``async`` num span.
+
+    Em dependências com ``yield`` o span cobre só a preparação, até o
+    valor ser entregue à rota; o encerramento roda depois da resposta.
+    """
+    if isasyncgenfunction(func):
+        manager = asynccontextmanager(func)
+
+        @wraps(func)
+        async def generator_wrapper(*args, **kwargs):
+            async with AsyncExitStack() as stack:
+                with span(name):
+                    value = await stack.enter_async_context(
+                        manager(*args, **kwargs)
+                    )
+                yield value
+
+        return generator_wrapper
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with span(name):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+def traced(name: str):
+    """Decorador de ``wrap_in_span``; sem tracing, devolve ``func``."""
+
+    def decorator(func):
+        if not tracer.enabled:
+            return func
+        return wrap_in_span(func, name)
+
+    return decorator
+
+
+def statement_span(statement: str) -> Span | None:
+    """Span ``CLIENT`` do statement; o listener do engine o encerra."""
+    parent = _current.get()
+    if parent is None:
+        return None
+
+    child = parent.child(f'SQL {statement_operation(statement)}', CLIENT)
+    child.attributes.update({
+        'db.system': 'postgresql',
+        'db.statement': statement[:MAX_STATEMENT_LENGTH],
+    })
+    return child
+
+
+class TracingMiddleware:
+    """Abre o span raiz e o nomeia pela rota ao final."""
+
+    def __init__(self, app, tracer: Tracer = tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        root = self.tracer.start(
+            method, Headers(scope=scope).get('traceparent')
+        )
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        root.attributes.update({
+            'http.request.method': method,
+            'url.path': scope['path'],
+        })
+        status = HTTPStatus.INTERNAL_SERVER_ERROR.value
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        token = _current.set(root)
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException as error:
+            root.fail(error)
+            raise
+        finally:
+            _current.reset(token)
+            route = getattr(scope.get('route'), 'path', None)
+            if route is not None:
+                root.name = f'{method} {route}'
+                root.attributes['http.route'] = route
+            root.attributes['http.response.status_code'] = status
+            if status >= HTTPStatus.INTERNAL_SERVER_ERROR and not root.error:
+                root.error = str(status)
+            self.tracer.finish(root)
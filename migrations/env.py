@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from fast_api.settings import Settings
+from fast_api.settings import get_settings
 from fast_api.models import table_registry
 
 import asyncio
@@ -19,7 +19,7 @@ if sys.platform == 'win32':
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config 
-config.set_main_option('sqlalchemy.url', Settings().DATABASE_URL)
+config.set_main_option('sqlalchemy.url', get_settings().DATABASE_URL)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -0,0 +1,41 @@
+"""cascade todos.user_id fk on user delete
+
+Revision ID: a3f1c9e2b7d4
+Revises: db7b3e83bc11
+Create Date: 2026-01-12 19:41:08.512934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9e2b7d4'
+down_revision: Union[str, Sequence[str], None] = 'db7b3e83bc11'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # User.todos não é mais carregado para deletar o usuário
+    # (passive_deletes=True); o banco remove as tarefas.
+    op.drop_constraint('todos_user_id_fkey', 'todos', type_='foreignkey')
+    op.create_foreign_key(
+        'todos_user_id_fkey',
+        'todos',
+        'users',
+        ['user_id'],
+        ['id'],
+        ondelete='CASCADE',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('todos_user_id_fkey', 'todos', type_='foreignkey')
+    op.create_foreign_key(
+        'todos_user_id_fkey', 'todos', 'users', ['user_id'], ['id']
+    )
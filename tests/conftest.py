@@ -1,7 +1,6 @@
 from contextlib import contextmanager
 from datetime import datetime
 
-import factory
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
@@ -10,24 +9,50 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from testcontainers.postgres import PostgresContainer
 
 from fast_api.app import app
-from fast_api.database import get_session
-from fast_api.models import User, table_registry
-from fast_api.security import get_password_hash
-from fast_api.settings import Settings
+from fast_api.cache import response_cache
+from fast_api.database import get_read_session, get_session
+from fast_api.models import table_registry
+from fast_api.security import (
+    get_current_user_read_session,
+    get_password_hash,
+    principal_cache,
+)
+from fast_api.settings import Settings, get_settings
+from tests.factories import UserFactory
 
 
 @pytest.fixture
-def client(session):
+def client(session, monkeypatch):
     def get_session_override():
         return session
 
+    # o aquecimento usaria o banco de DATABASE_URL, não o do teste
+    monkeypatch.setattr(get_settings(), 'STARTUP_WARMUP', False)
+
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_read_session] = get_session_override
+        app.dependency_overrides[get_current_user_read_session] = (
+            get_session_override
+        )
         yield client
 
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    yield
+    principal_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    yield
+    response_cache.backend.clear()
+    response_cache.reset_stats()
+
+
 @pytest.fixture(scope='session')
 def engine():
     with PostgresContainer('postgres:18', driver='psycopg') as postgres:
@@ -67,6 +92,47 @@ def mock_db_time():
     return _mock_db_time
 
 
+@contextmanager
+def _count_queries(engine, parameters: bool = False):
+    """Statements enviados ao banco; ``(statement, parâmetros)`` se pedido."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, params, *args):
+        statements.append((statement, params) if parameters else statement)
+
+    event.listen(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
+
+    yield statements
+
+    event.remove(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
+
+
+@pytest.fixture
+def count_queries(engine):
+    return lambda **options: _count_queries(engine, **options)
+
+
+@contextmanager
+def _max_queries(engine, limit: int):
+    with _count_queries(engine) as statements:
+        yield statements
+
+    assert len(statements) <= limit, (
+        f'{len(statements)} queries, expected at most {limit}:\n'
+        + '\n'.join(statements)
+    )
+
+
+@pytest.fixture
+def max_queries(engine):
+    """``with max_queries(3): client.get(...)`` falha acima de 3 queries."""
+    return lambda limit: _max_queries(engine, limit)
+
+
 @pytest_asyncio.fixture
 async def user(session: AsyncSession):
     password = 'testtest'
@@ -111,12 +177,3 @@ def token(client, user):
 @pytest.fixture
 def settings():
     return Settings()
-
-
-class UserFactory(factory.Factory):
-    class Meta:
-        model = User
-
-    username = factory.Sequence(lambda n: f'test{n}')
-    email = factory.LazyAttribute(lambda obj: f'{obj.username}@test.com')
-    password = factory.LazyAttribute(lambda obj: f'{obj.username}%Skaoskd289')
@@ -90,3 +90,29 @@ def test_token_expire_dont_refresh(client, user):
         )
         assert response.status_code == HTTPStatus.UNAUTHORIZED
         assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_get_token_queries(client, user, count_queries):
+    expected_queries = 1
+
+    with count_queries() as queries:
+        response = client.post(
+            '/auth/token',
+            data={'username': user.email, 'password': user.clean_password},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == expected_queries
+
+
+def test_refresh_token_queries(client, token, count_queries):
+    expected_queries = 1
+
+    with count_queries() as queries:
+        response = client.post(
+            '/auth/refresh_token',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == expected_queries
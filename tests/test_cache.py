@@ -0,0 +1,216 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from fast_api import cache as cache_module
+from fast_api.cache import (
+    MemoryCache,
+    RedisCache,
+    ResponseCache,
+    create_response_cache,
+)
+
+
+async def _read_command(reader):
+    header = await reader.readline()
+    if not header:
+        return None
+
+    args = []
+    for _ in range(int(header[1:])):
+        size = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(size + 2))[:-2])
+
+    return args
+
+
+@pytest_asyncio.fixture
+async def resp_server():
+    """Servidor de mentira que fala o bastante do protocolo do Redis."""
+    store = {}
+
+    async def handle(reader, writer):
+        while command := await _read_command(reader):
+            name, *args = command
+            match name.upper():
+                case b'GET':
+                    value = store.get(args[0])
+                    reply = (
+                        b'$-1\r\n'
+                        if value is None
+                        else b'$%d\r\n%s\r\n' % (len(value), value)
+                    )
+                case b'SET' if b'NX' in args[2:] and args[0] in store:
+                    reply = b'$-1\r\n'
+                case b'SET':
+                    store[args[0]] = args[1]
+                    reply = b'+OK\r\n'
+                case b'DEL':
+                    reply = b':%d\r\n' % (store.pop(args[0], None) is not None)
+                case b'SELECT':
+                    reply = b'+OK\r\n'
+                case _:
+                    reply = b'-ERR unknown command\r\n'
+            writer.write(reply)
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', 0)
+    host, port = server.sockets[0].getsockname()
+
+    yield f'redis://{host}:{port}/1', store
+
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_ttl(monkeypatch):
+    cache = MemoryCache(maxsize=2, ttl=10)
+    monkeypatch.setattr(cache_module, 'monotonic', lambda: 100.0)
+    await cache.set('key', b'value')
+
+    assert await cache.get('key') == b'value'
+
+    monkeypatch.setattr(cache_module, 'monotonic', lambda: 110.0)
+    assert await cache.get('key') is None
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(maxsize=2, ttl=10)
+    await cache.set('a', b'1')
+    await cache.set('b', b'2')
+    await cache.get('a')
+    await cache.set('c', b'3')
+
+    assert await cache.get('a') == b'1'
+    assert await cache.get('b') is None
+    assert await cache.get('c') == b'3'
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_add_keeps_existing_value():
+    cache = MemoryCache(maxsize=2, ttl=10)
+    await cache.add('key', b'first')
+    await cache.add('key', b'second')
+
+    assert await cache.get('key') == b'first'
+
+
+@pytest.mark.asyncio
+async def test_redis_cache(resp_server):
+    url, store = resp_server
+    cache = RedisCache(url, ttl=10)
+
+    await cache.set('key', b'binary\r\nvalue')
+    assert store == {b'key': b'binary\r\nvalue'}
+    assert await cache.get('key') == b'binary\r\nvalue'
+
+    await cache.add('key', b'other')
+    assert store == {b'key': b'binary\r\nvalue'}
+
+    await cache.delete('key')
+    assert await cache.get('key') is None
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_reuses_pooled_connections(resp_server):
+    url, _ = resp_server
+    pool_size = 2
+    cache = RedisCache(url, ttl=10, pool_size=pool_size)
+
+    await asyncio.gather(*(cache.get(f'key{n}') for n in range(5)))
+    assert len(cache._idle) == pool_size
+
+    cache.clear()
+    assert cache._idle == []
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_wait_for_connection_counts_in_timeout():
+    async def stall(reader, writer):
+        await reader.read()  # nunca responde
+
+    server = await asyncio.start_server(stall, '127.0.0.1', 0)
+    host, port = server.sockets[0].getsockname()
+    timeout = 0.2
+    cache = RedisCache(
+        f'redis://{host}:{port}/0', ttl=10, timeout=timeout, pool_size=1
+    )
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    results = await asyncio.gather(
+        cache.get('a'), cache.get('b'), return_exceptions=True
+    )
+    elapsed = loop.time() - started
+
+    server.close()
+    assert all(isinstance(result, TimeoutError) for result in results)
+    # quem esperou a conexão desistiu junto, sem somar outro timeout
+    assert elapsed < timeout * 1.5
+
+
+@pytest.mark.asyncio
+async def test_response_cache_counts_hits_and_misses(resp_server):
+    url, _ = resp_server
+    response_cache = ResponseCache(RedisCache(url, ttl=10), max_age=5)
+
+    assert await response_cache.get('users', 1) is None
+    await response_cache.set('users', 1, 'W/"tag"', b'{"id": 1}')
+    assert await response_cache.get('users', 1) == ('W/"tag"', b'{"id": 1}')
+
+    assert response_cache.stats() == {
+        'users': {'hits': 1, 'misses': 1, 'errors': 0}
+    }
+
+
+@pytest.mark.asyncio
+async def test_response_cache_unreachable_backend_is_a_miss():
+    response_cache = ResponseCache(
+        RedisCache('redis://127.0.0.1:1/0', ttl=10), max_age=5
+    )
+
+    await response_cache.set('users', 1, 'W/"tag"', b'{}')
+
+    assert await response_cache.get('users', 1) is None
+    assert response_cache.stats() == {
+        'users': {'hits': 0, 'misses': 1, 'errors': 2}
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('backend', ['memory', 'redis'])
+async def test_response_cache_is_not_refilled_after_invalidate(
+    resp_server, backend
+):
+    url, _ = resp_server
+    if backend == 'redis':
+        response_cache = ResponseCache(RedisCache(url, ttl=10), max_age=5)
+    else:
+        response_cache = ResponseCache(MemoryCache(8, ttl=10), max_age=5)
+
+    # uma leitura que viu a versão antiga termina depois da escrita
+    await response_cache.invalidate('users', 1)
+    await response_cache.set('users', 1, 'W/"old"', b'{"id": 1}')
+
+    assert await response_cache.get('users', 1) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('workers', 'enabled'), [(0, True), (1, True), (4, False)]
+)
+async def test_memory_response_cache_is_off_with_several_workers(
+    settings, workers, enabled
+):
+    settings = settings.model_copy(
+        update={'RESPONSE_CACHE_BACKEND': 'memory', 'SERVER_WORKERS': workers}
+    )
+    response_cache = create_response_cache(settings)
+
+    await response_cache.set('users', 1, 'W/"tag"', b'{"id": 1}')
+
+    assert (await response_cache.get('users', 1) is not None) is enabled
@@ -0,0 +1,146 @@
+import asyncio
+import gzip
+import zlib
+from http import HTTPStatus
+
+import pytest
+from starlette.responses import PlainTextResponse, StreamingResponse
+
+from fast_api.compression import (
+    CompressionMiddleware,
+    GzipCompressor,
+    choose_encoding,
+)
+from tests.factories import TodoFactory
+
+ENCODINGS = {'zstd': None, 'br': None, 'gzip': None}
+
+
+@pytest.mark.parametrize(
+    ('accept_encoding', 'expected'),
+    [
+        ('', None),
+        ('identity', None),
+        ('gzip', 'gzip'),
+        ('gzip, br, zstd', 'zstd'),
+        ('gzip;q=1.0, br;q=0.5', 'gzip'),
+        ('br;q=0, gzip;q=0.1', 'gzip'),
+        ('*', 'zstd'),
+        ('*;q=0.5, zstd;q=0', 'br'),
+    ],
+)
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding, ENCODINGS) == expected
+
+
+async def _call(app, accept_encoding='gzip'):
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/',
+        'headers': [(b'accept-encoding', accept_encoding.encode())],
+    }
+    messages = []
+
+    async def receive():
+        # sem disconnect: o StreamingResponse fica esperando aqui
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await CompressionMiddleware(app, minimum_size=100)(scope, receive, send)
+
+    start, *bodies = messages
+    return dict(start['headers']), [body['body'] for body in bodies]
+
+
+@pytest.mark.asyncio
+async def test_small_response_is_not_compressed():
+    headers, bodies = await _call(PlainTextResponse('x' * 99))
+
+    assert b'content-encoding' not in headers
+    assert headers[b'vary'] == b'Accept-Encoding'
+    assert bodies == [b'x' * 99]
+
+
+@pytest.mark.asyncio
+async def test_large_response_is_compressed():
+    headers, [body] = await _call(PlainTextResponse('x' * 1000))
+
+    assert headers[b'content-encoding'] == b'gzip'
+    assert headers[b'content-length'] == str(len(body)).encode()
+    assert gzip.decompress(body) == b'x' * 1000
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_is_compressed_chunk_by_chunk():
+    chunks = [f'{n}'.encode() * 200 for n in range(3)]
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    headers, bodies = await _call(StreamingResponse(stream()))
+    decompressor = zlib.decompressobj(31)
+
+    assert headers[b'content-encoding'] == b'gzip'
+    assert b'content-length' not in headers
+    # cada pedaço já sai decodificável, sem esperar o fim do stream
+    assert [decompressor.decompress(body) for body in bodies[:3]] == chunks
+
+
+@pytest.mark.asyncio
+async def test_small_stream_is_not_compressed():
+    async def stream():
+        yield b'a'
+        yield b'b'
+
+    headers, bodies = await _call(StreamingResponse(stream()))
+
+    assert b'content-encoding' not in headers
+    assert b''.join(bodies) == b'ab'
+
+
+@pytest.mark.asyncio
+async def test_identity_is_not_compressed():
+    headers, _ = await _call(PlainTextResponse('x' * 1000), 'identity')
+
+    assert b'content-encoding' not in headers
+
+
+def test_gzip_compressor_round_trip():
+    compressor = GzipCompressor(level=6)
+
+    data = compressor.compress(b'abc' * 100) + compressor.finish()
+
+    assert gzip.decompress(data) == b'abc' * 100
+
+
+def test_read_root_is_not_compressed(client):
+    response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'content-encoding' not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_list_todos_is_compressed(client, session, user, token):
+    expected_todos = 10  # limite padrão da página
+    session.add_all(
+        TodoFactory.create_batch(
+            expected_todos, user_id=user.id, description='descrição ' * 20
+        )
+    )
+    await session.commit()
+
+    response = client.get(
+        '/todos/',
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Accept-Encoding': 'gzip',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-encoding'] == 'gzip'
+    assert len(response.json()['todos']) == expected_todos
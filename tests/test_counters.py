@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import select
+
+from fast_api.counters import rebuild_counters, state_changes
+from fast_api.models import TodoCounter, TodoState
+from tests.factories import TodoFactory
+
+
+def test_state_changes():
+    changes = [
+        (None, TodoState.todo),
+        (None, TodoState.todo),
+        (TodoState.todo, TodoState.done),
+        (TodoState.doing, TodoState.doing),
+        (TodoState.draft, None),
+    ]
+
+    assert state_changes(changes) == {
+        TodoState.todo: 1,
+        TodoState.done: 1,
+        TodoState.draft: -1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_rebuild_counters(session, user, other_user):
+    session.add_all(
+        TodoFactory.create_batch(3, user_id=user.id, state=TodoState.done)
+        + TodoFactory.create_batch(2, user_id=other_user.id)
+    )
+    session.add(TodoCounter(user_id=user.id, state=TodoState.draft, count=7))
+    await session.commit()
+
+    rebuilt = await rebuild_counters(session, user.id)
+    await session.commit()
+    counters = await session.execute(
+        select(TodoCounter.state, TodoCounter.count).where(
+            TodoCounter.user_id == user.id
+        )
+    )
+
+    assert rebuilt == 1
+    assert counters.all() == [(TodoState.done, 3)]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_all_counters(session, user, other_user):
+    expected_rows = 2
+    session.add_all(
+        TodoFactory.create_batch(2, user_id=user.id, state=TodoState.todo)
+        + TodoFactory.create_batch(
+            1, user_id=other_user.id, state=TodoState.todo
+        )
+    )
+    await session.commit()
+
+    rebuilt = await rebuild_counters(session)
+    await session.commit()
+    counters = await session.execute(
+        select(TodoCounter.user_id, TodoCounter.count).order_by(
+            TodoCounter.user_id
+        )
+    )
+
+    assert rebuilt == expected_rows
+    assert counters.all() == [(user.id, 2), (other_user.id, 1)]
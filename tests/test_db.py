@@ -1,10 +1,14 @@
 from dataclasses import asdict
+from http import HTTPStatus
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from fast_api.models import User
+from fast_api.database import create_engine, pool_stats
+from fast_api.models import Todo, TodoState, User
 
 
 @pytest.mark.asyncio
@@ -17,7 +21,9 @@ async def test_create_user(session: AsyncSession, mock_db_time):
         await session.commit()
 
         user = await session.scalar(
-            select(User).where(User.username == 'alice')
+            select(User)
+            .where(User.username == 'alice')
+            .options(selectinload(User.todos))
         )
 
     assert asdict(user) == {
@@ -27,5 +33,96 @@ async def test_create_user(session: AsyncSession, mock_db_time):
         'password': 'secret',
         'created_at': time,
         'updated_at': time,
+        'todos_version': 0,
         'todos': [],
     }
+
+
+@pytest.mark.asyncio
+async def test_delete_user_should_delete_todos(session: AsyncSession, user):
+    session.add(
+        Todo(title='t', description='d', state=TodoState.todo, user_id=user.id)
+    )
+    await session.commit()
+
+    await session.delete(user)
+    await session.commit()
+
+    todos = await session.scalars(select(Todo.id))
+
+    assert todos.all() == []
+
+
+@pytest.fixture
+def pool_settings(settings, engine):
+    return settings.model_copy(
+        update={
+            'DATABASE_URL': engine.url.render_as_string(hide_password=False),
+            'DATABASE_POOL_SIZE': 1,
+            'DATABASE_MAX_OVERFLOW': 0,
+            'DATABASE_POOL_TIMEOUT': 0.1,
+            'DATABASE_STATEMENT_TIMEOUT': 250,
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_stats(pool_settings):
+    engine = create_engine(pool_settings)
+
+    async with engine.connect() as conn:
+        stats = pool_stats(engine)
+        statement_timeout = await conn.scalar(text('SHOW statement_timeout'))
+
+    assert stats['size'] == 1
+    assert stats['checked_out'] == 1
+    assert stats['checkouts'] == 1
+    assert statement_timeout == '250ms'
+    assert pool_stats(engine)['checked_out'] == 0
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_timeout(pool_settings):
+    engine = create_engine(pool_settings)
+
+    async with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            async with engine.connect():
+                pass
+
+    stats = pool_stats(engine)
+    assert stats['timeouts'] == 1
+    assert stats['max_wait_seconds'] >= pool_settings.DATABASE_POOL_TIMEOUT
+    await engine.dispose()
+
+
+def test_read_pool_status(client):
+    response = client.get('/health/pool')
+
+    assert response.status_code == HTTPStatus.OK
+    assert {
+        'checked_out',
+        'overflow',
+        'wait_seconds',
+    } <= response.json().keys()
+
+
+@pytest.mark.asyncio
+async def test_external_pool_mode(pool_settings):
+    settings = pool_settings.model_copy(
+        update={'DATABASE_POOL_MODE': 'external'}
+    )
+    engine = create_engine(settings)
+
+    async with engine.connect() as conn:
+        raw_connection = await conn.get_raw_connection()
+        prepare_threshold = raw_connection.driver_connection.prepare_threshold
+        statement_timeout = await conn.scalar(text('SHOW statement_timeout'))
+
+    stats = pool_stats(engine)
+    assert prepare_threshold is None
+    assert statement_timeout == '0'
+    assert stats['size'] == 0
+    assert stats['checkouts'] == 1
+    await engine.dispose()
@@ -0,0 +1,27 @@
+import pytest
+
+from fast_api.etags import etag_matches, make_etag
+
+
+def test_make_etag_is_weak_and_stable():
+    etag = make_etag('todos', 1, 2)
+
+    assert etag.startswith('W/"')
+    assert etag == make_etag('todos', 1, 2)
+    assert etag != make_etag('todos', 1, 3)
+
+
+@pytest.mark.parametrize(
+    ('if_none_match', 'matches'),
+    [
+        (None, False),
+        ('', False),
+        ('*', True),
+        ('W/"abc"', True),
+        ('"abc"', True),
+        ('"xyz", W/"abc"', True),
+        ('"xyz"', False),
+    ],
+)
+def test_etag_matches(if_none_match, matches):
+    assert etag_matches(if_none_match, 'W/"abc"') is matches
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+
+from fast_api.hashing import HashingExecutor
+from fast_api.security import (
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+    warm_up_hashing,
+)
+
+
+@pytest.mark.asyncio
+async def test_hashing_executor_run():
+    expected_result = 6
+    executor = HashingExecutor(max_workers=1, queue_limit=0)
+
+    result = await executor.run(sum, [1, 2, 3])
+
+    assert result == expected_result
+    assert executor.stats()['completed'] == 1
+    assert executor.stats()['in_flight'] == 0
+
+
+@pytest.mark.asyncio
+async def test_hashing_executor_should_reject_when_queue_is_full():
+    expected_completed = 2
+    executor = HashingExecutor(max_workers=1, queue_limit=1)
+    release = threading.Event()
+
+    running = asyncio.create_task(executor.run(release.wait))
+    queued = asyncio.create_task(executor.run(release.wait))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc:
+        await executor.run(release.wait)
+
+    assert exc.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert executor.stats()['queued'] == 1
+    assert executor.stats()['rejected'] == 1
+
+    release.set()
+    await asyncio.gather(running, queued)
+
+    assert executor.stats()['completed'] == expected_completed
+    assert executor.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_password_hash_async():
+    hashed = await get_password_hash_async('secret')
+
+    assert verify_password('secret', hashed)
+    assert await verify_password_async('secret', hashed)
+    assert not await verify_password_async('wrong', hashed)
+
+
+@pytest.mark.asyncio
+async def test_hashing_executor_warm_up_is_not_counted():
+    executor = HashingExecutor(max_workers=1, queue_limit=0)
+
+    await executor.warm_up(warm_up_hashing)
+
+    assert executor.stats()['completed'] == 0
+    assert executor.stats()['run_seconds'] == 0
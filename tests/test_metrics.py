@@ -0,0 +1,177 @@
+import json
+import os
+import subprocess
+import sys
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from fast_api.metrics import (
+    DB_STATEMENT_SECONDS,
+    PASSWORD_HASHING_SECONDS,
+    Counter,
+    Histogram,
+    MetricsStore,
+    Registry,
+    family,
+    merge,
+    registry,
+    render,
+    statement_operation,
+)
+from fast_api.security import get_password_hash
+from fast_api.statements import watch_statements
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    registry.clear()
+    yield
+    registry.clear()
+
+
+def _count(histogram, *labels):
+    samples = {tuple(k): v for k, v in histogram.collect()['samples']}
+    return sum(samples.get(labels, [0, 0])[:-1])
+
+
+def test_render_counter_with_escaped_labels():
+    counter = Counter('requests_total', 'Requests.', ('path',))
+    counter.inc('/a"b')
+    counter.inc('/a"b', amount=2)
+
+    assert render({'requests_total': counter.collect()}) == (
+        '# HELP requests_total Requests.\n'
+        '# TYPE requests_total counter\n'
+        'requests_total{path="/a\\"b"} 3.0\n'
+    )
+
+
+def test_render_histogram_is_cumulative():
+    histogram = Histogram('latency', 'Latency.', buckets=(0.01, 0.1))
+    histogram.observe(0.005)
+    histogram.observe(0.05)
+    histogram.observe(1.0)
+
+    lines = render({'latency': histogram.collect()}).splitlines()
+
+    assert lines[2:] == [
+        'latency_bucket{le="0.01"} 1',
+        'latency_bucket{le="0.1"} 2',
+        'latency_bucket{le="+Inf"} 3',
+        'latency_sum 1.055',
+        'latency_count 3',
+    ]
+
+
+def test_merge_sums_samples_and_drops_gauges():
+    expected_total = 5
+    first = {
+        'hits': family('counter', 'Hits.', ('route',), [[['a'], 2]]),
+        'open': family('gauge', 'Open.', (), [[[], 4]]),
+        'latency': family('histogram', 'L.', (), [[[], [1, 0, 0.1]]], [1]),
+    }
+    second = {
+        'hits': family('counter', 'Hits.', ('route',), [[['a'], 3]]),
+        'latency': family('histogram', 'L.', (), [[[], [0, 1, 2.0]]], [1]),
+    }
+
+    merged = merge(merge({}, first, gauges=False), second)
+
+    assert 'open' not in merged
+    assert merged['hits']['samples'] == [[['a'], expected_total]]
+    assert merged['latency']['samples'] == [[[], [1, 1, 2.1]]]
+
+
+@pytest.mark.parametrize(
+    ('statement', 'expected'),
+    [
+        ('SELECT 1', 'SELECT'),
+        ('  insert into todos', 'INSERT'),
+        ('UPDATE users', 'UPDATE'),
+        ('DELETE FROM todos', 'DELETE'),
+        ('WITH old AS (SELECT 1) SELECT 1', 'WITH'),
+        ('BEGIN', 'OTHER'),
+    ],
+)
+def test_statement_operation(statement, expected):
+    assert statement_operation(statement) == expected
+
+
+def _dead_pid():
+    child = subprocess.Popen([sys.executable, '-c', 'pass'])
+    child.wait()
+    return child.pid
+
+
+def test_metrics_store_aggregates_workers(tmp_path):
+    expected_requests = 6
+    local = Registry()
+    local.counter('requests_total', 'Requests.').inc(amount=1)
+    store = MetricsStore(tmp_path, local)
+
+    def worker_snapshot(requests):
+        return {
+            'requests_total': family(
+                'counter', 'Requests.', (), [[[], requests]]
+            ),
+            'busy': family('gauge', 'Busy.', (), [[[], 1]]),
+        }
+
+    live, dead = os.getppid(), _dead_pid()
+    (tmp_path / f'worker-{live}.json').write_text(
+        json.dumps(worker_snapshot(2)), encoding='utf-8'
+    )
+    (tmp_path / f'worker-{dead}.json').write_text(
+        json.dumps(worker_snapshot(3)), encoding='utf-8'
+    )
+
+    merged = store.collect()
+
+    assert merged['requests_total']['samples'] == [[[], expected_requests]]
+    assert merged['busy']['samples'] == [[[], 1]]
+    assert not (tmp_path / f'worker-{dead}.json').exists()
+
+    # o contador do worker morto continua somado pelo archive.json
+    assert store.collect()['requests_total']['samples'] == [
+        [[], expected_requests]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_watched_engine_times_statements(session, engine):
+    instrumented = watch_statements(create_async_engine(engine.url))
+
+    async with instrumented.connect() as conn:
+        await conn.execute(text('SELECT 1'))
+
+    assert _count(DB_STATEMENT_SECONDS, 'SELECT') == 1
+    await instrumented.dispose()
+
+
+def test_password_hashing_is_timed():
+    get_password_hash('secret')
+
+    assert _count(PASSWORD_HASHING_SECONDS, 'hash') == 1
+
+
+def test_metrics_endpoint(client):
+    client.get('/')
+    client.get('/users/999')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/plain')
+    assert (
+        'http_requests_total{method="GET",route="/",status="200"} 1.0'
+        in response.text
+    )
+    assert (
+        'http_requests_total{method="GET",route="/users/{user_id}",'
+        'status="404"} 1.0' in response.text
+    )
+    assert 'db_pool_size{pool="primary"}' in response.text
+    assert 'password_hashing_queued 0.0' in response.text
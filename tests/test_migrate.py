@@ -0,0 +1,80 @@
+import pytest
+from alembic.config import Config
+from sqlalchemy import text
+
+from fast_api import migrate as migrate_module
+from fast_api.migrate import database_revisions, migrate, script_heads
+
+
+@pytest.fixture
+def alembic_config():
+    return Config('alembic.ini')
+
+
+@pytest.fixture
+def upgrades(monkeypatch):
+    upgrades = []
+    monkeypatch.setattr(
+        migrate_module.command,
+        'upgrade',
+        lambda config, revision: upgrades.append(revision),
+    )
+    return upgrades
+
+
+def _fake_revisions(monkeypatch, revisions):
+    async def database_revisions(settings):
+        return revisions
+
+    monkeypatch.setattr(
+        migrate_module, 'database_revisions', database_revisions
+    )
+
+
+def test_script_heads(alembic_config):
+    assert len(script_heads(alembic_config)) == 1
+
+
+def test_migrate_skips_when_at_head(
+    alembic_config, settings, upgrades, monkeypatch
+):
+    _fake_revisions(monkeypatch, script_heads(alembic_config))
+
+    assert not migrate(alembic_config, settings)
+    assert upgrades == []
+
+
+def test_migrate_upgrades_when_behind(
+    alembic_config, settings, upgrades, monkeypatch
+):
+    _fake_revisions(monkeypatch, set())
+
+    assert migrate(alembic_config, settings)
+    assert upgrades == ['head']
+
+
+@pytest.mark.asyncio
+async def test_database_revisions(engine, settings):
+    expected_revision = 'abc123'
+    settings = settings.model_copy(
+        update={'DATABASE_URL': engine.url.render_as_string(False)}
+    )
+
+    assert await database_revisions(settings) == set()
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                'CREATE TABLE alembic_version '
+                '(version_num varchar(32) PRIMARY KEY)'
+            )
+        )
+        await conn.execute(
+            text('INSERT INTO alembic_version VALUES (:revision)'),
+            {'revision': expected_revision},
+        )
+    try:
+        assert await database_revisions(settings) == {expected_revision}
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text('DROP TABLE alembic_version'))
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+import pytest
+
+from fast_api.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip():
+    created_at = datetime(2025, 5, 20, 12, 30, 15, 123456)
+
+    cursor = encode_cursor(created_at, 42)
+
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize('cursor', ['', 'abc', 'W10', 'WyJ4IiwgMV0'])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
@@ -0,0 +1,76 @@
+"""Roda o engine em modo ``external`` atrás de um PgBouncer real.
+
+Em modo transaction cada transação pode cair numa conexão diferente do
+servidor; as consultas repetidas e concorrentes abaixo quebrariam com
+prepared statements do lado do cliente.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from testcontainers.core.container import DockerContainer
+from testcontainers.core.network import Network
+from testcontainers.core.waiting_utils import wait_for_logs
+from testcontainers.postgres import PostgresContainer
+
+from fast_api.database import create_engine, pool_stats
+
+PGBOUNCER_PORT = 6432
+QUERIES = 20
+
+
+@pytest.fixture(scope='module')
+def pgbouncer_url():
+    with Network() as network:
+        with (
+            PostgresContainer('postgres:18', driver='psycopg')
+            .with_network(network)
+            .with_network_aliases('db') as postgres
+        ):
+            with (
+                DockerContainer('edoburu/pgbouncer:v1.24.1-p1')
+                .with_network(network)
+                .with_env(
+                    'DATABASE_URL',
+                    f'postgres://{postgres.username}:{postgres.password}'
+                    f'@db:5432/{postgres.dbname}',
+                )
+                .with_env('POOL_MODE', 'transaction')
+                .with_env('AUTH_TYPE', 'scram-sha-256')
+                .with_env('DEFAULT_POOL_SIZE', '2')
+                .with_env('LISTEN_PORT', str(PGBOUNCER_PORT))
+                .with_exposed_ports(PGBOUNCER_PORT) as pgbouncer
+            ):
+                wait_for_logs(pgbouncer, 'process up')
+                host = pgbouncer.get_container_host_ip()
+                port = pgbouncer.get_exposed_port(PGBOUNCER_PORT)
+                yield (
+                    f'postgresql+psycopg://{postgres.username}:'
+                    f'{postgres.password}@{host}:{port}/{postgres.dbname}'
+                )
+
+
+@pytest.mark.asyncio
+async def test_queries_through_pgbouncer(settings, pgbouncer_url):
+    engine = create_engine(
+        settings.model_copy(
+            update={
+                'DATABASE_URL': pgbouncer_url,
+                'DATABASE_POOL_MODE': 'external',
+            }
+        )
+    )
+
+    async def query(n):
+        async with engine.connect() as conn:
+            return await conn.scalar(text('SELECT :n'), {'n': n})
+
+    # mais do que o prepare_threshold padrão do psycopg (5)
+    sequential = [await query(n) for n in range(QUERIES)]
+    concurrent = await asyncio.gather(*(query(n) for n in range(QUERIES)))
+
+    assert sequential == list(range(QUERIES))
+    assert concurrent == list(range(QUERIES))
+    assert pool_stats(engine)['checkouts'] == QUERIES * 2
+    await engine.dispose()
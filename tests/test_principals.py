@@ -0,0 +1,70 @@
+import pytest
+
+from fast_api.principals import (
+    Principal,
+    PrincipalCache,
+    create_principal_cache,
+)
+
+alice = Principal(id=1, username='alice', email='alice@example.com')
+bob = Principal(id=2, username='bob', email='bob@example.com')
+
+
+def test_principal_cache_get_set():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+
+    cache.set(alice.email, alice)
+
+    assert cache.get(alice.email) == alice
+    assert cache.get(bob.email) is None
+
+
+def test_principal_cache_should_evict_least_recently_used():
+    cache = PrincipalCache(maxsize=1, ttl=60)
+
+    cache.set(alice.email, alice)
+    cache.set(bob.email, bob)
+
+    assert cache.get(alice.email) is None
+    assert cache.get(bob.email) == bob
+    assert len(cache) == 1
+
+
+def test_principal_cache_should_expire_entries():
+    cache = PrincipalCache(maxsize=10, ttl=0)
+
+    cache.set(alice.email, alice)
+
+    assert cache.get(alice.email) is None
+    assert len(cache) == 0
+
+
+def test_principal_cache_invalidate():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.set(alice.email, alice)
+
+    cache.invalidate(alice.email)
+
+    assert cache.get(alice.email) is None
+
+
+def test_principal_cache_disabled():
+    cache = PrincipalCache(maxsize=0, ttl=60)
+
+    cache.set(alice.email, alice)
+
+    assert cache.get(alice.email) is None
+
+
+@pytest.mark.parametrize(
+    ('workers', 'enabled'), [(0, True), (1, True), (4, False)]
+)
+def test_principal_cache_is_off_with_several_workers(
+    settings, workers, enabled
+):
+    settings = settings.model_copy(update={'SERVER_WORKERS': workers})
+    cache = create_principal_cache(settings)
+
+    cache.set(alice.email, alice)
+
+    assert (cache.get(alice.email) == alice) is enabled
@@ -0,0 +1,138 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from fast_api.queries import (
+    QueryStatsMiddleware,
+    RequestQueries,
+    server_timing,
+)
+from fast_api.statements import watch_statements
+from tests.factories import TodoFactory
+
+
+@pytest_asyncio.fixture
+async def watched(session, engine):
+    watched = watch_statements(create_async_engine(engine.url))
+    yield watched
+    await watched.dispose()
+
+
+def _app(watched, **options):
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, **options)
+
+    @app.get('/repeat/{times}')
+    async def repeat(times: int):
+        async with watched.connect() as conn:
+            for _ in range(times):
+                await conn.execute(text('SELECT 1'))
+            try:
+                await conn.execute(text('SELECT 1/0'))
+            except DBAPIError:
+                pass
+        return {'times': times}
+
+    return app
+
+
+async def _get(app, path):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        return await ac.get(path)
+
+
+def test_repeated_statements():
+    queries = RequestQueries()
+    for statement in ['SELECT a', 'SELECT a', 'SELECT a', 'SELECT b']:
+        queries.record(statement, 0.001)
+
+    assert queries.repeated(3) == [('SELECT a', 3)]
+    assert queries.repeated(4) == []
+
+
+def test_server_timing():
+    queries = RequestQueries()
+    queries.record('SELECT 1', 0.0025)
+    queries.record('SELECT 2', 0.001)
+
+    assert server_timing(queries) == 'db;dur=3.5;desc="2 queries"'
+
+
+@pytest.mark.asyncio
+async def test_debug_headers_count_request_queries(watched):
+    expected_queries = 4  # 3 x SELECT 1 + o que falhou
+
+    response = await _get(_app(watched, headers=True), '/repeat/3')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['x-db-queries'] == str(expected_queries)
+    assert response.headers['server-timing'].startswith('db;dur=')
+    assert response.headers['server-timing'].endswith(
+        f'desc="{expected_queries} queries"'
+    )
+
+
+@pytest.mark.asyncio
+async def test_no_headers_outside_debug(watched):
+    response = await _get(_app(watched), '/repeat/1')
+
+    assert 'x-db-queries' not in response.headers
+    assert 'server-timing' not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_repeated_statement_is_reported(watched, caplog):
+    app = _app(watched, repeat_threshold=3)
+
+    with caplog.at_level(logging.WARNING, logger='uvicorn.error'):
+        await _get(app, '/repeat/2')
+        assert 'Possible N+1' not in caplog.text
+
+        await _get(app, '/repeat/3')
+
+    assert (
+        'Possible N+1: statement ran 3 times in GET /repeat/3: SELECT 1'
+        in caplog.text
+    )
+
+
+@pytest.mark.asyncio
+async def test_slow_query_is_logged(session, engine, caplog):
+    slow = watch_statements(create_async_engine(engine.url), slow_seconds=1e-9)
+
+    with caplog.at_level(logging.WARNING, logger='uvicorn.error'):
+        async with slow.connect() as conn:
+            await conn.execute(text('SELECT 42'))
+    await slow.dispose()
+
+    assert 'Slow query' in caplog.text
+    assert 'SELECT 42' in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_list_todos_queries_do_not_grow_with_todos(
+    session, client, user, token, max_queries
+):
+    session.add_all(TodoFactory.create_batch(20, user_id=user.id))
+    await session.commit()
+
+    with max_queries(3):
+        response = client.get(
+            '/todos', headers={'Authorization': f'Bearer {token}'}
+        )
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_max_queries_fails_above_the_limit(client, user, max_queries):
+    with pytest.raises(AssertionError, match='1 queries, expected at most 0'):
+        with max_queries(0):
+            client.get(f'/users/{user.id}')
@@ -0,0 +1,168 @@
+"""Garante que nenhuma consulta das rotas cai em Seq Scan.
+
+O banco é populado com um volume parecido com o de produção; cada rota é
+chamada, os statements enviados ao banco são capturados e cada um passa
+por ``EXPLAIN`` com os mesmos parâmetros.
+"""
+
+from http import HTTPStatus
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, text
+
+from fast_api.counters import rebuild_counters
+from fast_api.models import Todo, TodoState, User
+
+USERS = 2_000
+TODOS_PER_USER = 10
+CURRENT_USER_TODOS = 2_000
+
+
+@pytest_asyncio.fixture
+async def dataset(session, user):
+    states = list(TodoState)
+    await session.execute(
+        insert(User),
+        [
+            {
+                'username': f'seed{n}',
+                'email': f'seed{n}@test.com',
+                'password': 'secret',
+            }
+            for n in range(USERS)
+        ],
+    )
+    await session.execute(
+        insert(Todo),
+        [
+            {
+                'title': f'minha tarefa {n}',
+                'description': f'descrição {n} mercado',
+                'state': states[n % len(states)],
+                'user_id': user.id,
+            }
+            for n in range(CURRENT_USER_TODOS)
+        ]
+        + [
+            {
+                'title': f'tarefa {n} comprar',
+                'description': f'descrição da tarefa {n}',
+                'state': states[n % len(states)],
+                'user_id': user_id,
+            }
+            for user_id in range(user.id + 1, user.id + USERS + 1)
+            for n in range(TODOS_PER_USER)
+        ],
+    )
+    await rebuild_counters(session)
+    await session.commit()
+
+    async with session.bind.connect() as conn:
+        await conn.execution_options(isolation_level='AUTOCOMMIT')
+        await conn.execute(text('ANALYZE'))
+
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _plan_nodes(child)
+
+
+async def _seq_scans(engine, statements):
+    seq_scans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(
+                f'EXPLAIN (FORMAT JSON) {statement}', parameters
+            )
+            [plan] = result.scalar()
+            seq_scans += [
+                (node['Relation Name'], statement)
+                for node in _plan_nodes(plan['Plan'])
+                if node['Node Type'] == 'Seq Scan'
+            ]
+        await conn.rollback()
+
+    return seq_scans
+
+
+# A ordem importa: as rotas que alteram ou removem o usuário vêm por último.
+ROUTES = [
+    ('post', '/auth/refresh_token', {}),
+    ('get', '/todos/', {}),
+    ('get', '/todos/?state=done', {}),
+    ('get', '/todos/?title=tarefa', {}),
+    ('get', '/todos/?description=mercado', {}),
+    ('get', '/todos/?search=fulltext&title=tarefa', {}),
+    ('get', '/todos/?offset=50&limit=20', {}),
+    ('get', '/todos/?cursor={cursor}', {}),
+    ('get', '/todos/export?state=done', {}),
+    ('get', '/todos/stats', {}),
+    ('post', '/todos/', {'json': {'title': 't', 'description': 'd'}}),
+    ('patch', '/todos/{todo_id}', {'json': {'state': 'done'}}),
+    ('delete', '/todos/{todo_id}', {}),
+    (
+        'post',
+        '/todos/batch',
+        {'json': {'todos': [{'title': 't', 'description': 'd'}] * 2}},
+    ),
+    (
+        'patch',
+        '/todos/batch',
+        {'json': {'todos': [{'id': 2, 'state': 'done'}, {'id': 3}]}},
+    ),
+    ('delete', '/todos/batch', {'json': {'ids': [4, 5]}}),
+    ('get', '/users/', {}),
+    ('get', '/users/?cursor={cursor}', {}),
+    ('get', '/users/{user_id}', {}),
+    ('put', '/users/{user_id}', {'json': {'username': 'u', 'password': 'p'}}),
+    ('delete', '/users/{user_id}', {}),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('dataset')
+async def test_route_queries_should_not_seq_scan(
+    client, engine, user, token, count_queries
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    seq_scans = []
+
+    for method, url, route_kwargs in ROUTES:
+        cursor = None
+        if '{cursor}' in url:
+            first_page = client.get(url.split('?')[0], headers=headers)
+            cursor = first_page.json()['next_cursor']
+
+        # as primeiras tarefas inseridas pelo dataset são do usuário logado
+        path = url.format(cursor=cursor, todo_id=1, user_id=user.id)
+        kwargs = route_kwargs
+        if method == 'put':
+            # mantém o email para o token continuar válido
+            kwargs = {'json': route_kwargs['json'] | {'email': user.email}}
+
+        with count_queries(parameters=True) as statements:
+            response = client.request(method, path, headers=headers, **kwargs)
+
+        assert response.status_code < HTTPStatus.BAD_REQUEST, url
+        assert statements, url
+        seq_scans += [
+            (f'{method.upper()} {url}', *seq_scan)
+            for seq_scan in await _seq_scans(engine, statements)
+        ]
+
+    assert seq_scans == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures('dataset')
+async def test_login_should_not_seq_scan(client, engine, user, count_queries):
+    with count_queries(parameters=True) as statements:
+        response = client.post(
+            '/auth/token',
+            data={'username': user.email, 'password': user.clean_password},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert await _seq_scans(engine, statements) == []
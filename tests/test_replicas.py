@@ -0,0 +1,153 @@
+from http import HTTPStatus
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from testcontainers.postgres import PostgresContainer
+
+from fast_api import replicas as replicas_module
+from fast_api.app import app
+from fast_api.database import get_read_session, replicas
+from fast_api.models import table_registry
+from fast_api.replicas import PIN_COOKIE, ReplicaPinMiddleware, ReplicaRouter
+
+
+def test_round_robin_between_replicas():
+    router = ReplicaRouter('primary', ['r1', 'r2'])
+
+    assert [router.engine_for(1) for _ in range(3)] == ['r1', 'r2', 'r1']
+
+
+def test_without_replicas_reads_go_to_primary():
+    router = ReplicaRouter('primary')
+    router.pin(1)
+
+    assert router.engine_for(1) == 'primary'
+    assert router.is_pinned(1) is False
+
+
+def test_pin_sends_user_reads_to_primary(monkeypatch):
+    router = ReplicaRouter('primary', ['r1'], pin_seconds=5)
+    monkeypatch.setattr(replicas_module, 'monotonic', lambda: 100.0)
+    router.pin(1)
+
+    assert router.engine_for(1) == 'primary'
+    assert router.engine_for(2) == 'r1'
+
+    monkeypatch.setattr(replicas_module, 'monotonic', lambda: 105.0)
+    assert router.engine_for(1) == 'r1'
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError, match='Unknown replica strategy'):
+        ReplicaRouter('primary', strategy='random')
+
+
+def _worker(router):
+    app = FastAPI()
+    app.add_middleware(ReplicaPinMiddleware, router=router)
+
+    @app.post('/write')
+    async def write():
+        router.pin(1)
+
+    @app.get('/read')
+    async def read():
+        return {'engine': router.engine_for(1)}
+
+    return ASGITransport(app=app)
+
+
+@pytest.mark.asyncio
+async def test_pin_cookie_reaches_other_workers():
+    # dois workers: o pin em memória de um não existe no outro
+    first = ReplicaRouter('primary', ['r1'], pin_seconds=5)
+    second = ReplicaRouter('primary', ['r1'], pin_seconds=5)
+    base_url = 'http://test'
+
+    async with AsyncClient(transport=_worker(first), base_url=base_url) as ac:
+        response = await ac.post('/write')
+    cookies = response.cookies
+    assert PIN_COOKIE in cookies
+
+    async with AsyncClient(transport=_worker(second), base_url=base_url) as ac:
+        assert (await ac.get('/read')).json() == {'engine': 'r1'}
+        ac.cookies = cookies
+        assert (await ac.get('/read')).json() == {'engine': 'primary'}
+        assert PIN_COOKIE not in (await ac.get('/read')).headers.get(
+            'set-cookie', ''
+        )
+
+
+@pytest.mark.parametrize('value', ['1.0', 'garbage'])
+@pytest.mark.asyncio
+async def test_expired_or_invalid_pin_cookie_is_ignored(value):
+    router = ReplicaRouter('primary', ['r1'], pin_seconds=5)
+
+    async with AsyncClient(
+        transport=_worker(router),
+        base_url='http://test',
+        cookies={PIN_COOKIE: value},
+    ) as ac:
+        response = await ac.get('/read')
+
+    assert response.json() == {'engine': 'r1'}
+
+
+@pytest.mark.asyncio
+async def test_least_loaded_replica(engine):
+    url = engine.url.render_as_string(hide_password=False)
+    busy, idle = create_async_engine(url), create_async_engine(url)
+    router = ReplicaRouter(engine, [busy, idle], strategy='least_loaded')
+
+    async with busy.connect():
+        assert router.engine_for() is idle
+
+    await busy.dispose()
+    await idle.dispose()
+
+
+@pytest_asyncio.fixture
+async def replica_engine():
+    # réplica de mentira: mesmo schema, nenhum dado
+    with PostgresContainer('postgres:18', driver='psycopg') as postgres:
+        replica = create_async_engine(postgres.get_connection_url())
+        async with replica.begin() as conn:
+            await conn.run_sync(table_registry.metadata.create_all)
+
+        yield replica
+
+        await replica.dispose()
+
+
+@pytest.fixture
+def routed_reads(monkeypatch, client, engine, replica_engine):
+    monkeypatch.setattr(replicas, 'primary', engine)
+    monkeypatch.setattr(replicas, 'replicas', [replica_engine])
+    monkeypatch.setattr(replicas, '_pins', {})
+    app.dependency_overrides.pop(get_read_session)
+    return client
+
+
+def test_reads_use_replica_until_user_writes(routed_reads, user, token):
+    url = f'/users/{user.id}'
+
+    # o usuário só existe no primário
+    assert routed_reads.get(url).status_code == HTTPStatus.NOT_FOUND
+
+    response = routed_reads.put(
+        url,
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': 'pinned',
+            'email': user.email,
+            'password': 'secret',
+        },
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    response = routed_reads.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['username'] == 'pinned'
@@ -0,0 +1,25 @@
+import json
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from benchmarks.serialization import make_todos
+from fast_api.responses import TODO_LIST, json_response
+from fast_api.schemas import TodoList
+
+
+@pytest.mark.asyncio
+async def test_json_response_matches_fastapi_encoding():
+    content = {'todos': make_todos(3), 'next_cursor': 'abc'}
+    field = create_model_field('response', TodoList, mode='serialization')
+
+    expected = JSONResponse(
+        await serialize_response(field=field, response_content=content)
+    )
+    response = json_response(TODO_LIST, content, headers={'ETag': 'W/"x"'})
+
+    assert json.loads(response.body) == json.loads(expected.body)
+    assert response.media_type == 'application/json'
+    assert response.headers['ETag'] == 'W/"x"'
@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import select
+
+from fast_api.loading import USER_PUBLIC_COLUMNS
+from fast_api.models import User
+from fast_api.rows import UserRow, fetch_row, fetch_rows
+
+
+@pytest.mark.asyncio
+async def test_fetch_rows(session, user, other_user):
+    rows = await fetch_rows(
+        session, select(*USER_PUBLIC_COLUMNS).order_by(User.id), UserRow
+    )
+
+    assert [(row.id, row.email) for row in rows] == [
+        (user.id, user.email),
+        (other_user.id, other_user.email),
+    ]
+    assert not hasattr(rows[0], '__dict__')
+
+
+@pytest.mark.asyncio
+async def test_fetch_row(session, user):
+    query = select(*USER_PUBLIC_COLUMNS)
+
+    row = await fetch_row(session, query.where(User.id == user.id), UserRow)
+    missing = await fetch_row(session, query.where(User.id == 0), UserRow)
+
+    assert row.username == user.username
+    assert missing is None
+
+
+@pytest.mark.asyncio
+async def test_rows_match_columns_by_name(session, user):
+    query = select(*reversed(USER_PUBLIC_COLUMNS))
+
+    [row] = await fetch_rows(session, query, UserRow)
+    one = await fetch_row(session, query, UserRow)
+
+    assert row == one
+    assert (row.id, row.username, row.email) == (
+        user.id,
+        user.username,
+        user.email,
+    )
@@ -2,7 +2,7 @@ from http import HTTPStatus
 
 from jwt import decode
 
-from fast_api.security import create_access_token
+from fast_api.security import create_access_token, principal_cache
 
 
 def test_jwt(settings):
@@ -46,3 +46,44 @@ def test_get_current_user_does_not_exists(client):
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_get_current_user_should_be_cached(client, token, count_queries):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/auth/refresh_token', headers=headers)
+
+    with count_queries() as queries:
+        response = client.post('/auth/refresh_token', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert queries == []
+
+
+def test_update_user_should_invalidate_cached_user(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/auth/refresh_token', headers=headers)
+
+    client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={
+            'username': 'updated',
+            'email': 'updated@example.com',
+            'password': 'secret',
+        },
+    )
+    response = client.post('/auth/refresh_token', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert principal_cache.get(user.email) is None
+
+
+def test_delete_user_should_invalidate_cached_user(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/auth/refresh_token', headers=headers)
+
+    client.delete(f'/users/{user.id}', headers=headers)
+    response = client.post('/auth/refresh_token', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json() == {'detail': 'Could not validate credentials'}
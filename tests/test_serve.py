@@ -0,0 +1,146 @@
+import pytest
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from fast_api import serve as serve_module
+from fast_api.serve import (
+    available_cpus,
+    prepare_metrics_dir,
+    server_options,
+    share_worker_count,
+    supervisor,
+    worker_count,
+)
+
+
+@pytest.fixture
+def affinity(monkeypatch):
+    expected_cpus = 4
+    monkeypatch.setattr(
+        serve_module.os,
+        'sched_getaffinity',
+        lambda pid: set(range(expected_cpus)),
+    )
+    return expected_cpus
+
+
+@pytest.mark.parametrize(
+    ('cpu_max', 'expected_cpus'),
+    [
+        ('max 100000', 4),
+        ('200000 100000', 2),
+        ('150000 100000', 2),
+        ('50000 100000', 1),
+        ('800000 100000', 4),
+    ],
+)
+def test_available_cpus_respects_cgroup_quota(
+    tmp_path, affinity, cpu_max, expected_cpus
+):
+    path = tmp_path / 'cpu.max'
+    path.write_text(f'{cpu_max}\n')
+
+    assert available_cpus(path) == expected_cpus
+
+
+def test_available_cpus_without_cgroup(tmp_path, affinity):
+    assert available_cpus(tmp_path / 'missing') == affinity
+
+
+def test_worker_count_from_settings(settings):
+    expected_workers = 3
+    settings = settings.model_copy(update={'SERVER_WORKERS': expected_workers})
+
+    assert worker_count(settings) == expected_workers
+
+
+def test_worker_count_defaults_to_cpus(settings, monkeypatch):
+    expected_workers = 6
+    monkeypatch.setattr(
+        serve_module, 'available_cpus', lambda: expected_workers
+    )
+    settings = settings.model_copy(update={'SERVER_WORKERS': 0})
+
+    assert worker_count(settings) == expected_workers
+
+
+def test_server_options(settings):
+    expected_max_requests = 1000
+    settings = settings.model_copy(
+        update={
+            'SERVER_WORKERS': 2,
+            'SERVER_MAX_REQUESTS': expected_max_requests,
+        }
+    )
+
+    options = server_options(settings)
+
+    assert options['workers'] == settings.SERVER_WORKERS
+    assert options['backlog'] == settings.SERVER_BACKLOG
+    assert options['timeout_keep_alive'] == settings.SERVER_KEEPALIVE_TIMEOUT
+    assert (
+        options['timeout_graceful_shutdown']
+        == settings.SERVER_GRACEFUL_TIMEOUT
+    )
+    assert options['limit_max_requests'] == expected_max_requests
+
+
+def test_server_options_without_recycling(settings):
+    settings = settings.model_copy(update={'SERVER_MAX_REQUESTS': 0})
+
+    assert server_options(settings)['limit_max_requests'] is None
+
+
+def test_server_options_fall_back_without_uvloop(settings, monkeypatch):
+    monkeypatch.setattr(serve_module, 'find_spec', lambda name: None)
+
+    options = server_options(settings)
+
+    assert options['loop'] == 'asyncio'
+    assert options['http'] == 'h11'
+
+
+def test_server_options_prefer_uvloop_and_httptools(settings, monkeypatch):
+    monkeypatch.setattr(serve_module, 'find_spec', lambda name: object())
+
+    options = server_options(settings)
+
+    assert options['loop'] == 'uvloop'
+    assert options['http'] == 'httptools'
+
+
+def test_prepare_metrics_dir_clears_stale_snapshots(
+    tmp_path, settings, monkeypatch
+):
+    monkeypatch.setenv('METRICS_DIR', '')
+    stale = tmp_path / 'worker-1.json'
+    stale.write_text('{}', encoding='utf-8')
+    settings = settings.model_copy(update={'METRICS_DIR': str(tmp_path)})
+
+    assert prepare_metrics_dir(settings) == str(tmp_path)
+    assert not stale.exists()
+    assert serve_module.os.environ['METRICS_DIR'] == str(tmp_path)
+
+
+def test_supervisor_listens_for_its_workers(settings):
+    settings = settings.model_copy(
+        update={'SERVER_HOST': '127.0.0.1', 'SERVER_PORT': 0}
+    )
+    config = uvicorn.Config(serve_module.APP, **server_options(settings))
+
+    multiprocess = supervisor(config)
+
+    assert isinstance(multiprocess, Multiprocess)
+    assert multiprocess.processes_num == config.workers
+    [sock] = multiprocess.sockets
+    assert sock.getsockname()[0] == '127.0.0.1'
+    sock.close()
+
+
+def test_share_worker_count(monkeypatch):
+    expected_workers = 4
+    monkeypatch.setenv('SERVER_WORKERS', '0')
+
+    share_worker_count(expected_workers)
+
+    assert serve_module.os.environ['SERVER_WORKERS'] == str(expected_workers)
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from time import perf_counter
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from fast_api.database import replicas
+from fast_api.startup import pool_target, warm_pool, warm_up
+from tests.test_app import UNREACHABLE_URL
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_opens_connections(session, engine):
+    expected_connections = 3
+    warm_engine = create_async_engine(
+        engine.url, pool_size=expected_connections
+    )
+
+    await warm_pool(warm_engine, pool_target(warm_engine))
+
+    assert warm_engine.pool.checkedin() == expected_connections
+    await warm_engine.dispose()
+
+
+class FlakyConnection:
+    def __init__(self, engine):
+        self.engine = engine
+        self.open = False
+
+    async def __aenter__(self):
+        self.engine.attempts += 1
+        if self.engine.attempts == self.engine.fail_on:
+            raise OSError('connection refused')
+
+        await asyncio.sleep(0.01)
+        self.open = True
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.open = False
+
+    async def execute(self, statement):
+        self.engine.statements.append(statement)
+
+
+class FlakyEngine:
+    """A conexão ``fail_on`` falha enquanto as outras ainda abrem."""
+
+    def __init__(self, fail_on: int):
+        self.fail_on = fail_on
+        self.attempts = 0
+        self.connections = []
+        self.statements = []
+
+    def connect(self):
+        connection = FlakyConnection(self)
+        self.connections.append(connection)
+        return connection
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_closes_connections_when_one_fails():
+    engine = FlakyEngine(fail_on=2)
+
+    with pytest.raises(ExceptionGroup):
+        await warm_pool(engine, 4)
+
+    await asyncio.sleep(0.05)  # as que ficaram para trás já terminaram
+    assert not any(connection.open for connection in engine.connections)
+
+
+def test_pool_target_without_pool():
+    engine = create_async_engine(UNREACHABLE_URL, poolclass=NullPool)
+
+    assert pool_target(engine) == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_up_survives_unreachable_database(monkeypatch, caplog):
+    unreachable = create_async_engine(UNREACHABLE_URL)
+    monkeypatch.setattr(replicas, 'primary', unreachable)
+    monkeypatch.setattr(replicas, 'replicas', [])
+
+    with caplog.at_level(logging.WARNING, logger='uvicorn.error'):
+        await warm_up(timeout=5)
+
+    assert 'Pool warm-up failed' in caplog.text
+    await unreachable.dispose()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_gives_up_on_a_silent_database(monkeypatch, caplog):
+    async def silent(reader, writer):
+        await reader.read()  # aceita a conexão e nunca responde
+
+    server = await asyncio.start_server(silent, '127.0.0.1', 0)
+    host, port = server.sockets[0].getsockname()
+    hanging = create_async_engine(
+        f'postgresql+psycopg://app:app@{host}:{port}/app'
+    )
+    monkeypatch.setattr(replicas, 'primary', hanging)
+    monkeypatch.setattr(replicas, 'replicas', [])
+    timeout = 0.2
+
+    started = perf_counter()
+    with caplog.at_level(logging.WARNING, logger='uvicorn.error'):
+        await warm_up(timeout)
+
+    assert perf_counter() - started < timeout * 5
+    assert 'Warm-up gave up after 0.2 s' in caplog.text
+    await hanging.dispose()
+    server.close()
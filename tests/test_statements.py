@@ -0,0 +1,137 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import DateTime, literal, select, text
+from sqlalchemy.exc import StatementError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.types import TypeDecorator
+
+from fast_api import database
+from fast_api.importer import COPY_TODOS, copy_todos
+from fast_api.metrics import DB_STATEMENT_ERRORS, registry
+from fast_api.queries import QueryStatsMiddleware
+from fast_api.statements import IN_FLIGHT, watch_statements
+from fast_api.tracing import (
+    BatchExporter,
+    MemoryWriter,
+    Tracer,
+    TracingMiddleware,
+)
+
+
+class StrictDateTime(TypeDecorator):
+    """Recusa o parâmetro antes do cursor, como o DateTime do SQLite."""
+
+    impl = DateTime
+    cache_ok = True
+
+    @staticmethod
+    def process_bind_param(value, dialect):
+        if not isinstance(value, datetime):
+            raise TypeError('DateTime type only accepts datetime objects')
+        return value
+
+
+@pytest.fixture
+def watched(engine):
+    registry.clear()
+    yield watch_statements(create_async_engine(engine.url))
+    registry.clear()
+
+
+@pytest.mark.asyncio
+async def test_error_before_the_cursor_is_not_masked(watched):
+    async with watched.connect() as conn:
+        with pytest.raises(StatementError, match='only accepts datetime'):
+            await conn.execute(select(literal('yesterday', StrictDateTime())))
+
+        # a conexão segue medindo normalmente
+        await conn.execute(text('SELECT 1'))
+        assert IN_FLIGHT not in conn.info
+
+    assert DB_STATEMENT_ERRORS.collect()['samples'] == [[['SELECT'], 1]]
+    await watched.dispose()
+
+
+@pytest.mark.asyncio
+async def test_error_before_the_cursor_opens_no_span(watched):
+    writer = MemoryWriter()
+    tracer = Tracer(BatchExporter(writer, 'test'))
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+    @app.get('/')
+    async def read():
+        async with watched.connect() as conn:
+            with pytest.raises(StatementError):
+                await conn.execute(
+                    select(literal('yesterday', StrictDateTime()))
+                )
+            await conn.execute(text('SELECT 1'))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        await ac.get('/')
+    tracer.shutdown()
+    await watched.dispose()
+
+    [statement] = [s for s in writer.spans if s['name'] == 'SQL SELECT']
+    assert 'status' not in statement
+    assert {'key': 'db.statement', 'value': {'stringValue': 'SELECT 1'}} in (
+        statement['attributes']
+    )
+
+
+@pytest.mark.asyncio
+async def test_error_before_the_cursor_is_not_a_request_query(watched):
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, headers=True)
+
+    @app.get('/')
+    async def read():
+        async with watched.connect() as conn:
+            with pytest.raises(StatementError):
+                await conn.execute(
+                    select(literal('yesterday', StrictDateTime()))
+                )
+            await conn.execute(text('SELECT 1'))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.get('/')
+    await watched.dispose()
+
+    assert response.headers['x-db-queries'] == '1'
+
+
+def test_app_engine_has_one_set_of_listeners():
+    dispatch = database.engine.sync_engine.dispatch
+
+    assert len(dispatch.before_cursor_execute) == 1
+    assert len(dispatch.after_cursor_execute) == 1
+
+
+@pytest.mark.asyncio
+async def test_copy_is_measured_like_a_statement(session, user):
+    writer = MemoryWriter()
+    tracer = Tracer(BatchExporter(writer, 'test'))
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, headers=True)
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+    @app.post('/')
+    async def copy():
+        await copy_todos(session, [('título', 'descrição', 'todo', user.id)])
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        response = await ac.post('/')
+    tracer.shutdown()
+
+    assert response.headers['x-db-queries'] == '1'
+    [copy_span] = [s for s in writer.spans if s['name'] == 'SQL OTHER']
+    assert {'key': 'db.statement', 'value': {'stringValue': COPY_TODOS}} in (
+        copy_span['attributes']
+    )
@@ -1,21 +1,18 @@
+import csv
+import io
 from http import HTTPStatus
 
-import factory
-import factory.fuzzy
 import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
 
+from fast_api.etags import read_todos_version
+from fast_api.importer import copy_todos, read_todos
 from fast_api.models import Todo, TodoState
-from fast_api.schemas import TodoPublic
-
-
-class TodoFactory(factory.Factory):
-    class Meta:
-        model = Todo
-
-    title = factory.Faker('text')
-    description = factory.Faker('text')
-    state = factory.fuzzy.FuzzyChoice(TodoState)
-    user_id = 1
+from fast_api.routers import todos as todos_router
+from fast_api.schemas import FileFormat, FilterTodo, TodoPublic
+from tests.factories import TodoFactory
 
 
 @pytest.mark.asyncio
@@ -60,7 +57,7 @@ async def test_list_todos_should_return_all_fields(
     todo = TodoPublic.model_validate(todo).model_dump(mode='json')
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'todos': [todo]}
+    assert response.json() == {'todos': [todo], 'next_cursor': None}
 
 
 @pytest.mark.asyncio
@@ -224,3 +221,756 @@ def test_update_todo_error_not_found(client, token):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json() == {'detail': 'Task not found'}
+
+
+@pytest.mark.asyncio
+async def test_list_todos_should_not_load_user_todos(
+    session, client, user, token, count_queries
+):
+    expected_queries = 3  # usuário + versão da lista (ETag) + lista
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    with count_queries() as queries:
+        response = client.get(
+            '/todos', headers={'Authorization': f'Bearer {token}'}
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == expected_queries
+
+
+def test_create_todo_queries(client, token, count_queries):
+    expected_queries = 4  # usuário + insert + contadores + versão
+
+    with count_queries() as queries:
+        response = client.post(
+            '/todos/',
+            json={'title': 'title', 'description': 'description'},
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert len(queries) == expected_queries
+
+
+@pytest.mark.asyncio
+async def test_update_todo_queries(
+    session, client, token, user, count_queries
+):
+    expected_queries = 3  # usuário + update returning + versão
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+
+    with count_queries() as queries:
+        response = client.patch(
+            f'/todos/{todo.id}',
+            headers={'Authorization': f'Bearer {token}'},
+            json={'title': 'titulo teste'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == expected_queries
+
+
+@pytest.mark.asyncio
+async def test_delete_todo_queries(
+    session, client, token, user, count_queries
+):
+    expected_queries = 4  # usuário + delete + contadores + versão
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+
+    with count_queries() as queries:
+        response = client.delete(
+            f'/todos/{todo.id}', headers={'Authorization': f'Bearer {token}'}
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == expected_queries
+
+
+@pytest.mark.asyncio
+async def test_list_todos_cursor_should_walk_all_pages(
+    session, client, user, token
+):
+    expected_pages = 3
+    expected_todos = 5
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    ids, pages, cursor = [], 0, None
+    while True:
+        params = {'limit': 2} | ({'cursor': cursor} if cursor else {})
+        response = client.get(
+            '/todos/',
+            params=params,
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        assert response.status_code == HTTPStatus.OK
+        pages += 1
+        ids += [todo['id'] for todo in response.json()['todos']]
+        cursor = response.json()['next_cursor']
+        if not cursor:
+            break
+
+    assert pages == expected_pages
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids) == expected_todos
+
+
+def test_list_todos_invalid_cursor(client, token):
+    response = client.get(
+        '/todos/?cursor=nao-e-um-cursor',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_list_todos_offset_and_cursor_together(client, token):
+    response = client.get(
+        '/todos/?offset=1&cursor=WyIyMDI1LTA1LTIwVDAwOjAwOjAwIiwgMV0',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_list_todos_limit_above_max_page_size(client, token):
+    response = client.get(
+        '/todos/?limit=1000',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_list_todos_fulltext_should_order_by_relevance(
+    session, client, user, token
+):
+    session.add_all([
+        TodoFactory(user_id=user.id, title='comprar pão', description='x'),
+        TodoFactory(
+            user_id=user.id, title='mercado', description='comprar leite'
+        ),
+        TodoFactory(
+            user_id=user.id,
+            title='comprar café',
+            description='comprar no mercado',
+        ),
+        TodoFactory(user_id=user.id, title='estudar', description='fastapi'),
+    ])
+    await session.commit()
+
+    response = client.get(
+        '/todos/?search=fulltext&title=comprar&description=mercado',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['title'] for todo in response.json()['todos']] == [
+        'comprar café'
+    ]
+
+
+@pytest.mark.asyncio
+async def test_list_todos_fulltext_title(session, client, user, token):
+    session.add_all([
+        TodoFactory(user_id=user.id, title='comprar pão', description='x'),
+        TodoFactory(user_id=user.id, title='pão', description='comprar'),
+        TodoFactory(
+            user_id=user.id, title='comprar pão comprar', description='x'
+        ),
+    ])
+    await session.commit()
+
+    response = client.get(
+        '/todos/?search=fulltext&title=comprar',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['title'] for todo in response.json()['todos']] == [
+        'comprar pão comprar',
+        'comprar pão',
+    ]
+    assert response.json()['next_cursor'] is None
+
+
+def test_list_todos_fulltext_with_cursor(client, token):
+    response = client.get(
+        '/todos/?search=fulltext&cursor=WyIyMDI1LTA1LTIwVDAwOjAwOjAwIiwgMV0',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_fulltext_rank_adds_only_the_ranks():
+    todo_filter = FilterTodo(
+        search='fulltext', title='comprar', description='mercado'
+    )
+
+    _, rank = todos_router._filter_todos(select(Todo), todo_filter)
+
+    compiled = rank.compile(dialect=postgresql.dialect())
+    assert set(compiled.params.values()) == {'simple', 'comprar', 'mercado'}
+
+
+@pytest.mark.asyncio
+async def test_update_todo_without_fields(
+    client, session, token, user, mock_db_time
+):
+    with mock_db_time(model=Todo) as time:
+        todo = TodoFactory(user_id=user.id)
+        session.add(todo)
+        await session.commit()
+
+    response = client.patch(
+        f'/todos/{todo.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['title'] == todo.title
+    assert response.json()['updated_at'] == time.isoformat()
+
+
+@pytest.mark.asyncio
+async def test_update_todo_without_fields_does_not_write(
+    client, session, token, user, pins
+):
+    todo = TodoFactory(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+    version = await read_todos_version(session, user.id)
+
+    response = client.patch(
+        f'/todos/{todo.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert pins == []
+    assert await read_todos_version(session, user.id) == version
+
+
+def test_create_todos_batch(client, token, count_queries):
+    expected_queries = 4  # usuário + insert + contadores + versão
+    todos = [
+        {'title': f'title {n}', 'description': 'description'} for n in range(3)
+    ]
+
+    with count_queries() as queries:
+        response = client.post(
+            '/todos/batch',
+            json={'todos': todos},
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    results = response.json()['results']
+    assert response.status_code == HTTPStatus.CREATED
+    assert [result['todo']['title'] for result in results] == [
+        'title 0',
+        'title 1',
+        'title 2',
+    ]
+    assert {result['status'] for result in results} == {HTTPStatus.CREATED}
+    assert len(queries) == expected_queries
+
+
+def test_create_todos_batch_invalid_item(client, token):
+    response = client.post(
+        '/todos/batch',
+        json={'todos': [{'title': 'sem descrição'}]},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_create_todos_batch_too_large(client, token, settings):
+    todos = [{'title': 't', 'description': 'd'}] * (
+        settings.TODO_BATCH_MAX_SIZE + 1
+    )
+
+    response = client.post(
+        '/todos/batch',
+        json={'todos': todos},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json() == {
+        'detail': f'Batch size limit is {settings.TODO_BATCH_MAX_SIZE}'
+    }
+
+
+@pytest.mark.asyncio
+async def test_update_todos_batch(client, session, token, user, count_queries):
+    expected_queries = 4  # usuário + update + contadores + versão
+    todos = TodoFactory.create_batch(2, user_id=user.id, state=TodoState.todo)
+    session.add_all(todos)
+    await session.commit()
+    first_title = todos[0].title
+
+    with count_queries() as queries:
+        response = client.patch(
+            '/todos/batch',
+            json={
+                'todos': [
+                    {'id': todos[0].id, 'state': 'done'},
+                    {'id': todos[1].id, 'title': 'novo título'},
+                ]
+            },
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    first, second = response.json()['results']
+    assert response.status_code == HTTPStatus.OK
+    assert first['status'] == second['status'] == HTTPStatus.OK
+    assert first['todo']['state'] == 'done'
+    assert first['todo']['title'] == first_title
+    assert second['todo']['title'] == 'novo título'
+    assert second['todo']['state'] == 'todo'
+    assert len(queries) == expected_queries
+
+
+@pytest.mark.asyncio
+async def test_update_todos_batch_empty_item_keeps_updated_at(
+    client, session, token, user
+):
+    todos = TodoFactory.create_batch(2, user_id=user.id, state=TodoState.todo)
+    session.add_all(todos)
+    await session.commit()
+    await session.refresh(todos[0])
+    updated_at = todos[0].updated_at.isoformat()
+
+    response = client.patch(
+        '/todos/batch',
+        json={
+            'todos': [
+                {'id': todos[0].id},
+                {'id': todos[1].id, 'state': 'done'},
+            ]
+        },
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    first, second = response.json()['results']
+    assert first['status'] == HTTPStatus.OK
+    assert first['todo']['updated_at'] == updated_at
+    assert second['todo']['state'] == 'done'
+
+
+@pytest.mark.asyncio
+async def test_update_todos_batch_other_user_todo(
+    client, session, token, other_user
+):
+    other_todo = TodoFactory(user_id=other_user.id)
+    session.add(other_todo)
+    await session.commit()
+
+    response = client.patch(
+        '/todos/batch',
+        json={'todos': [{'id': other_todo.id, 'title': 'não é meu'}]},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['results'] == [
+        {
+            'id': other_todo.id,
+            'status': HTTPStatus.NOT_FOUND,
+            'todo': None,
+            'detail': 'Task not found',
+        }
+    ]
+
+
+def test_update_todos_batch_duplicated_ids(client, token):
+    response = client.patch(
+        '/todos/batch',
+        json={'todos': [{'id': 1, 'state': 'done'}, {'id': 1}]},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_delete_todos_batch(client, session, token, user):
+    todos = TodoFactory.create_batch(2, user_id=user.id)
+    session.add_all(todos)
+    await session.commit()
+    ids = [todos[0].id, todos[1].id, 999]
+
+    response = client.request(
+        'DELETE',
+        '/todos/batch',
+        json={'ids': ids},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [result['status'] for result in response.json()['results']] == [
+        HTTPStatus.OK,
+        HTTPStatus.OK,
+        HTTPStatus.NOT_FOUND,
+    ]
+
+
+@pytest.fixture
+def pins(monkeypatch):
+    """Usuários presos ao primário pelas rotas de tarefas."""
+    pins = []
+    monkeypatch.setattr(todos_router.replicas, 'pin', pins.append)
+    return pins
+
+
+@pytest_asyncio.fixture
+async def foreign_todo(session, other_user):
+    todo = TodoFactory(user_id=other_user.id)
+    session.add(todo)
+    await session.commit()
+    return todo
+
+
+@pytest.mark.parametrize('method', ['PATCH', 'DELETE'])
+def test_batch_matching_nothing_does_not_write(
+    client, token, pins, foreign_todo, method
+):
+    body = (
+        {'todos': [{'id': foreign_todo.id, 'title': 'não é meu'}, {'id': 9}]}
+        if method == 'PATCH'
+        else {'ids': [foreign_todo.id, 9]}
+    )
+
+    response = client.request(
+        method,
+        '/todos/batch',
+        json=body,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert pins == []
+
+
+@pytest.mark.parametrize(
+    ('path', 'body'),
+    [
+        ('/todos/1', {'title': None}),
+        ('/todos/batch', {'todos': [{'id': 1, 'state': None}]}),
+    ],
+)
+def test_patch_rejects_null_fields(client, token, path, body):
+    response = client.patch(
+        path, json=body, headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_export_todos_ndjson(session, client, user, token):
+    session.add_all(
+        TodoFactory.create_batch(3, user_id=user.id, state=TodoState.todo)
+    )
+    session.add(TodoFactory(user_id=user.id, state=TodoState.trash))
+    await session.commit()
+
+    response = client.get(
+        '/todos/export?state=trash',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    lines = response.text.splitlines()
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert len(lines) == 1
+    assert TodoPublic.model_validate_json(lines[0]).state == TodoState.trash
+
+
+@pytest.mark.asyncio
+async def test_export_todos_csv(session, client, user, token):
+    todos = TodoFactory.create_batch(3, user_id=user.id)
+    session.add_all(todos)
+    await session.commit()
+
+    response = client.get(
+        '/todos/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/csv')
+    assert [int(row['id']) for row in rows] == [todo.id for todo in todos]
+    assert rows[0]['state'] == todos[0].state.value
+
+
+def test_export_todos_empty(client, token):
+    response = client.get(
+        '/todos/export', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert not response.text
+
+
+def test_export_todos_csv_empty_has_header(client, token):
+    response = client.get(
+        '/todos/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.text.splitlines() == [','.join(TodoPublic.model_fields)]
+
+
+@pytest.mark.asyncio
+async def test_import_todos_ndjson(client, token, session, user):
+    body = '\n'.join([
+        '{"title": "um", "description": "d", "state": "done"}',
+        '{"title": "dois", "description": "d"}',
+        'isso não é json',
+        '{"title": "sem descrição"}',
+        '',
+        '{"title": "três", "description": "d", "state": "doing"}',
+    ])
+
+    response = client.post(
+        '/todos/import',
+        content=body.encode(),
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    todos = await session.scalars(select(Todo.title).order_by(Todo.id))
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json() == {
+        'imported': 3,
+        'failed': 2,
+        'errors': [
+            {'line': 3, 'detail': 'Invalid JSON'},
+            {'line': 4, 'detail': 'description: Field required'},
+        ],
+    }
+    assert todos.all() == ['um', 'dois', 'três']
+
+
+@pytest.mark.asyncio
+async def test_import_todos_csv(client, token, session):
+    expected_imported = 2
+    body = (
+        'title,description,state\r\n'
+        'um,"descrição com\r\nduas linhas",done\r\n'
+        'dois,d,estado\r\n'
+        'três,d\r\n'
+        'quatro,d,todo\r\n'
+    )
+
+    response = client.post(
+        '/todos/import?format=csv',
+        content=body.encode(),
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    todos = await session.execute(
+        select(Todo.title, Todo.description).order_by(Todo.id)
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['imported'] == expected_imported
+    assert [error['line'] for error in response.json()['errors']] == [4, 5]
+    assert todos.all() == [
+        ('um', 'descrição com\nduas linhas'),
+        ('quatro', 'd'),
+    ]
+
+
+def test_import_todos_in_chunks(client, token, settings, monkeypatch):
+    total = settings.TODO_IMPORT_CHUNK_SIZE * 2 + 1
+    body = '\n'.join(
+        f'{{"title": "t{n}", "description": "d"}}' for n in range(total)
+    )
+    chunks = []
+
+    async def spy_copy_todos(session, rows, *args):
+        chunks.append(len(rows))
+        return await copy_todos(session, rows, *args)
+
+    monkeypatch.setattr(todos_router, 'copy_todos', spy_copy_todos)
+
+    response = client.post(
+        '/todos/import',
+        content=body.encode(),
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json()['imported'] == total
+    assert chunks == [
+        settings.TODO_IMPORT_CHUNK_SIZE,
+        settings.TODO_IMPORT_CHUNK_SIZE,
+        1,
+    ]
+
+
+def test_import_todos_rejects_long_lines(client, token, monkeypatch):
+    max_line_length = 100
+    monkeypatch.setattr(
+        todos_router.settings, 'TODO_IMPORT_MAX_LINE_LENGTH', max_line_length
+    )
+    body = '\n'.join([
+        '{"title": "um", "description": "d"}',
+        f'{{"title": "{"x" * max_line_length}", "description": "d"}}',
+        '{"title": "dois", "description": "d"}',
+    ])
+
+    response = client.post(
+        '/todos/import',
+        content=body.encode(),
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.json() == {
+        'imported': 2,
+        'failed': 1,
+        'errors': [{'line': 2, 'detail': 'Line too long'}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_read_todos_across_chunk_boundaries():
+    async def chunks():
+        for chunk in [b'{"title": "u', b'm", "descr', b'iption": "\xc3']:
+            yield chunk
+        yield b'\xa9"}\r\n' + b'x' * 50
+        yield b'x' * 50 + b'\n{"title": "dois", "description": "d"}'
+
+    records = [
+        (line, todo and todo.title, error)
+        async for line, todo, error in read_todos(
+            chunks(), FileFormat.ndjson, max_line_length=60
+        )
+    ]
+
+    assert records == [
+        (1, 'um', None),
+        (2, None, 'Line too long'),
+        (3, 'dois', None),
+    ]
+
+
+def _todo_stats(client, token):
+    response = client.get(
+        '/todos/stats', headers={'Authorization': f'Bearer {token}'}
+    )
+    assert response.status_code == HTTPStatus.OK
+    return response.json()
+
+
+def test_todo_stats_empty(client, token):
+    assert _todo_stats(client, token) == {
+        'total': 0,
+        'states': dict.fromkeys([state.value for state in TodoState], 0),
+    }
+
+
+def test_todo_stats_follow_single_writes(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    ids = [
+        client.post(
+            '/todos/',
+            json={'title': 't', 'description': 'd', 'state': state},
+            headers=headers,
+        ).json()['id']
+        for state in ('todo', 'todo', 'doing')
+    ]
+
+    client.patch(f'/todos/{ids[0]}', json={'state': 'done'}, headers=headers)
+    client.patch(f'/todos/{ids[1]}', json={'state': 'todo'}, headers=headers)
+    client.patch(f'/todos/{ids[1]}', json={'title': 'x'}, headers=headers)
+    client.delete(f'/todos/{ids[2]}', headers=headers)
+
+    stats = _todo_stats(client, token)
+    assert stats['total'] == len(ids) - 1
+    assert stats['states'] | {'todo': 1, 'done': 1} == stats['states']
+    assert stats['states']['doing'] == 0
+
+
+def test_todo_stats_follow_batch_and_import(client, token):
+    expected_total = 3
+    headers = {'Authorization': f'Bearer {token}'}
+    created = client.post(
+        '/todos/batch',
+        json={'todos': [{'title': 't', 'description': 'd'}] * 3},
+        headers=headers,
+    ).json()['results']
+    first, second, third = (result['id'] for result in created)
+
+    client.patch(
+        '/todos/batch',
+        json={'todos': [{'id': first, 'state': 'done'}, {'id': second}]},
+        headers=headers,
+    )
+    client.request(
+        'DELETE', '/todos/batch', json={'ids': [third]}, headers=headers
+    )
+    client.post(
+        '/todos/import',
+        content=b'{"title": "t", "description": "d", "state": "doing"}',
+        headers=headers,
+    )
+
+    stats = _todo_stats(client, token)
+    assert stats['total'] == expected_total
+    assert stats['states']['todo'] == 1
+    assert stats['states']['done'] == 1
+    assert stats['states']['doing'] == 1
+
+
+def test_list_todos_not_modified(client, token, count_queries):
+    expected_queries = 1  # só a versão da lista
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/todos/?limit=5', headers=headers).headers['ETag']
+
+    with count_queries() as queries:
+        response = client.get(
+            '/todos/?limit=5', headers=headers | {'If-None-Match': etag}
+        )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+    assert not response.content
+    assert len(queries) == expected_queries
+
+
+def test_list_todos_etag_depends_on_filters(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first = client.get('/todos/?limit=5', headers=headers).headers['ETag']
+    second = client.get('/todos/?limit=6', headers=headers).headers['ETag']
+
+    assert first != second
+
+
+def test_list_todos_etag_changes_on_todo_write(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/todos/', headers=headers).headers['ETag']
+    client.post(
+        '/todos/', json={'title': 't', 'description': 'd'}, headers=headers
+    )
+
+    response = client.get('/todos/', headers=headers | {'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] != etag
+    assert len(response.json()['todos']) == 1
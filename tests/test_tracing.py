@@ -0,0 +1,249 @@
+import json
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from fast_api.statements import watch_statements
+from fast_api.tracing import (
+    CLIENT,
+    NOOP,
+    SERVER,
+    STATUS_ERROR,
+    BatchExporter,
+    FileWriter,
+    MemoryWriter,
+    Span,
+    Tracer,
+    TracingMiddleware,
+    create_tracer,
+    parse_traceparent,
+    span,
+    wrap_in_span,
+)
+
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+PARENT_ID = '00f067aa0ba902b7'
+
+
+@pytest.fixture
+def writer():
+    return MemoryWriter()
+
+
+@pytest.fixture
+def tracer(writer):
+    return Tracer(BatchExporter(writer, 'test'))
+
+
+def _app(tracer, engine=None):
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+    async def get_value():
+        yield 'value'
+
+    async def get_user(value=Depends(wrap_in_span(get_value, 'get_value'))):
+        return value
+
+    @app.get('/items/{item_id}')
+    async def read_item(
+        item_id: int, user=Depends(wrap_in_span(get_user, 'get_user'))
+    ):
+        with span('work', item=item_id):
+            if engine is not None:
+                async with engine.connect() as conn:
+                    await conn.execute(text('SELECT 1'))
+        return {'user': user}
+
+    @app.get('/sql-error')
+    async def sql_error():
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text('SELECT 1/0'))
+        except DBAPIError:
+            return {'failed': True}
+
+    @app.get('/boom')
+    async def boom():
+        raise RuntimeError
+
+    return app
+
+
+async def _get(app, path, headers=None):
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url='http://test') as ac:
+        return await ac.get(path, headers=headers)
+
+
+def _by_name(writer):
+    return {span['name']: span for span in writer.spans}
+
+
+@pytest.mark.parametrize(
+    ('header', 'expected'),
+    [
+        (f'00-{TRACE_ID}-{PARENT_ID}-01', (TRACE_ID, PARENT_ID, True)),
+        (
+            f'00-{TRACE_ID.upper()}-{PARENT_ID}-00',
+            (TRACE_ID, PARENT_ID, False),
+        ),
+        (f'00-{TRACE_ID}-{PARENT_ID}', None),
+        (f'00-{TRACE_ID}-xyz-01', None),
+        ('', None),
+        (None, None),
+    ],
+)
+def test_parse_traceparent(header, expected):
+    assert parse_traceparent(header) == expected
+
+
+@pytest.mark.asyncio
+async def test_request_dependencies_and_sql_share_the_trace(
+    session, engine, tracer, writer
+):
+    traced = watch_statements(create_async_engine(engine.url))
+
+    await _get(_app(tracer, traced), '/items/7')
+    tracer.shutdown()
+    await traced.dispose()
+
+    spans = _by_name(writer)
+    root = spans['GET /items/{item_id}']
+    assert set(spans) == {
+        'GET /items/{item_id}',
+        'get_value',
+        'get_user',
+        'work',
+        'SQL SELECT',
+    }
+    assert {span['traceId'] for span in spans.values()} == {root['traceId']}
+    assert root['kind'] == SERVER
+    assert 'parentSpanId' not in root
+    assert spans['get_user']['parentSpanId'] == root['spanId']
+    assert spans['SQL SELECT']['parentSpanId'] == spans['work']['spanId']
+    assert spans['SQL SELECT']['kind'] == CLIENT
+    assert {'key': 'db.statement', 'value': {'stringValue': 'SELECT 1'}} in (
+        spans['SQL SELECT']['attributes']
+    )
+    assert {
+        'key': 'http.route',
+        'value': {'stringValue': '/items/{item_id}'},
+    } in root['attributes']
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_span(session, engine, tracer, writer):
+    traced = watch_statements(create_async_engine(engine.url))
+
+    await _get(_app(tracer, traced), '/sql-error')
+    tracer.shutdown()
+    await traced.dispose()
+
+    assert _by_name(writer)['SQL SELECT']['status'] == {
+        'code': STATUS_ERROR,
+        'message': 'DivisionByZero',
+    }
+
+
+@pytest.mark.asyncio
+async def test_sampled_traceparent_continues_the_trace(tracer, writer):
+    await _get(
+        _app(tracer),
+        '/items/1',
+        headers={'traceparent': f'00-{TRACE_ID}-{PARENT_ID}-01'},
+    )
+    tracer.shutdown()
+
+    root = _by_name(writer)['GET /items/{item_id}']
+    assert root['traceId'] == TRACE_ID
+    assert root['parentSpanId'] == PARENT_ID
+
+
+@pytest.mark.asyncio
+async def test_unsampled_traceparent_is_respected(tracer, writer):
+    await _get(
+        _app(tracer),
+        '/items/1',
+        headers={'traceparent': f'00-{TRACE_ID}-{PARENT_ID}-00'},
+    )
+    tracer.shutdown()
+
+    assert writer.spans == []
+
+
+@pytest.mark.asyncio
+async def test_sample_rate_zero_records_nothing(writer):
+    tracer = Tracer(BatchExporter(writer, 'test'), sample_rate=0.0)
+
+    await _get(_app(tracer), '/items/1')
+    tracer.shutdown()
+
+    assert writer.spans == []
+
+
+@pytest.mark.asyncio
+async def test_unhandled_error_marks_the_root_span(tracer, writer):
+    await _get(_app(tracer), '/boom')
+    tracer.shutdown()
+
+    root = _by_name(writer)['GET /boom']
+    assert root['status'] == {'code': STATUS_ERROR, 'message': 'RuntimeError'}
+
+
+def test_span_outside_a_trace_is_a_noop():
+    assert span('work') is NOOP
+
+
+def test_exporter_drops_spans_when_the_queue_is_full(writer):
+    exporter = BatchExporter(writer, 'test')
+    exporter.max_queue = 2
+    root = Span('root', TRACE_ID)
+    for name in ('a', 'b', 'c'):
+        root.child(name).end()
+
+    exporter.submit(root.finished)
+    exporter.shutdown()
+
+    assert exporter.dropped == 1
+    assert [span['name'] for span in writer.spans] == ['a', 'b']
+
+
+def test_file_writer_appends_one_line_per_batch(tmp_path):
+    path = tmp_path / 'traces.jsonl'
+    exporter = BatchExporter(FileWriter(path), 'fast_api')
+    exporter.max_batch = 1
+    root = Span('root', TRACE_ID)
+    root.end()
+    root.child('child').end()
+
+    exporter.submit(root.finished)
+    exporter.shutdown()
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == len(root.finished)
+    resource = json.loads(lines[0])['resourceSpans'][0]['resource']
+    assert resource['attributes'] == [
+        {'key': 'service.name', 'value': {'stringValue': 'fast_api'}}
+    ]
+
+
+def test_create_tracer_from_settings(settings, tmp_path):
+    disabled = settings.model_copy(update={'TRACING_EXPORTER': 'none'})
+    to_file = settings.model_copy(
+        update={
+            'TRACING_EXPORTER': 'file',
+            'TRACING_FILE': str(tmp_path / 'traces.jsonl'),
+            'TRACING_SAMPLE_RATE': 0.25,
+        }
+    )
+
+    assert not create_tracer(disabled).enabled
+    tracer = create_tracer(to_file)
+    assert tracer.enabled
+    assert tracer.sample_rate == to_file.TRACING_SAMPLE_RATE
+    assert isinstance(tracer.exporter.writer, FileWriter)
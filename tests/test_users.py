@@ -1,5 +1,7 @@
 from http import HTTPStatus
 
+import pytest
+
 from fast_api.schemas import UserPublic
 
 
@@ -42,7 +44,7 @@ def test_read_users(client, user, token):
     )
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': [user_schema]}
+    assert response.json() == {'users': [user_schema], 'next_cursor': None}
 
 
 def test_update_user(client, user, token):
@@ -94,6 +96,75 @@ def test_get_user_id(client, user):
     }
 
 
+def test_get_user_id_not_modified(client, user, token):
+    etag = client.get(f'/users/{user.id}').headers['ETag']
+
+    response = client.get(f'/users/{user.id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+    assert not response.content
+
+
+def test_get_user_id_etag_changes_on_update(client, user, token):
+    etag = client.get(f'/users/{user.id}').headers['ETag']
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': 'novo',
+            'email': user.email,
+            'password': 'secret',
+        },
+    )
+
+    response = client.get(f'/users/{user.id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] != etag
+    assert response.json()['username'] == 'novo'
+
+
+def test_get_user_id_should_be_cached(client, user, count_queries):
+    client.get(f'/users/{user.id}')
+
+    with count_queries() as queries:
+        response = client.get(f'/users/{user.id}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['Cache-Control'] == 'public, max-age=5'
+    assert response.json()['id'] == user.id
+    assert queries == []
+    assert client.get('/health/cache').json() == {
+        'users': {'hits': 1, 'misses': 1, 'errors': 0}
+    }
+
+
+@pytest.mark.parametrize('method', ['put', 'delete'])
+def test_user_writes_invalidate_cached_user(client, user, token, method):
+    client.get(f'/users/{user.id}')
+    kwargs = {}
+    if method == 'put':
+        kwargs['json'] = {
+            'username': 'novo',
+            'email': user.email,
+            'password': 'secret',
+        }
+
+    client.request(
+        method,
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        **kwargs,
+    )
+    response = client.get(f'/users/{user.id}')
+
+    if method == 'put':
+        assert response.json()['username'] == 'novo'
+    else:
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
 def test_dont_get_user_id_error(client):
     response = client.get('/users/2')
     assert response.status_code == HTTPStatus.NOT_FOUND
@@ -131,3 +202,90 @@ def test_delete_with_wrong_user(client, other_user, token):
 
     assert response.status_code == HTTPStatus.FORBIDDEN
     assert response.json() == {'detail': 'Not enough permissions'}
+
+
+def test_read_users_should_not_load_todos(
+    client, user, other_user, token, count_queries
+):
+    expected_queries = 2  # usuário autenticado + lista de usuários
+
+    with count_queries() as queries:
+        response = client.get(
+            '/users/', headers={'Authorization': f'Bearer {token}'}
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == expected_queries
+
+
+def test_get_user_id_queries(client, user, count_queries):
+    expected_queries = 1
+
+    with count_queries() as queries:
+        response = client.get(f'/users/{user.id}')
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == expected_queries
+
+
+def test_create_user_queries(client, count_queries):
+    expected_queries = 3  # conflito + insert + refresh
+
+    with count_queries() as queries:
+        response = client.post(
+            '/users/',
+            json={
+                'username': 'alice',
+                'email': 'alice@example.com',
+                'password': 'secret',
+            },
+        )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert len(queries) == expected_queries
+
+
+def test_update_user_queries(client, user, token, count_queries):
+    expected_queries = 2  # usuário + update returning
+
+    with count_queries() as queries:
+        response = client.put(
+            f'/users/{user.id}',
+            json={
+                'username': 'updated_alice',
+                'password': 'secret_updated',
+                'email': 'alice_update@example.com',
+            },
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == expected_queries
+
+
+def test_delete_user_should_not_load_todos(client, user, token, count_queries):
+    expected_queries = 2  # usuário + delete (todos em cascata no banco)
+
+    with count_queries() as queries:
+        response = client.delete(
+            f'/users/{user.id}', headers={'Authorization': f'Bearer {token}'}
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == expected_queries
+
+
+def test_read_users_cursor(client, user, other_user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    first_page = client.get('/users/?limit=1', headers=headers).json()
+
+    response = client.get(
+        '/users/',
+        params={'limit': 1, 'cursor': first_page['next_cursor']},
+        headers=headers,
+    )
+
+    assert first_page['users'][0]['id'] == user.id
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['users'][0]['id'] == other_user.id
+    assert response.json()['next_cursor'] is None